@@ -1,16 +1,27 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict
-from datetime import datetime
+from typing import Awaitable, Dict, List, Optional
+import asyncio
+import json
+import secrets
 
-from app.models.session import InterviewSession
+from app.config import get_settings
+from app.models.session import InterviewSession, TRACKED_FIELDS
 from app.services.conversation_manager import ConversationManager
+from app.services.report_queue import ReportQueue
+from app.services.report_renderer import ReportRenderer
+from app.services.batch_runner import BatchRunner
+from app.services.metrics import Metrics
+from app.services.persona_classifier import PersonaClassifier
+from app.services.role_catalog import RoleCatalog
+from app.services.session_directory import SessionDirectory
+from app.services.transcript_index import SearchQueryError, TranscriptIndex, session_rows
+from app.services.session_store import sessions, create_session, delete_session as remove_session, session_lock
 
 
 router = APIRouter()
-
-# In-memory session storage (replace with database in production)
-sessions: Dict[str, InterviewSession] = {}
+settings = get_settings()
 
 
 # ✅ Request models
@@ -23,35 +34,113 @@ class MessageRequest(BaseModel):
     message: str
 
 
+class PersonaModelSwap(BaseModel):
+    version: str
+
+
+class BatchSession(BaseModel):
+    role: str
+    answers: List[str]
+    id: Optional[str] = None
+    conclude: bool = True
+
+
+class BatchRequest(BaseModel):
+    sessions: List[BatchSession]
+    parallelism: Optional[int] = None
+    wait_for_report: bool = False
+
+
+# ✅ Client disconnects
+async def _wait_for_disconnect(request: Request):
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _run_turn(request: Request, turn: Awaitable[Dict]) -> Optional[Dict]:
+    """Run a turn, cancelling it (LLM calls included) if the client disconnects first.
+
+    Returns None when the client went away; the turn has rolled the session back by then.
+    """
+    turn_task = asyncio.ensure_future(turn)
+    watcher = asyncio.create_task(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({turn_task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        turn_task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if turn_task.done():
+        return turn_task.result()
+
+    turn_task.cancel()
+    await asyncio.gather(turn_task, return_exceptions=True)
+    Metrics.incr("client_disconnects", transport="http")
+    return None
+
+
+def _client_gone() -> JSONResponse:
+    # 499 (client closed request); nobody reads it, but access logs do
+    return JSONResponse(status_code=499, content={"detail": "Client disconnected"})
+
+
+# ✅ Conditional reads (ETag = the session's in-memory version)
+def _etag(session: InterviewSession) -> str:
+    return f'"v{session.version}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+
+def _field_value(session: InterviewSession, column: str):
+    value = getattr(session, column.lstrip("_"))
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+# ✅ Admin routes (model swaps, index rebuilds, session listing, transcript search) need ADMIN_TOKEN
+def _require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
 # ✅ Routes
 @router.post("/api/interview/start")
-async def start_interview(session_data: SessionCreate):
+async def start_interview(session_data: SessionCreate, request: Request):
     """Start a new interview session"""
     
     print(f"\n🚀 Starting new interview for role: {session_data.role}")
     
-    session = InterviewSession(
-        id=str(datetime.utcnow().timestamp()),
-        role=session_data.role,
-        created_at=datetime.utcnow(),
-        status="active"
-    )
-    
-    sessions[session.id] = session
+    session = create_session(session_data.role)
     conversation_manager = ConversationManager(session)
     
-    result = await conversation_manager.start_interview()
+    result = await _run_turn(request, conversation_manager.start_interview())
     
-    print(f"✅ Interview started with session_id: {session.id}")
+    if result is None:
+        remove_session(session.id)
+        return _client_gone()
+    
+    print(f"✅ Interview started with session_id: {session.id} (role: {session.role})")
     
     return {
         "session_id": session.id,
+        "role": session.role,
         **result
     }
 
 
 @router.post("/api/interview/message")
-async def process_message(message_req: MessageRequest):
+async def process_message(message_req: MessageRequest, request: Request):
     """Process user message and get next question or conclusion"""
     
     session = sessions.get(message_req.session_id)
@@ -59,8 +148,15 @@ async def process_message(message_req: MessageRequest):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    conversation_manager = ConversationManager(session)
-    result = await conversation_manager.process_user_response(message_req.message)
+    async def turn():
+        async with session_lock(session.id):
+            conversation_manager = ConversationManager(session)
+            return await conversation_manager.process_user_response(message_req.message)
+    
+    result = await _run_turn(request, turn())
+    
+    if result is None:
+        return _client_gone()
     
     # ✅ DEBUG: Log what we're sending to frontend
     print("\n" + "="*70)
@@ -78,36 +174,310 @@ async def process_message(message_req: MessageRequest):
         print(f"Improvements: {len(feedback.get('areas_for_improvement', []))} items")
         print(f"Next steps: {len(feedback.get('next_steps', []))} items")
     
+    if 'report_status' in result:
+        print(f"Report status: {result['report_status']}")
+    
     print("="*70 + "\n")
     
     return result
 
 
+@router.post("/api/batch/evaluate")
+async def batch_evaluate(batch: BatchRequest):
+    """Run scripted interviews concurrently; streams one NDJSON line per finished session, then a summary"""
+    
+    if not batch.sessions:
+        raise HTTPException(status_code=400, detail="No sessions to run")
+    
+    scripts = [s.model_dump(exclude_none=True) for s in batch.sessions]
+    
+    async def stream():
+        async for result in BatchRunner.run(scripts, batch.parallelism, batch.wait_for_report):
+            yield json.dumps(result) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.get("/api/interview/{session_id}")
-async def get_session(session_id: str):
-    """Get session details"""
+async def get_session(session_id: str, request: Request, response: Response):
+    """Get session details; send the last ETag as If-None-Match to get a 304 when nothing changed"""
     
     session = sessions.get(session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    etag = _etag(session)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return {
         "id": session.id,
+        "version": session.version,
         "role": session.role,
+        "role_display": session.role_display,
         "status": session.status,
         "created_at": session.created_at.isoformat(),
         "current_question": session.current_question_index,
-        "persona": session.persona
+        "persona": session.persona,
+        "report_status": session.report_status,
+        "degraded_turns": session.degraded_turns or 0,
+        "token_usage": session.token_usage
     }
 
 
+@router.get("/api/interview/{session_id}/delta")
+async def get_session_delta(session_id: str, request: Request, response: Response, since: int = 0):
+    """Turns and state fields that changed after version `since`.
+
+    `turns_from` is the index the returned turns start at (earlier turns are
+    unchanged; a rolled-back turn shows up as turns_from pointing before it).
+    `full` means `since` is unknown or too old: the delta holds every turn and
+    field. Nothing changed gives an empty delta, or a 304 with If-None-Match,
+    without reading the history.
+    """
+    
+    session = sessions.get(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    etag = _etag(session)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    full, turns_from, columns = session.changes.since(since)
+    if full:
+        columns = list(TRACKED_FIELDS)
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return {
+        "session_id": session.id,
+        "version": session.version,
+        "since": since,
+        "full": full,
+        "turns_from": turns_from,
+        "turns": session.history.dicts_from(turns_from) if turns_from is not None else [],
+        "state": {TRACKED_FIELDS[column]: _field_value(session, column) for column in columns}
+    }
+
+
+@router.get("/api/interview/{session_id}/transcript")
+async def export_transcript(session_id: str):
+    """Full conversation history, including turns moved to cold storage"""
+
+    session = sessions.get(session_id)
+
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    async with session_lock(session.id):
+        turns = session.conversation_history
+
+    return {
+        "session_id": session.id,
+        "role": session.role,
+        "status": session.status,
+        "turns": turns
+    }
+
+
+@router.get("/api/interview/{session_id}/report")
+async def get_report(session_id: str, wait: float = 0):
+    """Get the feedback report; returns 202 while it is still being generated.
+
+    Pass `wait` (seconds) to long-poll until the report is ready.
+    """
+    
+    session = sessions.get(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if session.report_status is None:
+        raise HTTPException(status_code=404, detail="Interview has not concluded yet")
+    
+    if session.report_status == "pending" and wait > 0:
+        await ReportQueue.wait_for_report(session_id, min(wait, settings.REPORT_MAX_WAIT_SECONDS))
+    
+    if session.report_status == "pending":
+        return JSONResponse(
+            status_code=202,
+            content={"session_id": session.id, "report_status": "pending"}
+        )
+    
+    return {
+        "session_id": session.id,
+        "report_status": session.report_status,
+        "scores": session.scores,
+        "feedback": session.feedback
+    }
+
+
+@router.get("/api/interview/{session_id}/report.{fmt}")
+async def export_report(session_id: str, fmt: str, request: Request):
+    """Feedback report rendered as HTML (`report.html`) or Markdown (`report.md`).
+
+    The ETag is the report's content address, checked before rendering;
+    Content-Location points at the immutable copy under /api/reports.
+    """
+    
+    if fmt not in ReportRenderer.FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown report format: {fmt}")
+    
+    session = sessions.get(session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if session.report_status is None:
+        raise HTTPException(status_code=404, detail="Interview has not concluded yet")
+    
+    if session.report_status == "pending":
+        return JSONResponse(
+            status_code=202,
+            content={"session_id": session.id, "report_status": "pending"}
+        )
+    
+    key = ReportRenderer.cache_key(session, fmt)
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, no-cache",
+        "Content-Location": f"/api/reports/{key}.{fmt}"
+    }
+    if _not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    rendered = ReportRenderer.render(session, fmt)
+    return Response(content=rendered.body, media_type=rendered.media_type, headers=headers)
+
+
+@router.get("/api/reports/{key}.{fmt}")
+async def get_rendered_report(key: str, fmt: str, request: Request):
+    """A rendered report by content address; it never changes, so it may be cached for a year"""
+    
+    rendered = ReportRenderer.cached(key)
+    
+    if rendered is None or ReportRenderer.FORMATS.get(fmt, (None, None))[1] != rendered.media_type:
+        raise HTTPException(status_code=404, detail="Rendered report not cached; request it from the session's report URL")
+    
+    headers = {"ETag": f'"{key}"', "Cache-Control": "private, max-age=31536000, immutable"}
+    if _not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=rendered.body, media_type=rendered.media_type, headers=headers)
+
+
 @router.delete("/api/interview/{session_id}")
 async def delete_session(session_id: str):
     """Delete a session"""
     
-    if session_id in sessions:
-        del sessions[session_id]
+    if remove_session(session_id):
         return {"message": "Session deleted"}
     
     raise HTTPException(status_code=404, detail="Session not found")
+
+
+@router.get("/api/sessions", dependencies=[Depends(_require_admin)])
+async def list_sessions(
+    status: Optional[str] = None,
+    role: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+):
+    """Session summaries, newest first (no transcripts or feedback).
+
+    Filter by status, role (any catalog alias) and creation time (`since` /
+    `until`, ISO dates or datetimes); page with `cursor` = the previous
+    response's `next_cursor`.
+    """
+    
+    if not SessionDirectory.enabled():
+        raise HTTPException(status_code=503, detail="Session listing is disabled")
+    
+    try:
+        return await SessionDirectory.list_page(
+            status=status,
+            role=RoleCatalog.key_for(role) if role else None,
+            since=since,
+            until=until,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/api/search/turns", dependencies=[Depends(_require_admin)])
+async def search_turns(
+    q: str,
+    role: Optional[str] = None,
+    persona: Optional[str] = None,
+    speaker: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0
+):
+    """Full-text search over interview turns, best matches first.
+
+    Filter by role (any catalog alias), persona, speaker (user / assistant)
+    and timestamp (`since` / `until`, ISO dates or datetimes); page with
+    `offset` = the previous response's `next_offset`.
+    """
+    
+    if not TranscriptIndex.enabled():
+        raise HTTPException(status_code=503, detail="Transcript search is disabled")
+    
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Empty search query")
+    
+    try:
+        return await TranscriptIndex.search(
+            q,
+            role=RoleCatalog.key_for(role) if role else None,
+            persona=persona,
+            speaker=speaker,
+            since=since,
+            until=until,
+            limit=limit,
+            offset=offset
+        )
+    except SearchQueryError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search query: {e}")
+
+
+@router.post("/api/admin/transcript-index/rebuild", dependencies=[Depends(_require_admin)])
+async def rebuild_transcript_index():
+    """Re-index every in-memory session in place; other sessions' turns are kept
+    (scripts/rebuild_transcript_index.py rebuilds the whole index from the database)"""
+    
+    if not TranscriptIndex.enabled():
+        raise HTTPException(status_code=503, detail="Transcript search is disabled")
+    
+    # Queued turns first, then read the histories here, on the event loop; only the SQLite writes go to a thread
+    await TranscriptIndex.flush()
+    rows = {session_id: session_rows(session) for session_id, session in list(sessions.items())}
+    indexed = await asyncio.to_thread(TranscriptIndex.reindex, rows)
+    return {"sessions": len(rows), "turns": indexed}
+
+
+@router.get("/api/admin/persona-model", dependencies=[Depends(_require_admin)])
+async def get_persona_model():
+    """Currently loaded local persona classifier"""
+    return PersonaClassifier.status()
+
+
+@router.post("/api/admin/persona-model", dependencies=[Depends(_require_admin)])
+async def swap_persona_model(swap: PersonaModelSwap):
+    """Hot-swap the local persona classifier to another trained version"""
+    
+    if not PersonaClassifier.load(swap.version):
+        raise HTTPException(status_code=400, detail=f"Could not load persona model '{swap.version}'")
+    
+    return PersonaClassifier.status()
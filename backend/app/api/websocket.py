@@ -1,17 +1,279 @@
-from fastapi import WebSocket
-from typing import Dict
+import asyncio
+import json
+import time
+from typing import Dict, Optional, Set
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.config import get_settings
+from app.models.session import InterviewSession
+from app.services.conversation_manager import ConversationManager
+from app.services.metrics import Metrics
+from app.services.report_queue import ReportQueue
+from app.services.session_store import sessions, create_session, delete_session as remove_session, session_lock
+
+router = APIRouter()
+settings = get_settings()
+
+
+class Connection:
+    """One client socket: bounded outbound queue, heartbeat and the sessions it drives.
+
+    Frames from the client carry an `action` (start / message / conclude /
+    subscribe / ping / pong) and an optional `request_id` echoed back. Frames
+    to the client carry an `event` (started / token / result / report / ping /
+    pong / error). Token frames are droppable: when the send queue is full they
+    are discarded instead of stalling the turn. Every other frame waits for
+    queue space (backpressure), and a client that stays blocked longer than
+    WS_SEND_TIMEOUT is disconnected.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.send_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.session_ids: Set[str] = set()
+        self.tasks: Set[asyncio.Task] = set()
+        self.last_received = time.monotonic()
+        self.closed = False
+
+    async def send(self, frame: Dict, droppable: bool = False) -> bool:
+        if self.closed:
+            return False
+
+        if droppable:
+            try:
+                self.send_queue.put_nowait(frame)
+                return True
+            except asyncio.QueueFull:
+                Metrics.incr("ws_frames_dropped", event=frame.get("event"))
+                return False
+
+        try:
+            await asyncio.wait_for(self.send_queue.put(frame), timeout=settings.WS_SEND_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            print("⚠️ WebSocket client too slow, closing connection")
+            Metrics.incr("ws_slow_client_disconnects")
+            await self.close(code=1008)
+            return False
+
+    async def sender(self):
+        while True:
+            frame = await self.send_queue.get()
+            await self.websocket.send_json(frame)
+
+    async def heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL)
+            if time.monotonic() - self.last_received > settings.WS_IDLE_TIMEOUT:
+                print("⏱️ WebSocket idle timeout, closing connection")
+                Metrics.incr("ws_idle_disconnects")
+                await self.close(code=1001)
+                return
+            await self.send({"event": "ping", "ts": time.time()}, droppable=True)
+
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def close(self, code: int = 1000):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
 
 class WebSocketManager:
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-    
-    async def connect(self, websocket: WebSocket, session_id: str):
+        self.active_connections: Set[Connection] = set()
+        self.subscriptions: Dict[str, Set[Connection]] = {}
+        ReportQueue.add_listener(self.on_report_ready)
+
+    async def connect(self, websocket: WebSocket) -> Connection:
         await websocket.accept()
-        self.active_connections[session_id] = websocket
-    
-    async def disconnect(self, session_id: str):
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
-    
-    async def handle_message(self, session_id: str, data: Dict):
+        connection = Connection(websocket)
+        self.active_connections.add(connection)
+        Metrics.set_gauge("ws_connections", len(self.active_connections))
+        return connection
+
+    async def disconnect(self, connection: Connection):
+        connection.closed = True
+        self.active_connections.discard(connection)
+        for session_id in connection.session_ids:
+            subscribers = self.subscriptions.get(session_id)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.subscriptions[session_id]
+        if connection.tasks:
+            # In-flight turns roll their sessions back when cancelled
+            Metrics.incr("client_disconnects", transport="ws")
+        for task in list(connection.tasks):
+            task.cancel()
+        Metrics.set_gauge("ws_connections", len(self.active_connections))
+
+    def subscribe(self, connection: Connection, session_id: str) -> bool:
+        if session_id not in connection.session_ids and \
+                len(connection.session_ids) >= settings.WS_MAX_SESSIONS_PER_CONNECTION:
+            return False
+        connection.session_ids.add(session_id)
+        self.subscriptions.setdefault(session_id, set()).add(connection)
+        return True
+
+    async def handle_message(self, connection: Connection, data: Dict):
+        """Dispatch one client frame; turns run as tasks so sessions are multiplexed"""
+        connection.last_received = time.monotonic()
+        action = data.get("action")
+        request_id = data.get("request_id")
+
+        if action == "ping":
+            await connection.send({"event": "pong", "request_id": request_id}, droppable=True)
+        elif action == "pong":
+            pass
+        elif action == "start":
+            self._run(connection, self._start(connection, data.get("role", ""), request_id), request_id)
+        elif action in ("message", "conclude", "subscribe"):
+            session = self._get_session(data.get("session_id"))
+            if session is None:
+                await self._error(connection, request_id, "Session not found", data.get("session_id"))
+            elif not self.subscribe(connection, session.id):
+                await self._error(connection, request_id, "Too many sessions on this connection", session.id)
+            elif action == "message":
+                self._run(connection, self._message(connection, session, data.get("message", ""), request_id), request_id)
+            elif action == "conclude":
+                self._run(connection, self._conclude(connection, session, request_id), request_id)
+            else:
+                await connection.send({"event": "subscribed", "session_id": session.id, "request_id": request_id})
+        else:
+            await self._error(connection, request_id, f"Unknown action: {action}")
+
+    def _run(self, connection: Connection, coro, request_id: Optional[str]):
+        async def guarded():
+            try:
+                await coro
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ [ws] Request failed: {e}")
+                await self._error(connection, request_id, "Internal error")
+        connection.spawn(guarded())
+
+    async def on_report_ready(self, session: InterviewSession):
+        """Push finished feedback reports to every connection driving the session"""
+        frame = {
+            "event": "report",
+            "session_id": session.id,
+            "report_status": session.report_status,
+            "scores": session.scores,
+            "feedback": session.feedback
+        }
+        for connection in list(self.subscriptions.get(session.id, ())):
+            connection.spawn(connection.send(frame))
+
+    async def _start(self, connection: Connection, role: str, request_id: Optional[str]):
+        if not role:
+            await self._error(connection, request_id, "Missing role")
+            return
+
+        if len(connection.session_ids) >= settings.WS_MAX_SESSIONS_PER_CONNECTION:
+            await self._error(connection, request_id, "Too many sessions on this connection")
+            return
+
+        session = create_session(role)
+        self.subscribe(connection, session.id)
+        print(f"\n🚀 [ws] Starting new interview for role: {role}")
+
+        try:
+            async with session_lock(session.id):
+                conversation_manager = ConversationManager(session)
+                result = await conversation_manager.start_interview(
+                    on_token=self._token_sender(connection, session.id, request_id)
+                )
+        except asyncio.CancelledError:
+            # Nobody will ever see the opening question
+            remove_session(session.id)
+            raise
+
+        await connection.send({
+            "event": "started",
+            "session_id": session.id,
+            "request_id": request_id,
+            "data": {"session_id": session.id, **result}
+        })
+
+    async def _message(self, connection: Connection, session: InterviewSession, message: str, request_id: Optional[str]):
+        async with session_lock(session.id):
+            if session.status != "active":
+                await self._error(connection, request_id, "Interview already completed", session.id)
+                return
+            conversation_manager = ConversationManager(session)
+            result = await conversation_manager.process_user_response(
+                message,
+                on_token=self._token_sender(connection, session.id, request_id)
+            )
+
+        await connection.send({"event": "result", "session_id": session.id, "request_id": request_id, "data": result})
+
+    async def _conclude(self, connection: Connection, session: InterviewSession, request_id: Optional[str]):
+        async with session_lock(session.id):
+            if session.status != "active":
+                await self._error(connection, request_id, "Interview already completed", session.id)
+                return
+            conversation_manager = ConversationManager(session)
+            result = await conversation_manager.conclude_interview()
+
+        await connection.send({"event": "result", "session_id": session.id, "request_id": request_id, "data": result})
+
+    @staticmethod
+    def _token_sender(connection: Connection, session_id: str, request_id: Optional[str]):
+        async def on_token(delta: str):
+            await connection.send(
+                {"event": "token", "session_id": session_id, "request_id": request_id, "delta": delta},
+                droppable=True
+            )
+        return on_token
+
+    @staticmethod
+    def _get_session(session_id: Optional[str]) -> Optional[InterviewSession]:
+        return sessions.get(session_id) if session_id else None
+
+    @staticmethod
+    async def _error(connection: Connection, request_id: Optional[str], detail: str, session_id: str = None):
+        await connection.send({"event": "error", "session_id": session_id, "request_id": request_id, "detail": detail})
+
+
+manager = WebSocketManager()
+
+
+@router.websocket("/ws/interview")
+async def interview_socket(websocket: WebSocket):
+    """Persistent interview channel: several sessions per connection, streamed questions, pushed reports"""
+    connection = await manager.connect(websocket)
+    background = [
+        asyncio.create_task(connection.sender()),
+        asyncio.create_task(connection.heartbeat()),
+    ]
+
+    try:
+        while not connection.closed:
+            raw = await websocket.receive_text()
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError:
+                data = None
+            if not isinstance(data, dict):
+                await connection.send({"event": "error", "detail": "Frames must be JSON objects"})
+                continue
+            await manager.handle_message(connection, data)
+    except WebSocketDisconnect:
         pass
+    except Exception as e:
+        print(f"⚠️ WebSocket error: {e}")
+    finally:
+        for task in background:
+            task.cancel()
+        await manager.disconnect(connection)
@@ -17,6 +17,111 @@ class Settings(BaseSettings):
     # Interview Settings
     MAX_QUESTIONS: int = 6
     ENABLE_SEMANTIC_PERSONA: bool = True
+    LEXICON_PATH: str = ""  # defaults to app/data/persona_lexicons.json
+    LEXICON_RELOAD_INTERVAL: float = 5.0  # seconds between change checks, 0 disables hot-reload
+    
+    # Turn generation
+    TURN_MODE: str = "split"  # "split": persona and question calls; "combined": one JSON call returning both (streamed as one piece)
+    
+    # Local persona classifier (distilled from logged LLM labels)
+    PERSONA_LABEL_LOG: str = ""  # JSONL path; empty disables label logging
+    PERSONA_MODEL_DIR: str = "models/persona"
+    PERSONA_MODEL_VERSION: str = ""  # empty disables the local classifier
+    PERSONA_CONFIDENCE_THRESHOLD: float = 0.8
+    
+    # Feedback Reports (built in the background after the final turn)
+    REPORT_WORKERS: int = 2
+    REPORT_QUEUE_SIZE: int = 100
+    REPORT_MAX_WAIT_SECONDS: float = 30.0
+    FEEDBACK_MODE: str = "template"  # "template" or "llm" (one critique per answer)
+    FEEDBACK_LLM_CONCURRENCY: int = 4
+    FEEDBACK_ANSWER_TIMEOUT: float = 8.0
+    FEEDBACK_CACHE_SIZE: int = 2000
+    REPORT_RENDER_CACHE_SIZE: int = 500  # rendered HTML/Markdown reports kept in memory
+    
+    # Admission control (degrade to static question banks under LLM overload)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_INFLIGHT: int = 32
+    ADMISSION_LATENCY_THRESHOLD: float = 8.0  # p90 seconds of recent LLM calls
+    ADMISSION_LATENCY_WINDOW_SECONDS: float = 30.0
+    ADMISSION_MIN_SAMPLES: int = 5
+    ADMISSION_RECOVERY_RATIO: float = 0.7
+    
+    # WebSocket transport
+    WS_SEND_QUEUE_SIZE: int = 64  # frames buffered per connection before backpressure
+    WS_SEND_TIMEOUT: float = 10.0  # close a client that blocks a non-droppable frame this long
+    WS_HEARTBEAT_INTERVAL: float = 20.0
+    WS_IDLE_TIMEOUT: float = 120.0
+    WS_MAX_SESSIONS_PER_CONNECTION: int = 8
+    
+    # Batch evaluation
+    BATCH_PARALLELISM: int = 4
+    BATCH_MAX_PARALLELISM: int = 32
+    
+    # Startup warm-up (GET /ready reports 503 until it finishes)
+    WARMUP_TIMEOUT: float = 20.0
+    WARMUP_CONNECTIONS: int = 2
+    WARMUP_COMPLETION: bool = True
+    
+    # LLM HTTP transport (one pooled client per base URL)
+    LLM_POOL_MAX_CONNECTIONS: int = 100
+    LLM_POOL_MAX_KEEPALIVE: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept open
+    LLM_HTTP2: bool = True  # needs the optional `h2` package, falls back to HTTP/1.1
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_READ_TIMEOUT: float = 60.0
+    LLM_WRITE_TIMEOUT: float = 10.0
+    LLM_POOL_TIMEOUT: float = 10.0  # max wait for a free pooled connection
+    LLM_PROVIDERS: str = ""  # JSON: {"<base_url>": {"api_key_env": "<ENV VAR>"}}
+    
+    # LLM routing (call type -> ordered (base URL, model) targets)
+    LLM_SMALL_MODEL: str = "llama-3.1-8b-instant"  # tried first for persona / follow-up calls; empty disables
+    LLM_ROUTES: str = ""  # JSON: {"<call type>": {"mode": "cascade"|"latency", "targets": [{"model": ..., "base_url": ...}]}}
+    LLM_ROUTER_LATENCY_ALPHA: float = 0.2  # EWMA weight of the newest latency sample
+    LLM_ROUTER_STALE_SECONDS: float = 60.0  # latency routes re-probe targets not used for this long
+    
+    # LLM circuit breakers (per target; open targets are skipped, then callers fall back)
+    LLM_BREAKER_ENABLED: bool = True
+    LLM_BREAKER_WINDOW_SECONDS: float = 30.0  # rolling window of call outcomes
+    LLM_BREAKER_MIN_CALLS: int = 5  # calls in the window before the failure rate counts
+    LLM_BREAKER_FAILURE_RATE: float = 0.5  # failed fraction of the window that opens the breaker
+    LLM_BREAKER_SLOW_SECONDS: float = 15.0  # successful calls slower than this count as failures
+    LLM_BREAKER_OPEN_SECONDS: float = 20.0  # time open before half-open probes are let through
+    LLM_BREAKER_HALF_OPEN_PROBES: int = 1  # concurrent probes, and successes needed to close
+    
+    # Interview traces (replayed by scripts/replay_traces.py)
+    TRACE_LOG: str = ""  # JSONL path; empty disables tracing
+    TRACE_INCLUDE_CONTENT: bool = False  # store scrubbed answer text, not just lengths
+    TRACE_SAMPLE_RATE: float = 1.0  # fraction of sessions traced
+    TRACE_SALT: str = ""  # session id hashing salt; empty uses a random per-process salt
+    
+    # Conversation history storage (recent turns in memory, older turns in cold segments)
+    HISTORY_HOT_TURNS: int = 12  # turns kept in memory; prompt building reads the last 6
+    HISTORY_SEGMENT_TURNS: int = 24  # turns moved to cold storage at a time
+    HISTORY_COLD_DIR: str = ""  # append-only <session>.jsonl segment files; empty keeps segments compressed in memory
+    
+    # Token accounting and per-session budgets
+    SESSION_TOKEN_BUDGET: int = 0  # LLM tokens (prompt + completion) per session; 0 = unlimited
+    TOKEN_BUDGET_TIGHTEN_AT: float = 0.75  # fraction of the budget after which prompts and max_tokens shrink
+    TOKEN_BUDGET_MIN_MAX_TOKENS: int = 48  # max_tokens floor while tightening
+    TOKEN_BUDGET_MIN_WINDOW: int = 2  # prompt history window floor (turns) while tightening
+    
+    # Role catalog (free-text roles resolved to canonical roles at session start)
+    ROLE_CATALOG_PATH: str = ""  # defaults to app/data/role_catalog.json
+    ROLE_MATCH_THRESHOLD: float = 0.5  # minimum trigram similarity for an alias to be checked as a typo
+    ROLE_MATCH_MAX_EDITS: int = 2  # typo edits allowed against aliases of 10+ characters; shorter aliases allow 1
+    ROLE_UNRESOLVED_LOG: str = ""  # JSONL path for roles missing from the catalog; empty disables
+    
+    # Transcript search (SQLite FTS5 index fed as turns complete)
+    TRANSCRIPT_INDEX_PATH: str = "transcript_index.db"  # empty disables indexing and search; ":memory:" keeps it in-process
+    TRANSCRIPT_INDEX_FLUSH_INTERVAL: float = 0.5  # seconds queued turns wait to be written in one batch
+    
+    # Session listing (summary rows written behind to the database, paged by (created_at, id))
+    SESSION_DIRECTORY_ENABLED: bool = True  # write session summaries to DATABASE_URL; False disables GET /api/sessions
+    SESSION_DIRECTORY_FLUSH_INTERVAL: float = 1.0  # seconds changed summaries wait to be written in one batch
+    
+    # Admin API (/api/admin/*)
+    ADMIN_TOKEN: str = ""  # required in the X-Admin-Token header; empty disables the admin routes
     
     # Voice Settings (optional)
     ENABLE_VOICE: bool = False  # ✅ ADDED THIS
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from app.models.session import Base
 from app.config import get_settings
@@ -14,6 +14,30 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _upgrade_schema()
+
+def _upgrade_schema():
+    """Add columns and indexes introduced since an existing database was created.
+
+    create_all skips tables that already exist, indexes included. New columns
+    are all nullable or defaulted, so adding them in place is enough; an index
+    whose columns changed is dropped and recreated.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                    print(f"🛠️ Added column {table.name}.{column.name}")
+            indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in indexes and indexes[index.name] != [column.name for column in index.columns]:
+                    index.drop(conn)
+                    print(f"🛠️ Rebuilding index {index.name}")
+                index.create(conn, checkfirst=True)
 
 def get_db():
     db = SessionLocal()
@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.routes import router
-from app.database.db import init_db
+from app.api.websocket import router as websocket_router
+from app.services.report_queue import ReportQueue
+from app.services.session_directory import SessionDirectory
+from app.services.metrics import Metrics
+from app.services.warmup import Warmup
+from app.services.llm_transport import LLMTransport
 
 app = FastAPI(title="Interview Practice Partner API")
 
@@ -16,17 +22,34 @@ app.add_middleware(
 
 # Include API routes
 app.include_router(router)
+app.include_router(websocket_router)
 
 @app.on_event("startup")
 async def startup_event():
-    print("🚀 Initializing database...")
-    init_db()
-    print("✅ Database initialized!")
+    await ReportQueue.start()
+    # Database, upstream connections, caches and prompt templates are warmed in the background;
+    # /ready reports 503 until that finishes
+    Warmup.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await ReportQueue.stop()
+    await SessionDirectory.flush()
+    await LLMTransport.close()
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    status = Warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/metrics")
+async def metrics():
+    return Metrics.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
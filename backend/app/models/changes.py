@@ -0,0 +1,52 @@
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# History changes remembered for deltas; older `since` versions get a full resync
+TURN_LOG_SIZE = 256
+
+
+class ChangeLog:
+    """In-memory version counter of one session and what changed at each version.
+
+    Every tracked column set and every history change (append, truncate,
+    replace) bumps `version`. Columns remember the version they last changed
+    at; history changes are logged as (version, first affected turn index),
+    so a delta since any recent version is answered without reading the
+    history itself.
+    Versions start over when the process restarts, like the sessions.
+    """
+
+    __slots__ = ("version", "fields", "turns", "floor")
+
+    def __init__(self):
+        self.version = 0
+        self.fields: Dict[str, int] = {}
+        self.turns = deque(maxlen=TURN_LOG_SIZE)
+        self.floor = 0  # versions at or below this may have lost history entries
+
+    def field_changed(self, column: str):
+        self.version += 1
+        self.fields[column] = self.version
+
+    def turns_changed(self, index: int):
+        """The history changed from turn `index` on"""
+        self.version += 1
+        if len(self.turns) == self.turns.maxlen:
+            self.floor = self.turns[0][0]
+        self.turns.append((self.version, index))
+
+    def since(self, version: int) -> Tuple[bool, Optional[int], List[str]]:
+        """(full resync?, first changed turn index or None, changed columns) after `version`.
+
+        A full resync (unknown or forgotten version) means every turn and column.
+        """
+        if version < self.floor or version > self.version:
+            return True, 0, []
+
+        first_turn = None
+        for changed_at, index in reversed(self.turns):
+            if changed_at <= version:
+                break
+            first_turn = index if first_turn is None else min(first_turn, index)
+        fields = [name for name, changed_at in self.fields.items() if changed_at > version]
+        return False, first_turn, fields
@@ -0,0 +1,192 @@
+import json
+import os
+import re
+import zlib
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+from app.config import get_settings
+from app.models.turn import Turn
+
+settings = get_settings()
+
+_UNSAFE_KEY = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ColdSegments:
+    """Append-only store for turns that left the hot window.
+
+    A segment is one line holding a JSON array of turn dicts (the API shape).
+    Segments are zlib-compressed in memory, or appended to
+    `<HISTORY_COLD_DIR>/<key>.jsonl` when that is set. The file is created
+    exclusively, never truncated: if it exists (another history with the same
+    key) or a write fails, the session keeps its remaining segments in memory
+    (file segments always precede memory ones, so order is preserved).
+    """
+
+    __slots__ = ("path", "segments", "count", "on_disk")
+
+    def __init__(self, key: Optional[str] = None):
+        self.path = None
+        if settings.HISTORY_COLD_DIR and key:
+            self.path = os.path.join(settings.HISTORY_COLD_DIR, _UNSAFE_KEY.sub("_", key) + ".jsonl")
+        self.segments: List[bytes] = []
+        self.count = 0
+        self.on_disk = 0  # segments in the file, which this history (re)started
+
+    def append(self, turns: List[Turn]):
+        line = json.dumps([turn.to_dict() for turn in turns]).encode("utf-8")
+        self.count += len(turns)
+        if self.path is not None and not self.segments:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "ab" if self.on_disk else "xb") as f:
+                    f.write(line + b"\n")
+                self.on_disk += 1
+                return
+            except OSError as e:
+                print(f"⚠️ Could not write history segment to {self.path}: {e}; keeping it in memory")
+        # Level 1: segments are written on the turn path, compression speed matters more than ratio
+        self.segments.append(zlib.compress(line, 1))
+
+    def lines(self) -> Iterator[bytes]:
+        """Each segment's JSON array, oldest first"""
+        if self.on_disk:
+            with open(self.path, "rb") as f:
+                for _, line in zip(range(self.on_disk), f):
+                    yield line.rstrip(b"\n")
+        for segment in self.segments:
+            yield zlib.decompress(segment)
+
+    def dicts(self) -> Iterator[Dict[str, Any]]:
+        for line in self.lines():
+            yield from json.loads(line)
+
+    def __iter__(self) -> Iterator[Turn]:
+        for entry in self.dicts():
+            yield Turn.from_dict(entry)
+
+    def discard(self):
+        self.segments = []
+        self.count = 0
+        if self.on_disk:
+            self.on_disk = 0
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                print(f"⚠️ Could not remove history segments {self.path}: {e}")
+
+
+class ConversationHistory:
+    """The single canonical history of a session: recent Turns in memory, older ones cold.
+
+    The last HISTORY_HOT_TURNS turns live in a ring buffer; once the buffer
+    holds HISTORY_SEGMENT_TURNS more than that, the oldest segment is written
+    to ColdSegments, so recording a turn costs the same at any interview
+    length. Negative indices and slices inside the hot window (`history[-6:]`,
+    what prompt building and persona detection read) never touch cold storage;
+    iterating, `transcript()` and other indexing load the full history lazily.
+
+    Dicts appended in the old history shape are converted to Turns. Use
+    `to_list()` / `to_json()` for the API/JSON shape.
+
+    `on_change`, when set, is called with the index of the first turn an
+    append, truncate or discard affected.
+    """
+
+    __slots__ = ("hot", "cold", "hot_turns", "segment_turns", "on_change")
+
+    def __init__(self, turns: Iterable = (), key: Optional[str] = None):
+        self.hot = deque()
+        self.cold = ColdSegments(key)
+        self.hot_turns = max(settings.HISTORY_HOT_TURNS, 1)
+        self.segment_turns = max(settings.HISTORY_SEGMENT_TURNS, 1)
+        self.on_change: Optional[Callable[[int], None]] = None
+        self.extend(turns)
+
+    def append(self, turn: Union[Turn, Dict]):
+        if self.on_change is not None:
+            self.on_change(len(self))
+        self.hot.append(_as_turn(turn))
+        if len(self.hot) >= self.hot_turns + self.segment_turns:
+            self.cold.append([self.hot.popleft() for _ in range(self.segment_turns)])
+
+    def extend(self, turns: Iterable):
+        for turn in turns:
+            self.append(turn)
+
+    def __len__(self) -> int:
+        return self.cold.count + len(self.hot)
+
+    def __bool__(self) -> bool:
+        return bool(self.hot) or self.cold.count > 0
+
+    def __iter__(self) -> Iterator[Turn]:
+        yield from self.cold
+        yield from list(self.hot)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.start, index.stop, index.step
+            if start is not None and -len(self.hot) <= start < 0 and stop is None and step is None:
+                return list(self.hot)[start:]
+            return self.transcript()[index]
+        if -len(self.hot) <= index < 0:
+            return self.hot[index]
+        return self.transcript()[index]
+
+    def recent(self, count: int) -> List[Turn]:
+        """The last `count` turns (at most the hot window) without loading cold storage"""
+        return list(self.hot)[-count:] if count > 0 else []
+
+    def transcript(self) -> List[Turn]:
+        """Every turn, oldest first (reads cold storage)"""
+        return list(self)
+
+    def dicts_from(self, index: int) -> List[Dict[str, Any]]:
+        """Turns from `index` on in the API shape; only reads cold storage if `index` is older than the hot window"""
+        if index >= self.cold.count:
+            return [turn.to_dict() for turn in list(self.hot)[index - self.cold.count:]]
+        return self.to_list()[index:]
+
+    def truncate(self, length: int):
+        """Drop every turn after the first `length` (rolls back a cancelled turn)"""
+        if length >= len(self):
+            return
+        if self.on_change is not None:
+            self.on_change(length)
+        if length >= self.cold.count:
+            while len(self) > length:
+                self.hot.pop()
+            return
+        # The turn pushed a segment to cold storage: rebuild from the kept turns
+        kept = self.transcript()[:length]
+        on_change, self.on_change = self.on_change, None
+        self.discard()
+        self.extend(kept)
+        self.on_change = on_change
+
+    def discard(self):
+        """Drop the history and delete its cold segments"""
+        if self.on_change is not None:
+            self.on_change(0)
+        self.hot.clear()
+        self.cold.discard()
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        # Cold segments are already in the API shape; skip the Turn round trip
+        return list(self.cold.dicts()) + [turn.to_dict() for turn in self.hot]
+
+    def to_json(self) -> str:
+        """Same text as json.dumps(self.to_list()), splicing the cold segments in as they are"""
+        items = [line[1:-1].decode("utf-8") for line in self.cold.lines()]
+        if self.hot:
+            items.append(json.dumps([turn.to_dict() for turn in self.hot])[1:-1])
+        return "[" + ", ".join(items) + "]"
+
+    @classmethod
+    def from_json(cls, text: Optional[str], key: Optional[str] = None) -> "ConversationHistory":
+        return cls(json.loads(text) if text else (), key=key)
+
+
+def _as_turn(turn: Union[Turn, Dict]) -> Turn:
+    return turn if isinstance(turn, Turn) else Turn.from_dict(turn)
@@ -1,37 +1,129 @@
-from sqlalchemy import Column, String, DateTime, Text, Integer
+from sqlalchemy import Column, String, DateTime, Text, Integer, Index, event
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
+from app.models.changes import ChangeLog
+from app.models.history import ConversationHistory
 import json
 import uuid
 
 Base = declarative_base()
 
+# Columns whose changes are versioned for conditional/delta reads -> field name in the API
+TRACKED_FIELDS = {
+    "role": "role",
+    "role_display": "role_display",
+    "status": "status",
+    "persona": "persona",
+    "current_question_index": "current_question",
+    "completed_at": "completed_at",
+    "report_status": "report_status",
+    "degraded_turns": "degraded_turns",
+    "_scores": "scores",
+    "_feedback": "feedback",
+    "_token_usage": "token_usage",
+}
+
+# Columns a session listing returns and SessionDirectory writes; never the transcript / feedback blobs
+SUMMARY_COLUMNS = (
+    "id",
+    "role",
+    "role_display",
+    "status",
+    "persona",
+    "current_question_index",
+    "created_at",
+    "completed_at",
+    "report_status",
+    "degraded_turns",
+)
+
+
+def _listing_index(name: str, *key: str) -> Index:
+    """Index on `key` that also holds every other summary column, so a listing page never reads the table"""
+    return Index(name, *key, *[column for column in SUMMARY_COLUMNS if column not in key])
+
+
 class InterviewSession(Base):
     __tablename__ = "interview_sessions"
+    __table_args__ = (
+        # Session listing: newest first, keyset-paged by (created_at, id), optionally filtered (see SessionDirectory)
+        _listing_index("ix_interview_sessions_created", "created_at", "id"),
+        _listing_index("ix_interview_sessions_status_created", "status", "created_at", "id"),
+        _listing_index("ix_interview_sessions_role_created", "role", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    role = Column(String, nullable=False)
+    role = Column(String, nullable=False)  # canonical catalog role (normalized input if unresolved)
+    role_display = Column(String, nullable=True)  # role as the candidate typed it
     status = Column(String, default="active")
     persona = Column(String, default="neutral")
     current_question_index = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+    report_status = Column(String, nullable=True)  # pending / ready / failed
+    degraded_turns = Column(Integer, default=0)  # turns served without the LLM under overload
     
-    # JSON fields stored as text
+    # JSON fields stored as text; listings never read them (their indexes cover SUMMARY_COLUMNS),
+    # whatever the column order (upgraded databases have the newer summary columns after these)
     _conversation_history = Column("conversation_history", Text, default="[]")
     _scores = Column("scores", Text, nullable=True)
     _feedback = Column("feedback", Text, nullable=True)
     _persona_history = Column("persona_history", Text, default="[]")
     _asked_questions = Column("asked_questions", Text, default="[]")
+    _token_usage = Column("token_usage", Text, nullable=True)  # LLM tokens spent, see TokenAccounting
     
     # Python properties for easy access
+    @property
+    def prompt_role(self) -> str:
+        """The role as the candidate typed it, for prompt text; `role` stays the key for banks, filters and indexes"""
+        return self.role_display or self.role
+    
+    @property
+    def history(self) -> ConversationHistory:
+        """The session's one canonical history (Turns), appended to in place.
+
+        Built from the JSON column on first access; the column is only
+        rewritten when the row is flushed to the database.
+        """
+        history = self.__dict__.get("_history")
+        if history is None:
+            history = ConversationHistory.from_json(self._conversation_history, key=self.id)
+            history.on_change = self.changes.turns_changed
+            self.__dict__["_history"] = history
+        return history
+    
     @property
     def conversation_history(self):
-        return json.loads(self._conversation_history) if self._conversation_history else []
+        """History in the API/JSON shape (a fresh list of dicts)"""
+        return self.history.to_list()
     
     @conversation_history.setter
     def conversation_history(self, value):
-        self._conversation_history = json.dumps(value) if value else "[]"
+        turns = list(value or [])  # before the replaced history's cold segment file is deleted
+        self.discard_history()
+        history = ConversationHistory(turns, key=self.id)
+        history.on_change = self.changes.turns_changed
+        self.changes.turns_changed(0)
+        self.__dict__["_history"] = history
+
+    @property
+    def changes(self) -> ChangeLog:
+        """In-memory version counter (ETags, deltas); not persisted"""
+        changes = self.__dict__.get("_changes")
+        if changes is None:
+            changes = ChangeLog()
+            self.__dict__["_changes"] = changes
+        return changes
+
+    @property
+    def version(self) -> int:
+        return self.changes.version
+
+    def discard_history(self):
+        """Drop the in-memory history and delete its cold segments"""
+        history = self.__dict__.pop("_history", None)
+        if history is not None:
+            history.discard()
     
     @property
     def scores(self):
@@ -64,3 +156,29 @@ class InterviewSession(Base):
     @asked_questions.setter
     def asked_questions(self, value):
         self._asked_questions = json.dumps(value) if value else "[]"
+    
+    @property
+    def token_usage(self):
+        return json.loads(self._token_usage) if self._token_usage else {}
+    
+    @token_usage.setter
+    def token_usage(self, value):
+        self._token_usage = json.dumps(value) if value else None
+
+
+def _track(column: str):
+    def field_changed(target: InterviewSession, value, oldvalue, initiator):
+        target.changes.field_changed(column)
+    event.listen(getattr(InterviewSession, column), "set", field_changed)
+
+
+for _column in TRACKED_FIELDS:
+    _track(_column)
+
+
+@event.listens_for(InterviewSession, "before_insert")
+@event.listens_for(InterviewSession, "before_update")
+def _serialize_history(mapper, connection, target: InterviewSession):
+    history = target.__dict__.get("_history")
+    if history is not None:
+        target._conversation_history = history.to_json()
@@ -0,0 +1,248 @@
+import sys
+import time
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Union
+
+
+class Speaker:
+    """Values of a turn's "role"; stored interned, compare with == (not is)"""
+    USER = "user"
+    ASSISTANT = "assistant"
+
+
+class Persona:
+    """Interview personas detected for answers and adapted to by questions"""
+    CONFUSED = "confused"
+    EFFICIENT = "efficient"
+    CHATTY = "chatty"
+    EDGE = "edge"
+    NEUTRAL = "neutral"
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MISSING = object()
+_FEATURE_KEYS = frozenset(("word_count", "sentence_count", "question_marks", "hits"))
+_NO_HITS = MappingProxyType({})
+# History dict keys held in Turn slots (plus the speaker's persona key)
+_DICT_KEYS = frozenset(("role", "content", "timestamp", "type", "degraded", "features"))
+
+
+def utc_now_us() -> int:
+    """Current UTC time as integer epoch microseconds"""
+    return time.time_ns() // 1000
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Speaker, persona and type values repeat on every turn; interning shares one string object"""
+    return sys.intern(value) if value is not None else None
+
+
+def _parse_timestamp(value: str) -> Union[int, str]:
+    """Naive ISO timestamps (datetime.utcnow().isoformat()) become epoch microseconds;
+    anything that wouldn't format back identically is kept as the original string"""
+    # isoformat() output is 19 characters, or 26 with non-zero microseconds
+    if not isinstance(value, str) or len(value) not in (19, 26) or value[10] != "T":
+        return value
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if (len(value) == 26) != bool(parsed.microsecond):
+        return value
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+class TurnFeatures:
+    """Answer features (see AnswerFeatures) in four slots instead of two dicts.
+
+    Reads like the features dict (`features["word_count"]`, `features["hits"]`);
+    answers without lexicon hits share one read-only empty mapping.
+    """
+
+    __slots__ = ("word_count", "sentence_count", "question_marks", "hits")
+
+    def __init__(self, word_count: int, sentence_count: int, question_marks: int, hits: Optional[Dict[str, int]] = None):
+        self.word_count = word_count
+        self.sentence_count = sentence_count
+        self.question_marks = question_marks
+        self.hits = hits or None
+
+    def __getitem__(self, key: str):
+        if key == "hits":
+            return self.hits if self.hits is not None else _NO_HITS
+        if key in _FEATURE_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "word_count": self.word_count,
+            "sentence_count": self.sentence_count,
+            "question_marks": self.question_marks,
+            "hits": dict(self.hits) if self.hits else {}
+        }
+
+    @classmethod
+    def coerce(cls, features) -> Union["TurnFeatures", Dict, None]:
+        """TurnFeatures from a features dict; dicts with other keys are kept as they are"""
+        if features is None or isinstance(features, TurnFeatures) or set(features) != _FEATURE_KEYS:
+            return features
+        return cls(features["word_count"], features["sentence_count"], features["question_marks"], features["hits"])
+
+
+class Turn:
+    """One conversation turn, stored compactly.
+
+    Speaker, persona and type are interned strings (see Speaker / Persona),
+    the timestamp is integer epoch microseconds, features are a TurnFeatures
+    and absent fields cost one slot each. Hot paths read the
+    attributes; `turn["content"]` / `turn.get("role")` still work as on the
+    history dicts, and `to_dict()` returns exactly that API/JSON shape:
+        {"role", "content", "timestamp"?, "type"?, "persona_detected" (user) |
+         "persona_adapted" (assistant)?, "degraded"?, "features"?, ...extra}
+    Unknown keys are kept in `extra` so older histories round-trip losslessly.
+    """
+
+    __slots__ = ("speaker", "content", "ts", "kind", "persona", "degraded", "features", "extra")
+
+    def __init__(
+        self,
+        speaker: str,
+        content: str,
+        ts: Union[int, str, None] = None,
+        kind: Optional[str] = None,
+        persona: Optional[str] = None,
+        degraded: Optional[bool] = None,
+        features=None,
+        extra: Optional[Dict[str, Any]] = None
+    ):
+        self.speaker = _intern(speaker)
+        self.content = content
+        self.ts = ts
+        self.kind = _intern(kind)
+        self.persona = _intern(persona)
+        self.degraded = degraded
+        self.features = TurnFeatures.coerce(features)
+        self.extra = extra
+
+    @property
+    def persona_key(self) -> str:
+        return "persona_detected" if self.speaker == Speaker.USER else "persona_adapted"
+
+    @property
+    def timestamp(self) -> Optional[str]:
+        if isinstance(self.ts, int):
+            return (_EPOCH + self.ts * _MICROSECOND).isoformat()
+        return self.ts
+
+    # --- dict-style access, in the shape of the history dicts ---
+
+    def _field(self, key: str):
+        reader = _READERS.get(key)
+        if reader is not None:
+            return reader(self)
+        if self.extra is not None:
+            return self.extra.get(key, _MISSING)
+        return _MISSING
+
+    def get(self, key: str, default=None):
+        value = self._field(key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str):
+        value = self._field(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._field(key) is not _MISSING
+
+    def __setitem__(self, key: str, value):
+        if key == "content":
+            self.content = value
+        elif key == "timestamp":
+            self.ts = _parse_timestamp(value) if value is not None else None
+        elif key == "type":
+            self.kind = _intern(value)
+        elif key == self.persona_key:
+            self.persona = _intern(value)
+        elif key == "degraded":
+            self.degraded = value
+        elif key == "features":
+            self.features = TurnFeatures.coerce(value)
+        elif key == "role":
+            self.speaker = _intern(value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {"role": self.speaker, "content": self.content}
+        if self.ts is not None:
+            entry["timestamp"] = self.timestamp
+        if self.kind is not None:
+            entry["type"] = self.kind
+        if self.persona is not None:
+            entry[self.persona_key] = self.persona
+        if self.degraded is not None:
+            entry["degraded"] = self.degraded
+        if self.features is not None:
+            entry["features"] = self.features.to_dict() if isinstance(self.features, TurnFeatures) else self.features
+        if self.extra:
+            entry.update(self.extra)
+        return entry
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> "Turn":
+        speaker = entry["role"]
+        persona_key = "persona_detected" if speaker == Speaker.USER else "persona_adapted"
+        timestamp = entry.get("timestamp")
+        extra = {key: value for key, value in entry.items() if key not in _DICT_KEYS and key != persona_key}
+        return cls(
+            speaker,
+            entry.get("content", ""),
+            ts=_parse_timestamp(timestamp) if timestamp is not None else None,
+            kind=entry.get("type"),
+            persona=entry.get(persona_key),
+            degraded=entry.get("degraded"),
+            features=entry.get("features"),
+            extra=extra or None
+        )
+
+    def __repr__(self) -> str:
+        return f"Turn({self.speaker}, {self.content[:30]!r}, persona={self.persona})"
+
+
+def _optional(value):
+    return value if value is not None else _MISSING
+
+
+def _read_persona_for(speaker: str):
+    def read(turn: Turn):
+        if turn.persona is None or turn.speaker != speaker:
+            return _MISSING
+        return turn.persona
+    return read
+
+
+# Dict key of the history shape -> reader used by Turn's dict-style access
+_READERS = {
+    "role": lambda turn: turn.speaker,
+    "content": lambda turn: turn.content,
+    "timestamp": lambda turn: turn.timestamp if turn.ts is not None else _MISSING,
+    "type": lambda turn: _optional(turn.kind),
+    "persona_detected": _read_persona_for(Speaker.USER),
+    "persona_adapted": _read_persona_for(Speaker.ASSISTANT),
+    "degraded": lambda turn: _optional(turn.degraded),
+    "features": lambda turn: _optional(turn.features),
+}
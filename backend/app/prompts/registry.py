@@ -0,0 +1,95 @@
+"""
+Prompt registry: precompiled, memoized templates with a stable cacheable prefix
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+from app.prompts.system_prompts import (
+    INTERVIEWER_INSTRUCTIONS, get_interviewer_context,
+    QUESTION_INSTRUCTIONS, QUESTION_CONTEXT,
+    PERSONA_CLASSIFICATION_INSTRUCTIONS,
+    TURN_INSTRUCTIONS, TURN_CONTEXT,
+    FOLLOWUP_INSTRUCTIONS, FOLLOWUP_CONTEXT,
+    ANSWER_FEEDBACK_INSTRUCTIONS, ANSWER_FEEDBACK_CONTEXT,
+    FEEDBACK_SUMMARY_INSTRUCTIONS, FEEDBACK_SUMMARY_CONTEXT,
+)
+from app.services.metrics import Metrics
+
+# call type -> (shared instructions, role/persona context template or None)
+CALL_TEMPLATES = {
+    "interviewer": (INTERVIEWER_INSTRUCTIONS, get_interviewer_context),
+    "question": (QUESTION_INSTRUCTIONS, QUESTION_CONTEXT),
+    "persona": (PERSONA_CLASSIFICATION_INSTRUCTIONS, None),
+    "turn": (TURN_INSTRUCTIONS, TURN_CONTEXT),
+    "followup": (FOLLOWUP_INSTRUCTIONS, FOLLOWUP_CONTEXT),
+    "answer_feedback": (ANSWER_FEEDBACK_INSTRUCTIONS, ANSWER_FEEDBACK_CONTEXT),
+    "feedback_summary": (FEEDBACK_SUMMARY_INSTRUCTIONS, FEEDBACK_SUMMARY_CONTEXT),
+}
+
+# Call types whose static block varies by persona (others are keyed by role only)
+PERSONA_CALL_TYPES = {"interviewer", "question", "followup"}
+
+
+@lru_cache(maxsize=2048)
+def _compile_prefix(call_type: str, role: str, persona: str) -> Tuple[Tuple[Tuple[str, str], ...], int]:
+    """Static messages for (call type, role, persona) and their size in bytes"""
+    instructions, context = CALL_TEMPLATES[call_type]
+
+    parts = [("system", instructions)]
+    if callable(context):
+        parts.append(("system", context(role, persona)))
+    elif context:
+        parts.append(("system", context.format(role=role, persona=persona)))
+
+    size = sum(len(content.encode("utf-8")) for _, content in parts)
+    return tuple(parts), size
+
+
+class PromptRegistry:
+    """Builds chat messages in a fixed layout:
+
+        1. system: shared instructions for the call type (byte-identical across sessions)
+        2. system: role/persona block (identical for every session with that role + persona)
+        3. user:   volatile text (history, current answer) - always last
+
+    Static parts are compiled once per (call type, role, persona) and reused, so
+    per-call work is limited to the volatile text. Prompt sizes are reported to
+    Metrics as `prompt_bytes` / `prompt_static_bytes` per call type.
+    """
+
+    @staticmethod
+    def build(call_type: str, volatile: str, role: str = "", persona: str = "") -> List[Dict[str, str]]:
+        if call_type not in PERSONA_CALL_TYPES:
+            persona = ""
+        prefix, static_bytes = _compile_prefix(call_type, role, persona)
+
+        messages = [{"role": message_role, "content": content} for message_role, content in prefix]
+        messages.append({"role": "user", "content": volatile})
+
+        total_bytes = static_bytes + len(volatile.encode("utf-8"))
+        Metrics.observe("prompt_bytes", total_bytes, call_type=call_type)
+        Metrics.observe("prompt_static_bytes", static_bytes, call_type=call_type)
+        return messages
+
+    @staticmethod
+    def precompile(roles: Iterable[str], personas: Iterable[str]) -> int:
+        """Warm the template cache for known roles/personas; returns templates compiled"""
+        personas = list(personas)
+        compiled = 0
+        for call_type, (_, context) in CALL_TEMPLATES.items():
+            if context is None:
+                _compile_prefix(call_type, "", "")
+                compiled += 1
+                continue
+            for role in roles:
+                for persona in (personas if call_type in PERSONA_CALL_TYPES else [""]):
+                    _compile_prefix(call_type, role, persona)
+                    compiled += 1
+        return compiled
+
+    @staticmethod
+    def cache_info() -> Dict[str, int]:
+        info = _compile_prefix.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+Metrics.register_collector("prompt_registry", PromptRegistry.cache_info)
@@ -0,0 +1,109 @@
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+from app.config import get_settings
+from app.services.metrics import Metrics
+
+settings = get_settings()
+
+
+class AdmissionController:
+    """Decides per turn whether the LLM path is admitted or the turn runs degraded.
+
+    Tracks in-flight LLM calls and the p90 latency of calls finished in the last
+    ADMISSION_LATENCY_WINDOW_SECONDS. Degraded mode starts when either signal
+    crosses its threshold and ends once both are below threshold *
+    ADMISSION_RECOVERY_RATIO (hysteresis, so the mode doesn't flap). Latency
+    samples age out, so recovery is possible while degraded turns make no calls.
+    """
+
+    _inflight = 0
+    _samples: Deque[Tuple[float, float]] = deque(maxlen=2000)  # (finished_at, seconds)
+    _degraded = False
+    _degraded_since: Optional[float] = None
+    _degraded_seconds = 0.0
+
+    @classmethod
+    @asynccontextmanager
+    async def track_call(cls):
+        """Wrap every upstream LLM call"""
+        cls._inflight += 1
+        Metrics.set_gauge("llm_inflight", cls._inflight)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            cls._inflight -= 1
+            finished = time.monotonic()
+            cls._samples.append((finished, finished - started))
+            Metrics.set_gauge("llm_inflight", cls._inflight)
+
+    @classmethod
+    def should_degrade(cls) -> bool:
+        """Evaluate load and return True if a new turn must use the degraded path"""
+        if not settings.ADMISSION_ENABLED:
+            return False
+
+        inflight = cls._inflight
+        latency = cls._recent_p90()
+
+        if not cls._degraded:
+            overloaded = inflight >= settings.ADMISSION_MAX_INFLIGHT or \
+                (latency is not None and latency >= settings.ADMISSION_LATENCY_THRESHOLD)
+            if overloaded:
+                cls._enter(inflight, latency)
+        else:
+            ratio = settings.ADMISSION_RECOVERY_RATIO
+            recovered = inflight <= settings.ADMISSION_MAX_INFLIGHT * ratio and \
+                (latency is None or latency <= settings.ADMISSION_LATENCY_THRESHOLD * ratio)
+            if recovered:
+                cls._exit(inflight, latency)
+
+        return cls._degraded
+
+    @classmethod
+    def record_turn(cls, degraded: bool):
+        Metrics.incr("turns_total", mode="degraded" if degraded else "normal")
+
+    @classmethod
+    def status(cls) -> Dict:
+        degraded_seconds = cls._degraded_seconds
+        if cls._degraded and cls._degraded_since is not None:
+            degraded_seconds += time.monotonic() - cls._degraded_since
+        return {
+            "degraded": cls._degraded,
+            "inflight": cls._inflight,
+            "recent_p90_seconds": cls._recent_p90(),
+            "degraded_seconds_total": round(degraded_seconds, 3)
+        }
+
+    @classmethod
+    def _recent_p90(cls) -> Optional[float]:
+        cutoff = time.monotonic() - settings.ADMISSION_LATENCY_WINDOW_SECONDS
+        while cls._samples and cls._samples[0][0] < cutoff:
+            cls._samples.popleft()
+        if len(cls._samples) < settings.ADMISSION_MIN_SAMPLES:
+            return None
+        latencies = sorted(seconds for _, seconds in cls._samples)
+        return latencies[min(len(latencies) - 1, int(0.9 * len(latencies)))]
+
+    @classmethod
+    def _enter(cls, inflight: int, latency: Optional[float]):
+        cls._degraded = True
+        cls._degraded_since = time.monotonic()
+        Metrics.incr("admission_degraded_entered")
+        Metrics.set_gauge("admission_degraded", 1)
+        print(f"🚦 Entering degraded mode (in-flight: {inflight}, p90 latency: {latency})")
+
+    @classmethod
+    def _exit(cls, inflight: int, latency: Optional[float]):
+        if cls._degraded_since is not None:
+            cls._degraded_seconds += time.monotonic() - cls._degraded_since
+        cls._degraded = False
+        cls._degraded_since = None
+        Metrics.set_gauge("admission_degraded", 0)
+        print(f"🟢 Leaving degraded mode (in-flight: {inflight}, p90 latency: {latency})")
+
+
+Metrics.register_collector("admission", AdmissionController.status)
@@ -0,0 +1,42 @@
+from typing import Dict
+import re
+from app.models.turn import Turn, TurnFeatures
+from app.services.lexicon_engine import LexiconEngine
+
+_SENTENCE_SPLIT = re.compile(r"[.!?]+")
+
+
+class AnswerFeatures:
+    """Text features computed once per user turn and stored on the turn record.
+
+    Shape (stored under the turn's "features" key):
+        {"word_count": 42, "sentence_count": 3, "question_marks": 1, "hits": {"confused": 2}}
+
+    `hits` counts distinct lexicon phrases found in the lower-cased text and
+    only lists lexicons with at least one hit.
+    """
+
+    @staticmethod
+    def extract(text: str) -> Dict:
+        """Tokenize and scan the answer once"""
+        hits = LexiconEngine.count_hits(text.lower())
+
+        return {
+            "word_count": len(text.split()),
+            "sentence_count": sum(1 for part in _SENTENCE_SPLIT.split(text) if part.strip()),
+            "question_marks": text.count("?"),
+            "hits": hits
+        }
+
+    @staticmethod
+    def of(turn: Turn) -> TurnFeatures:
+        """Features of a history turn; computed and stored on the turn if missing (older histories)"""
+        features = turn.features
+        if not isinstance(features, TurnFeatures):
+            features = TurnFeatures.coerce(AnswerFeatures.extract(turn.content))
+            turn.features = features
+        return features
+
+    @staticmethod
+    def hit_count(features: Dict, lexicon: str) -> int:
+        return features["hits"].get(lexicon, 0)
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List
+from app.config import get_settings
+from app.models.turn import Speaker
+from app.services.conversation_manager import ConversationManager
+from app.services.report_queue import ReportQueue
+from app.services.session_store import new_session
+
+settings = get_settings()
+
+
+class BatchRunner:
+    """Run scripted interviews (role + ordered answers) concurrently through ConversationManager.
+
+    Batch sessions are private to their run: they are not registered in the
+    session store, listed by SessionDirectory or indexed for transcript
+    search, and are dropped once their result is built.
+    """
+
+    @staticmethod
+    async def run(
+        scripts: List[Dict],
+        parallelism: int = None,
+        wait_for_report: bool = False
+    ) -> AsyncIterator[Dict]:
+        """Yield one result per session as it completes, then an aggregate summary"""
+        parallelism = max(1, min(parallelism or settings.BATCH_PARALLELISM, settings.BATCH_MAX_PARALLELISM))
+        semaphore = asyncio.Semaphore(parallelism)
+        started = time.perf_counter()
+
+        async def bounded(index: int, script: Dict) -> Dict:
+            async with semaphore:
+                return await BatchRunner.run_script(index, script, wait_for_report)
+
+        print(f"📦 Batch of {len(scripts)} sessions, parallelism {parallelism}")
+        tasks = [asyncio.create_task(bounded(i, script)) for i, script in enumerate(scripts)]
+
+        results = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                results.append(result)
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        yield BatchRunner._summary(results, time.perf_counter() - started, parallelism)
+
+    @staticmethod
+    async def run_script(index: int, script: Dict, wait_for_report: bool = False) -> Dict:
+        session = new_session(script["role"])
+        result = {
+            "type": "session",
+            "index": index,
+            "id": script.get("id", str(index)),
+            "session_id": session.id,
+            "role": session.role
+        }
+        turn_seconds = []
+        started = time.perf_counter()
+
+        try:
+            conversation_manager = ConversationManager(session, index_turns=False)
+            turn_started = time.perf_counter()
+            await conversation_manager.start_interview()
+            turn_seconds.append(time.perf_counter() - turn_started)
+
+            outcome = {}
+            for answer in script.get("answers", []):
+                turn_started = time.perf_counter()
+                outcome = await conversation_manager.process_user_response(answer)
+                turn_seconds.append(time.perf_counter() - turn_started)
+                if outcome.get("interview_complete"):
+                    break
+
+            if not outcome.get("interview_complete") and script.get("conclude", True):
+                turn_started = time.perf_counter()
+                outcome = await conversation_manager.conclude_interview()
+                turn_seconds.append(time.perf_counter() - turn_started)
+
+            if wait_for_report and session.report_status == "pending":
+                await ReportQueue.wait_for_report(session.id, settings.REPORT_MAX_WAIT_SECONDS)
+
+            answers = [m for m in conversation_manager.conversation_history if m.speaker == Speaker.USER]
+            result.update({
+                "status": session.status,
+                "turns": len(turn_seconds),
+                "answers_used": len(answers),
+                "personas": [m.persona for m in answers],
+                "scores": session.scores,
+                "report_status": session.report_status
+            })
+            if wait_for_report:
+                result["feedback"] = session.feedback
+        except Exception as e:
+            print(f"❌ Batch session {result['id']} failed: {e}")
+            result.update({"status": "error", "error": str(e), "turns": len(turn_seconds)})
+        finally:
+            # Cold history segments, if any; a pending report already holds its transcript
+            session.discard_history()
+
+        result["seconds"] = round(time.perf_counter() - started, 4)
+        result["turn_seconds"] = [round(t, 4) for t in turn_seconds]
+        return result
+
+    @staticmethod
+    def _summary(results: List[Dict], wall_seconds: float, parallelism: int) -> Dict:
+        durations = sorted(r["seconds"] for r in results)
+        turns = sum(r.get("turns", 0) for r in results)
+
+        def pct(p: float) -> float:
+            return durations[min(len(durations) - 1, int(p * len(durations)))] if durations else 0.0
+
+        return {
+            "type": "summary",
+            "sessions": len(results),
+            "failed": sum(1 for r in results if r.get("status") == "error"),
+            "parallelism": parallelism,
+            "wall_seconds": round(wall_seconds, 4),
+            "sessions_per_second": round(len(results) / wall_seconds, 3) if wall_seconds else 0.0,
+            "turns_per_second": round(turns / wall_seconds, 3) if wall_seconds else 0.0,
+            "session_seconds_p50": pct(0.50),
+            "session_seconds_p95": pct(0.95),
+            "session_seconds_max": durations[-1] if durations else 0.0
+        }
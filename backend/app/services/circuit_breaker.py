@@ -0,0 +1,168 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+from app.config import get_settings
+from app.services.metrics import Metrics
+from app.services.model_router import _target_key
+
+settings = get_settings()
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Every target of a call is behind an open breaker"""
+
+
+class _Breaker:
+    __slots__ = ("state", "outcomes", "opened_at", "probes", "probe_successes", "rejected")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.outcomes: Deque[Tuple[float, bool]] = deque(maxlen=1000)  # (finished_at, failed)
+        self.opened_at = 0.0
+        self.probes = 0  # half-open calls in flight
+        self.probe_successes = 0
+        self.rejected = 0
+
+
+class CircuitBreaker:
+    """Per-target (model @ base URL) circuit breakers shared by every call type.
+
+    - closed: calls pass; outcomes of the last LLM_BREAKER_WINDOW_SECONDS are
+      kept. A call fails when it errors or takes longer than
+      LLM_BREAKER_SLOW_SECONDS. Once the window holds LLM_BREAKER_MIN_CALLS
+      calls and their failure rate reaches LLM_BREAKER_FAILURE_RATE, the
+      breaker opens.
+    - open: calls are rejected without touching the network, so
+      LLMService moves on to the next target of the route. When no target is
+      left it raises CircuitOpenError at once, and callers use their
+      existing fallbacks. Turns go to the degraded path (see `blocked`).
+    - half_open: after LLM_BREAKER_OPEN_SECONDS, up to
+      LLM_BREAKER_HALF_OPEN_PROBES calls are let through as probes. That many
+      successes close the breaker; one failure opens it again.
+
+    State changes are logged and counted (llm_breaker_transitions).
+    """
+
+    _breakers: Dict[str, _Breaker] = {}
+
+    @classmethod
+    def allow(cls, target: Dict[str, str]) -> bool:
+        """Whether a call to `target` may go out now; an allowed half-open call is a probe and must be recorded"""
+        if not settings.LLM_BREAKER_ENABLED:
+            return True
+        key = _target_key(target)
+        breaker = cls._breakers.get(key)
+        if breaker is None or breaker.state == CLOSED:
+            return True
+
+        if breaker.state == OPEN:
+            if time.monotonic() - breaker.opened_at < settings.LLM_BREAKER_OPEN_SECONDS:
+                cls._reject(breaker, target)
+                return False
+            cls._transition(key, breaker, HALF_OPEN)
+
+        if breaker.probes >= settings.LLM_BREAKER_HALF_OPEN_PROBES:
+            cls._reject(breaker, target)
+            return False
+        breaker.probes += 1
+        return True
+
+    @classmethod
+    def blocked(cls, targets: List[Dict[str, str]]) -> bool:
+        """True while every target is open and none is due for a probe (no call could go out)"""
+        if not settings.LLM_BREAKER_ENABLED:
+            return False
+        now = time.monotonic()
+        for target in targets:
+            breaker = cls._breakers.get(_target_key(target))
+            if breaker is None or breaker.state != OPEN or now - breaker.opened_at >= settings.LLM_BREAKER_OPEN_SECONDS:
+                return False
+        return True
+
+    @classmethod
+    def record(cls, target: Dict[str, str], seconds: float, ok: bool):
+        """Outcome of an allowed call"""
+        if not settings.LLM_BREAKER_ENABLED:
+            return
+        key = _target_key(target)
+        breaker = cls._breakers.get(key)
+        if breaker is None:
+            breaker = cls._breakers[key] = _Breaker()
+        failed = not ok or seconds >= settings.LLM_BREAKER_SLOW_SECONDS
+        now = time.monotonic()
+
+        if breaker.state == HALF_OPEN:
+            breaker.probes = max(0, breaker.probes - 1)
+            if failed:
+                cls._transition(key, breaker, OPEN)
+                return
+            breaker.probe_successes += 1
+            if breaker.probe_successes >= settings.LLM_BREAKER_HALF_OPEN_PROBES:
+                cls._transition(key, breaker, CLOSED)
+            return
+        if breaker.state == OPEN:
+            return  # a call that went out before the breaker opened
+
+        breaker.outcomes.append((now, failed))
+        calls, failures = cls._window(breaker, now)
+        if calls >= settings.LLM_BREAKER_MIN_CALLS and failures / calls >= settings.LLM_BREAKER_FAILURE_RATE:
+            print(f"📉 {failures}/{calls} calls to {target['model']} failed in the last {settings.LLM_BREAKER_WINDOW_SECONDS:.0f}s")
+            cls._transition(key, breaker, OPEN)
+
+    @classmethod
+    def release(cls, target: Dict[str, str]):
+        """An allowed call ended without an outcome (cancelled): frees its probe slot"""
+        breaker = cls._breakers.get(_target_key(target))
+        if breaker is not None and breaker.state == HALF_OPEN:
+            breaker.probes = max(0, breaker.probes - 1)
+
+    @classmethod
+    def status(cls) -> Dict[str, Dict]:
+        now = time.monotonic()
+        report = {}
+        for key, breaker in cls._breakers.items():
+            calls, failures = cls._window(breaker, now)
+            report[key] = {
+                "state": breaker.state,
+                "window_calls": calls,
+                "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "open_for_seconds": round(now - breaker.opened_at, 3) if breaker.state != CLOSED else None,
+                "rejected": breaker.rejected
+            }
+        return report
+
+    @classmethod
+    def reset(cls):
+        cls._breakers = {}
+
+    @staticmethod
+    def _window(breaker: _Breaker, now: float) -> Tuple[int, int]:
+        cutoff = now - settings.LLM_BREAKER_WINDOW_SECONDS
+        while breaker.outcomes and breaker.outcomes[0][0] < cutoff:
+            breaker.outcomes.popleft()
+        return len(breaker.outcomes), sum(1 for _, failed in breaker.outcomes if failed)
+
+    @staticmethod
+    def _reject(breaker: _Breaker, target: Dict[str, str]):
+        breaker.rejected += 1
+        Metrics.incr("llm_breaker_rejections", model=target["model"])
+
+    @staticmethod
+    def _transition(key: str, breaker: _Breaker, state: str):
+        previous, breaker.state = breaker.state, state
+        if state == OPEN:
+            breaker.opened_at = time.monotonic()
+        elif state == HALF_OPEN:
+            breaker.probes = 0
+            breaker.probe_successes = 0
+        else:
+            breaker.outcomes.clear()
+        icon = {OPEN: "🔴", HALF_OPEN: "🟡", CLOSED: "🟢"}[state]
+        print(f"{icon} LLM circuit breaker {key}: {previous} -> {state}")
+        Metrics.incr("llm_breaker_transitions", target=key, to=state)
+        Metrics.set_gauge("llm_breaker_open", 0 if state == CLOSED else 1, target=key)
+
+
+Metrics.register_collector("llm_breakers", CircuitBreaker.status)
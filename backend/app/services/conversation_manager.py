@@ -1,38 +1,100 @@
 from typing import Dict, List
+import asyncio
+import functools
+import time
+from app.config import get_settings
 from app.models.session import InterviewSession
-from app.services.llm_service import LLMService
+from app.models.turn import Persona, Speaker, Turn, utc_now_us
+from app.services.llm_service import LLMService, TokenCallback
+from app.services.answer_features import AnswerFeatures
 from app.services.scoring_engine import ScoringEngine
-from app.services.feedback_generator import FeedbackGenerator
+from app.services.report_queue import ReportQueue
+from app.services.admission import AdmissionController
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.interview_engine import InterviewEngine
+from app.services.metrics import Metrics
+from app.services.model_router import ModelRouter
+from app.services.token_accounting import TokenAccounting
+from app.services.transcript_index import TranscriptIndex
+from app.services.trace_recorder import TraceRecorder
 from datetime import datetime
 
+settings = get_settings()
+
+# Session columns a turn may change; restored when the turn is cancelled
+_TURN_STATE = ("status", "persona", "current_question_index", "degraded_turns", "_scores", "completed_at", "report_status")
+
+
+def _rolls_back_on_cancel(stage: str):
+    """Decorator for turn methods: a cancelled turn (client disconnected) leaves the session as it was.
+
+    Nested turns (the conclusion run by the last answer) are covered by the outer one;
+    a report the conclusion queued is discarded.
+    Turns a completed call added are queued for the transcript search index,
+    so rolled-back turns never reach it.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if self._turn_snapshot is not None:
+                return await method(self, *args, **kwargs)
+
+            snapshot = self._turn_snapshot = self._snapshot()
+            try:
+                result = await method(self, *args, **kwargs)
+            except asyncio.CancelledError:
+                self._rollback(snapshot)
+                Metrics.incr("turns_cancelled", stage=stage)
+                print(f"🛑 Turn cancelled ({stage}), session {self.session.id} rolled back")
+                raise
+            finally:
+                self._turn_snapshot = None
+            if self.index_turns:
+                TranscriptIndex.add_turns(self.session, self.conversation_history, snapshot["history_length"])
+            return result
+        return wrapper
+    return decorate
+
+
 class ConversationManager:
-    def __init__(self, session: InterviewSession):
+    def __init__(self, session: InterviewSession, index_turns: bool = True):
         self.session = session
-        self.conversation_history = session.conversation_history or []
+        # Scripted batch sessions stay out of transcript search
+        self.index_turns = index_turns
+        # The session's canonical history; turns are appended to it in place
+        self.conversation_history = session.history
         self.asked_questions = []
         self.current_persona = session.persona or "neutral"
         self.persona_history = []
-        self.max_questions = 6
+        self.max_questions = settings.MAX_QUESTIONS
         self.question_count = session.current_question_index or 0
+        self._turn_snapshot = None
 
-    async def start_interview(self) -> Dict:
+    @TraceRecorder.traced("start")
+    @_rolls_back_on_cancel("start")
+    @TokenAccounting.metered
+    async def start_interview(self, on_token: TokenCallback = None) -> Dict:
         try:
-            opening = await LLMService.generate_adapted_question(
-                role=self.session.role,
-                persona="neutral",
-                conversation_history=[],
-                asked_questions=[]
-            )
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": opening,
-                "timestamp": datetime.utcnow().isoformat(),
-                "persona_adapted": "neutral"
-            })
+            degraded = self._should_degrade()
+            
+            if degraded:
+                opening = InterviewEngine.get_opening_question(self.session.role)
+                await self._emit_static(opening, on_token)
+            else:
+                opening = await LLMService.generate_adapted_question(
+                    role=self.session.prompt_role,
+                    persona="neutral",
+                    conversation_history=[],
+                    asked_questions=[],
+                    on_token=on_token
+                )
+            
+            entry = Turn(Speaker.ASSISTANT, opening, ts=utc_now_us(), persona=Persona.NEUTRAL)
+            self._record_mode(entry, degraded)
+            self.conversation_history.append(entry)
             self.asked_questions.append(opening)
             self.question_count = 1
             self.session.current_question_index = 1
-            self.session.conversation_history = self.conversation_history
             
             return {
                 "message": opening,
@@ -40,7 +102,8 @@ class ConversationManager:
                 "question_number": 1,
                 "persona_detected": "neutral",
                 "should_continue": True,
-                "interview_complete": False
+                "interview_complete": False,
+                "degraded": degraded
             }
         except Exception as e:
             print(f"❌ Error starting interview: {e}")
@@ -48,26 +111,58 @@ class ConversationManager:
             traceback.print_exc()
             raise
 
-    async def process_user_response(self, user_message: str) -> Dict:
+    @TraceRecorder.traced("message")
+    @_rolls_back_on_cancel("message")
+    @TokenAccounting.metered
+    async def process_user_response(self, user_message: str, on_token: TokenCallback = None) -> Dict:
         detected_persona = self.current_persona
+        features = AnswerFeatures.extract(user_message)
+        degraded = self._should_degrade()
+        # Combined mode asks for the persona and the next question in one call; not needed for the last answer
+        mode = "combined" if settings.TURN_MODE == "combined" and self.question_count < self.max_questions else "split"
+        next_question = None
+        started = time.perf_counter()
         
-        try:
-            detected_persona = await LLMService.classify_persona_semantic(
+        if degraded:
+            detected_persona = LLMService._fallback_persona_detection(
                 user_message,
-                self.conversation_history
+                self.conversation_history,
+                features
             )
-            print(f"✅ Persona detected: {detected_persona}")
-        except Exception as e:
-            print(f"⚠️ Persona detection failed: {e}, using current: {self.current_persona}")
-            detected_persona = self.current_persona
+            print(f"🚦 Degraded turn, rule-based persona: {detected_persona}")
+        elif mode == "combined":
+            persona, next_question = await LLMService.generate_turn(
+                self.session.prompt_role,
+                user_message,
+                self.conversation_history,
+                self.asked_questions,
+                features
+            )
+            detected_persona = persona or LLMService._fallback_persona_detection(
+                user_message,
+                self.conversation_history,
+                features
+            )
+        else:
+            try:
+                detected_persona = await LLMService.classify_persona_semantic(
+                    user_message,
+                    self.conversation_history,
+                    features
+                )
+                print(f"✅ Persona detected: {detected_persona}")
+            except Exception as e:
+                print(f"⚠️ Persona detection failed: {e}, using current: {self.current_persona}")
+                detected_persona = self.current_persona
         
         try:
-            self.conversation_history.append({
-                "role": "user",
-                "content": user_message,
-                "timestamp": datetime.utcnow().isoformat(),
-                "persona_detected": detected_persona
-            })
+            self.conversation_history.append(Turn(
+                Speaker.USER,
+                user_message,
+                ts=utc_now_us(),
+                persona=detected_persona,
+                features=features
+            ))
             
             if detected_persona != self.current_persona:
                 self.persona_history.append({
@@ -78,8 +173,6 @@ class ConversationManager:
                 self.current_persona = detected_persona
                 self.session.persona = detected_persona
             
-            self.session.conversation_history = self.conversation_history
-            
             questions_asked = self.question_count
             print(f"📊 Questions asked: {questions_asked}/{self.max_questions}")
             
@@ -87,25 +180,39 @@ class ConversationManager:
                 print("🏁 Max questions reached, concluding...")
                 return await self.conclude_interview()
             
-            next_question = await LLMService.generate_adapted_question(
-                role=self.session.role,
-                persona=self.current_persona,
-                conversation_history=self.conversation_history,
-                asked_questions=self.asked_questions
-            )
+            if degraded:
+                asked = [m.content for m in self.conversation_history if m.speaker == Speaker.ASSISTANT]
+                next_question = InterviewEngine.get_next_question(self.session.role, asked)
+                await self._emit_static(next_question, on_token)
+            elif next_question is not None:
+                await self._emit_static(next_question, on_token)
+            else:
+                next_question = await LLMService.generate_adapted_question(
+                    role=self.session.prompt_role,
+                    persona=self.current_persona,
+                    conversation_history=self.conversation_history,
+                    asked_questions=self.asked_questions,
+                    on_token=on_token
+                )
             
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": next_question,
-                "timestamp": datetime.utcnow().isoformat(),
-                "type": "main",
-                "persona_adapted": self.current_persona
-            })
+            if not degraded:
+                # Persona + question latency per turn mode (fallback calls included)
+                Metrics.observe("turn_llm_seconds", time.perf_counter() - started, mode=mode)
+                Metrics.incr("turns_by_mode", mode=mode)
+            
+            entry = Turn(
+                Speaker.ASSISTANT,
+                next_question,
+                ts=utc_now_us(),
+                kind="main",
+                persona=self.current_persona
+            )
+            self._record_mode(entry, degraded)
+            self.conversation_history.append(entry)
             
             self.asked_questions.append(next_question)
             self.question_count += 1
             self.session.current_question_index = self.question_count
-            self.session.conversation_history = self.conversation_history
             
             print(f"✅ Generated question {self.question_count}")
             
@@ -115,7 +222,8 @@ class ConversationManager:
                 "question_number": self.question_count,
                 "persona_detected": self.current_persona,
                 "should_continue": self.question_count < self.max_questions,
-                "interview_complete": False
+                "interview_complete": False,
+                "degraded": degraded
             }
             
         except Exception as e:
@@ -132,47 +240,95 @@ class ConversationManager:
                 "interview_complete": False
             }
 
+    def _snapshot(self) -> Dict:
+        return {
+            "history_length": len(self.conversation_history),
+            "question_count": self.question_count,
+            "current_persona": self.current_persona,
+            "session": {field: getattr(self.session, field) for field in _TURN_STATE}
+        }
+
+    def _rollback(self, snapshot: Dict):
+        if self.session.report_status != snapshot["session"]["report_status"]:
+            # The cancelled conclusion had queued a report
+            ReportQueue.discard(self.session.id)
+        self.conversation_history.truncate(snapshot["history_length"])
+        self.question_count = snapshot["question_count"]
+        self.current_persona = snapshot["current_persona"]
+        for field, value in snapshot["session"].items():
+            setattr(self.session, field, value)
+
+    def _should_degrade(self) -> bool:
+        """Serve the turn without the LLM: under overload, while the question model's breakers are open,
+        or once the session spent its token budget"""
+        if TokenAccounting.exhausted():
+            Metrics.incr("token_budget_degraded_turns")
+            print(f"💸 Session {self.session.id} is out of token budget, serving a degraded turn")
+            return True
+        if CircuitBreaker.blocked(ModelRouter.plan("question")):
+            Metrics.incr("breaker_degraded_turns")
+            print(f"🔴 LLM circuit open, serving a degraded turn for session {self.session.id}")
+            return True
+        return AdmissionController.should_degrade()
+
+    def _record_mode(self, entry: Turn, degraded: bool):
+        """Mark degraded assistant turns and count them on the session"""
+        AdmissionController.record_turn(degraded)
+        if degraded:
+            entry.degraded = True
+            self.session.degraded_turns = (self.session.degraded_turns or 0) + 1
+
+    @staticmethod
+    async def _emit_static(text: str, on_token: TokenCallback):
+        """Streaming clients get static questions as a single token"""
+        if on_token is not None:
+            await on_token(text)
+
+    @TraceRecorder.traced("conclude")
+    @_rolls_back_on_cancel("conclude")
+    @TokenAccounting.metered
     async def conclude_interview(self) -> Dict:
         try:
             print("🏁 Concluding interview...")
             print(f"Conversation history length: {len(self.conversation_history)}")
             
-            scores = await ScoringEngine.generate_overall_scores(self.conversation_history)
+            # Scoring and the report need every turn: load the cold segments once
+            transcript = self.conversation_history.transcript()
+            scores = await ScoringEngine.generate_overall_scores(transcript)
             print(f"✅ Scores: {scores}")
             
-            feedback = await FeedbackGenerator.generate_feedback(
-                self.session.role,
-                self.conversation_history,
-                scores
-            )
-            print(f"✅ Feedback generated")
+            asked_total = max(self.question_count, 1)
+            Metrics.observe("session_degraded_turn_ratio", (self.session.degraded_turns or 0) / asked_total)
             
             self.session.scores = scores
-            self.session.feedback = feedback
             self.session.status = "completed"
             self.session.completed_at = datetime.utcnow()
             
+            # Feedback is built by the background report queue so the final turn returns right away;
+            # queued last, once the session is complete
+            await ReportQueue.submit(self.session, transcript, scores)
+            
             concluding_message = (
                 f"Thank you for completing this mock interview!\n\n"
                 f"🎯 **Overall Performance:** {scores.get('overall', 0):.1f}/5.0\n\n"
-                f"Your feedback report is ready."
+                f"Your feedback report is being prepared."
             )
             
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": concluding_message,
-                "timestamp": datetime.utcnow().isoformat(),
-                "type": "conclusion"
-            })
-            
-            self.session.conversation_history = self.conversation_history
+            self.conversation_history.append(Turn(
+                Speaker.ASSISTANT,
+                concluding_message,
+                ts=utc_now_us(),
+                kind="conclusion"
+            ))
             
             return {
                 "message": concluding_message,
                 "type": "conclusion",
                 "question_number": self.question_count,
                 "scores": scores,
-                "feedback": feedback,
+                "report_status": self.session.report_status,
+                "report_url": f"/api/interview/{self.session.id}/report",
+                "degraded_turns": self.session.degraded_turns or 0,
                 "persona_history": self.persona_history,
                 "interview_complete": True
             }
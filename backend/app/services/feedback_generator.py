@@ -1,6 +1,19 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.models.turn import Speaker, Turn
 from app.services.llm_service import LLMService
-from collections import Counter
+from app.services.answer_features import AnswerFeatures
+from app.services.token_accounting import TokenAccounting
+from app.prompts.registry import PromptRegistry
+from collections import Counter, OrderedDict
+import asyncio
+import hashlib
+import json
+
+settings = get_settings()
+
+# LLM critiques keyed by content hash, so regenerating a report costs no LLM calls
+_critique_cache: "OrderedDict[str, object]" = OrderedDict()
 
 class FeedbackGenerator:
     """Generate detailed, persona-aware feedback"""
@@ -8,7 +21,7 @@ class FeedbackGenerator:
     @staticmethod
     async def generate_feedback(
         role: str,
-        conversation_history: List[Dict],
+        conversation_history: List[Turn],
         scores: Dict[str, float]
     ) -> Dict:
         """Generate comprehensive feedback based on persona analysis"""
@@ -18,20 +31,24 @@ class FeedbackGenerator:
         answer_personas = []
         
         for i, entry in enumerate(conversation_history):
-            if entry.get("role") == "user":
-                content = entry.get("content", "")
-                persona = entry.get("persona_detected", "efficient")
-                if not persona and i > 0:
-                    persona = conversation_history[i-1].get("persona_adapted", "efficient")
+            if entry.speaker == Speaker.USER:
+                content = entry.content
+                persona = entry.persona
+                if not persona and i > 0 and conversation_history[i-1].speaker == Speaker.ASSISTANT:
+                    # An unlabelled answer takes the persona its question was adapted to
+                    persona = conversation_history[i-1].persona
+                persona = persona or "efficient"
 
                 question = ""
-                if i > 0 and conversation_history[i-1].get("role") == "assistant":
-                    question = conversation_history[i-1].get("content", "")
+                if i > 0 and conversation_history[i-1].speaker == Speaker.ASSISTANT:
+                    question = conversation_history[i-1].content
                 
                 answers.append({
                     "content": content,
                     "persona": persona,
-                    "question": question[:80] + "..." if len(question) > 80 else question
+                    "question": question[:80] + "..." if len(question) > 80 else question,
+                    "full_question": question,
+                    "word_count": AnswerFeatures.of(entry).word_count
                 })
                 answer_personas.append(persona)
         
@@ -54,7 +71,14 @@ class FeedbackGenerator:
         strengths = FeedbackGenerator._get_strengths(persona_counts, answer_personas)
         
         # Build areas for improvement
-        areas = FeedbackGenerator._get_improvement_areas(answers, persona_counts)
+        # A session that spent its token budget gets the template report
+        if settings.FEEDBACK_MODE == "llm" and not TokenAccounting.exhausted():
+            areas = await FeedbackGenerator._get_llm_improvement_areas(role, answers)
+            persona_feedback = await FeedbackGenerator._get_llm_overall_impression(
+                role, areas, scores, persona_feedback
+            )
+        else:
+            areas = FeedbackGenerator._get_improvement_areas(answers, persona_counts)
         
         # Next steps
         next_steps = [
@@ -209,7 +233,7 @@ class FeedbackGenerator:
 
         for answer in answers:
             content = answer["content"]
-            word_count = len(content.split())
+            word_count = answer["word_count"]
             persona = answer["persona"]
 
             # Confused persona issues (with word count check)
@@ -276,6 +300,144 @@ class FeedbackGenerator:
 
         return areas
 
+    @staticmethod
+    async def _get_llm_improvement_areas(role: str, answers: List[Dict]) -> List[Dict]:
+        """Critique every answer concurrently (bounded), falling back to templates per answer"""
+        semaphore = asyncio.Semaphore(settings.FEEDBACK_LLM_CONCURRENCY)
+        results = await asyncio.gather(*[
+            FeedbackGenerator._critique_answer(role, answer, semaphore)
+            for answer in answers
+        ])
+        
+        areas = [area for answer_areas in results for area in answer_areas]
+        print(f"✅ LLM feedback: {len(areas)} critiques for {len(answers)} answers")
+        return areas
+    
+    @staticmethod
+    async def _critique_answer(role: str, answer: Dict, semaphore: asyncio.Semaphore) -> List[Dict]:
+        """One LLM critique for one answer; template areas on timeout or bad output"""
+        cache_key = FeedbackGenerator._cache_key(
+            "answer", role, answer["full_question"], answer["content"], answer["persona"]
+        )
+        cached = FeedbackGenerator._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        messages = PromptRegistry.build(
+            "answer_feedback",
+            f"""QUESTION: {answer["full_question"]}
+CANDIDATE'S ANSWER: {answer["content"]}
+DETECTED COMMUNICATION STYLE: {answer["persona"]}
+
+Critique (JSON only):""",
+            role=role
+        )
+        
+        critique = None
+        async with semaphore:
+            try:
+                response = await asyncio.wait_for(
+                    LLMService.generate_response(messages, temperature=0.4, max_tokens=200, call_type="answer_feedback"),
+                    timeout=settings.FEEDBACK_ANSWER_TIMEOUT
+                )
+                critique = FeedbackGenerator._parse_critique(response)
+            except asyncio.TimeoutError:
+                print(f"⚠️ Answer critique timed out after {settings.FEEDBACK_ANSWER_TIMEOUT}s, using template")
+            except Exception as e:
+                print(f"⚠️ Answer critique failed: {e}, using template")
+        
+        if critique is None:
+            return FeedbackGenerator._get_improvement_areas([answer], Counter())
+        
+        FeedbackGenerator._cache_put(cache_key, [critique])
+        return [critique]
+    
+    @staticmethod
+    async def _get_llm_overall_impression(
+        role: str,
+        areas: List[Dict],
+        scores: Dict[str, float],
+        fallback: str
+    ) -> str:
+        """Cheap final merge step turning the critiques into an overall impression"""
+        cache_key = FeedbackGenerator._cache_key("summary", role, areas, scores)
+        cached = FeedbackGenerator._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        critique_summary = "\n".join([
+            f"- {area.get('area', '')}: {area.get('issue', '')}"
+            for area in areas[:10]
+        ])
+        messages = PromptRegistry.build(
+            "feedback_summary",
+            f"""PER-ANSWER CRITIQUES:
+{critique_summary}
+
+SCORES (out of 5): overall {scores.get('overall', 0)}, logic {scores.get('logic', 0)}, communication {scores.get('communication', 0)}, focus {scores.get('focus', 0)}
+
+Overall impression:""",
+            role=role
+        )
+        
+        try:
+            response = await asyncio.wait_for(
+                LLMService.generate_response(messages, temperature=0.5, max_tokens=150, call_type="feedback_summary"),
+                timeout=settings.FEEDBACK_ANSWER_TIMEOUT
+            )
+            impression = response.strip()
+        except Exception as e:
+            print(f"⚠️ Feedback summary failed: {e}, using template")
+            return fallback
+        
+        if not impression:
+            return fallback
+        
+        FeedbackGenerator._cache_put(cache_key, impression)
+        return impression
+    
+    @staticmethod
+    def _parse_critique(response: str) -> Optional[Dict]:
+        """Extract {area, issue, recommendation} from an LLM response"""
+        start, end = response.find("{"), response.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        
+        try:
+            data = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        
+        if not isinstance(data, dict):
+            return None
+        
+        critique = {}
+        for key in ("area", "issue", "recommendation"):
+            value = data.get(key)
+            if not isinstance(value, str) or not value.strip():
+                return None
+            critique[key] = value.strip()
+        return critique
+    
+    @staticmethod
+    def _cache_key(*parts) -> str:
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _cache_get(key: str):
+        value = _critique_cache.get(key)
+        if value is not None:
+            _critique_cache.move_to_end(key)
+        return value
+    
+    @staticmethod
+    def _cache_put(key: str, value):
+        _critique_cache[key] = value
+        _critique_cache.move_to_end(key)
+        while len(_critique_cache) > settings.FEEDBACK_CACHE_SIZE:
+            _critique_cache.popitem(last=False)
+
     @staticmethod
     def _fallback_feedback(scores: Dict) -> Dict:
         """Fallback if no answers found"""
@@ -42,5 +42,5 @@ class InterviewEngine:
     @staticmethod
     async def generate_contextual_followup(role: str, question: str, answer: str, persona: str) -> Dict[str, str]:
         system_prompt = f"You are interviewing for a {role} position. Generate ONE follow-up question based on: {answer}"
-        followup = await LLMService.generate_response([{"role": "system", "content": system_prompt}], temperature=0.8)
+        followup = await LLMService.generate_response([{"role": "system", "content": system_prompt}], temperature=0.8, call_type="followup")
         return {"type": "followup", "question": followup.strip()}
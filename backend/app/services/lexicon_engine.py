@@ -0,0 +1,157 @@
+from typing import Dict, List, Optional, Pattern, Tuple
+from pathlib import Path
+import json
+import os
+import re
+import time
+from app.config import get_settings
+
+settings = get_settings()
+
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent.parent / "data" / "persona_lexicons.json"
+
+# Below this many distinct phrases, per-phrase C substring scans beat the regex pass
+# (see benchmarks/bench_lexicon.py); above it the single pass wins and stays flat.
+SINGLE_PASS_MIN_PHRASES = 150
+
+
+def _build_trie_regex(phrases: List[str]) -> str:
+    """Compile phrases into one trie-shaped alternation so a shared prefix is matched once"""
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = []
+        is_end = False
+        for ch, child in sorted(node.items()):
+            if ch == "":
+                is_end = True
+                continue
+            branches.append(re.escape(ch) + build(child))
+
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if is_end else body
+
+    return build(trie)
+
+
+class LexiconEngine:
+    """Single-pass matcher over every persona lexicon.
+
+    All phrases are compiled into one trie-shaped regex, so a message is
+    scanned once no matter how many lexicons or phrases exist (small lexicon
+    sets fall back to scanning each distinct phrase once). Matching keeps
+    the substring semantics of `phrase in text` (distinct phrases are counted
+    once per message, overlapping phrases are all found).
+
+    Lexicons live in a JSON file ({"name": ["phrase", ...]}) and are reloaded
+    when the file changes. The phrase lists returned by `lexicon()` are updated
+    in place on reload, so existing references stay current.
+    """
+
+    _lexicons: Dict[str, List[str]] = {}
+    _pattern: Optional[Pattern] = None
+    _phrases: Tuple[str, ...] = ()
+    _owners: Dict[str, Tuple[str, ...]] = {}     # phrase -> lexicons containing it
+    _prefixes: Dict[str, Tuple[str, ...]] = {}   # phrase -> phrases that are its prefixes (incl. itself)
+    _path: Path = None
+    _mtime: float = 0.0
+    _last_check: float = 0.0
+
+    @classmethod
+    def load(cls, path: str = None):
+        """(Re)build the matcher from a lexicon file"""
+        cls._path = Path(path or settings.LEXICON_PATH or DEFAULT_LEXICON_PATH)
+        with open(cls._path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+
+        lexicons = {
+            name: list(dict.fromkeys(p.lower() for p in phrases if p.strip()))
+            for name, phrases in raw.items()
+        }
+
+        owners: Dict[str, List[str]] = {}
+        for name, phrases in lexicons.items():
+            for phrase in phrases:
+                owners.setdefault(phrase, []).append(name)
+
+        phrases = list(owners)
+        prefixes = {
+            phrase: tuple(p for p in phrases if phrase.startswith(p))
+            for phrase in phrases
+        }
+
+        use_single_pass = len(phrases) >= SINGLE_PASS_MIN_PHRASES
+        cls._pattern = re.compile(_build_trie_regex(phrases)) if use_single_pass else None
+        cls._phrases = tuple(phrases)
+        cls._owners = {phrase: tuple(names) for phrase, names in owners.items()}
+        cls._prefixes = prefixes
+
+        for name, phrase_list in lexicons.items():
+            if name in cls._lexicons:
+                cls._lexicons[name][:] = phrase_list
+            else:
+                cls._lexicons[name] = phrase_list
+        for name in list(cls._lexicons):
+            if name not in lexicons:
+                cls._lexicons[name][:] = []
+
+        cls._mtime = os.path.getmtime(cls._path)
+        cls._last_check = time.monotonic()
+        print(f"📚 Lexicons loaded: {len(lexicons)} lexicons, {len(phrases)} phrases from {cls._path.name}")
+
+    @classmethod
+    def maybe_reload(cls):
+        """Reload if the lexicon file changed (checked at most every LEXICON_RELOAD_INTERVAL seconds)"""
+        if cls._path is None:
+            cls.load()
+            return
+
+        interval = settings.LEXICON_RELOAD_INTERVAL
+        now = time.monotonic()
+        if interval <= 0 or now - cls._last_check < interval:
+            return
+
+        cls._last_check = now
+        try:
+            if os.path.getmtime(cls._path) != cls._mtime:
+                cls.load(str(cls._path))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Lexicon reload failed: {e}, keeping current lexicons")
+
+    @classmethod
+    def lexicon(cls, name: str) -> List[str]:
+        """Live phrase list for one lexicon"""
+        cls.maybe_reload()
+        return cls._lexicons.setdefault(name, [])
+
+    @classmethod
+    def count_hits(cls, text_lower: str) -> Dict[str, int]:
+        """Per-lexicon count of distinct phrases found in the text, in one pass"""
+        cls.maybe_reload()
+
+        if cls._pattern is None:
+            found = [phrase for phrase in cls._phrases if phrase in text_lower]
+        else:
+            found = set()
+            search = cls._pattern.search
+            pos = 0
+            while True:
+                match = search(text_lower, pos)
+                if match is None:
+                    break
+                # The trie matches the longest phrase at this position; shorter ones are its prefixes
+                found.update(cls._prefixes[match.group()])
+                pos = match.start() + 1
+
+        hits: Dict[str, int] = {}
+        for phrase in found:
+            for name in cls._owners[phrase]:
+                hits[name] = hits.get(name, 0) + 1
+        return hits
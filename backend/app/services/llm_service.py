@@ -1,108 +1,385 @@
-from openai import AsyncOpenAI
 from app.config import get_settings
-from typing import List, Dict
+from app.models.turn import Speaker, Turn
+from app.prompts.registry import PromptRegistry
+from app.services.admission import AdmissionController
+from app.services.answer_features import AnswerFeatures
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.llm_transport import LLMTransport
+from app.services.metrics import Metrics
+from app.services.model_router import ModelRouter
+from app.services.persona_classifier import PersonaClassifier, PersonaLabelLog, VALID_PERSONAS
+from app.services.token_accounting import TokenAccounting
+from app.services.trace_recorder import TraceRecorder
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Tuple
+import asyncio
 import json
+import time
 
 settings = get_settings()
 
-client = AsyncOpenAI(
-    api_key=settings.GROQ_API_KEY,
-    base_url=settings.LLM_BASE_URL
-)
+# Receives each streamed text delta
+TokenCallback = Optional[Callable[[str], Awaitable[None]]]
+
+# Validates routed output; False escalates to the next target in a cascade
+OutputValidator = Optional[Callable[[str], bool]]
 
 class LLMService:
     @staticmethod
     async def generate_response(
         messages: List[Dict[str, str]], 
         temperature: float = None,
-        max_tokens: int = None
+        max_tokens: int = None,
+        on_token: TokenCallback = None,
+        call_type: str = "default",
+        validate: OutputValidator = None,
+        response_format: Optional[Dict[str, str]] = None
     ) -> str:
-        """Generate response from LLM with proper error handling"""
-        try:
-            print(f"🤖 Calling LLM with {len(messages)} messages...")
-            print(f"Last message: {messages[-1]['content'][:100]}...")
+        """Generate response from LLM with proper error handling.
+
+        The call is routed through ModelRouter by `call_type`: targets are tried
+        in order, escalating when a call fails or `validate` rejects its output.
+        The last target's output is returned even if it fails validation.
+
+        With `on_token`, the completion is streamed and each text delta is
+        awaited through the callback as it arrives; the full text is still returned.
+        Streamed calls only escalate on errors raised before the first delta.
+
+        Token usage is metered per call (TokenAccounting); when the session is
+        close to its token budget, `max_tokens` is reduced.
+
+        `response_format` (e.g. {"type": "json_object"}) is passed through to
+        non-streamed calls.
+
+        Targets behind an open circuit breaker are skipped; when every target
+        is skipped, CircuitOpenError is raised without any network call.
+        """
+        print(f"🤖 Calling LLM ({call_type}) with {len(messages)} messages...")
+        print(f"Last message: {messages[-1]['content'][:100]}...")
+        
+        max_tokens = TokenAccounting.max_tokens(max_tokens or settings.MAX_TOKENS)
+        targets = ModelRouter.plan(call_type)
+        attempts = 0
+        error = None
+        rejected = None  # output that failed validation, returned if no later target can be tried
+        for index, target in enumerate(targets):
+            if not CircuitBreaker.allow(target):
+                print(f"⛔ Skipping {target['model']} for '{call_type}': circuit open")
+                continue
+            attempts += 1
+            is_last = index == len(targets) - 1
+            emitted = []
+            started = time.perf_counter()
+            try:
+                async with AdmissionController.track_call():
+                    if on_token is not None:
+                        result, usage = await LLMService._stream_response(
+                            target, messages, temperature, max_tokens, on_token, emitted
+                        )
+                    else:
+                        extra = {"response_format": response_format} if response_format else {}
+                        response = await LLMTransport.get_client(target["base_url"]).chat.completions.create(
+                            model=target["model"],
+                            messages=messages,
+                            temperature=temperature or settings.LLM_TEMPERATURE,
+                            max_tokens=max_tokens or settings.MAX_TOKENS,
+                            **extra
+                        )
+                        result = response.choices[0].message.content
+                        usage = response.usage
+            except asyncio.CancelledError:
+                LLMService._record_cancelled(call_type, target, max_tokens, emitted)
+                raise
+            except Exception as e:
+                LLMService._record_attempt(call_type, target, time.perf_counter() - started, ok=False)
+                print(f"❌ LLM Error ({target['model']}): {type(e).__name__}: {str(e)}")
+                if is_last or emitted:
+                    ModelRouter.record_route(call_type, attempts, valid=False)
+                    # Re-raise the error instead of swallowing it
+                    raise Exception(f"LLM API Error: {str(e)}")
+                print(f"🔼 Escalating '{call_type}' after error")
+                error = e
+                continue
             
-            response = await client.chat.completions.create(
-                model=settings.LLM_MODEL,
-                messages=messages,
-                temperature=temperature or settings.LLM_TEMPERATURE,
-                max_tokens=max_tokens or settings.MAX_TOKENS
+            LLMService._record_attempt(call_type, target, time.perf_counter() - started, ok=True)
+            LLMService._record_usage(call_type, target, messages, result, usage)
+            valid = validate is None or validate(result)
+            if valid or is_last or on_token is not None:
+                ModelRouter.record_route(call_type, attempts, valid)
+                print(f"✅ LLM Response received ({target['model']}): {result[:100]}...")
+                return result
+            print(f"🔼 Escalating '{call_type}': {target['model']} output failed validation")
+            rejected = result
+        
+        # The remaining targets were skipped by open breakers
+        if attempts:
+            ModelRouter.record_route(call_type, attempts, valid=False)
+        if rejected is not None:
+            return rejected
+        if error is not None:
+            raise Exception(f"LLM API Error: {str(error)}")
+        Metrics.incr("llm_calls_short_circuited", call_type=call_type)
+        raise CircuitOpenError(f"All targets for '{call_type}' are behind open circuit breakers")
+    
+    @staticmethod
+    def _record_cancelled(call_type: str, target: Dict[str, str], max_tokens: Optional[int], emitted: List[str]):
+        """Count a call abandoned mid-flight (client gone) and the completion budget it didn't spend"""
+        # Upper bound: the unspent max_tokens budget, one token per streamed delta already received
+        saved = max(0, (max_tokens or settings.MAX_TOKENS) - len(emitted))
+        CircuitBreaker.release(target)
+        Metrics.incr("llm_calls_cancelled", call_type=call_type, model=target["model"])
+        Metrics.incr("llm_tokens_saved", saved, call_type=call_type)
+        print(f"🛑 LLM call cancelled ({call_type}, {target['model']}), ~{saved} completion tokens saved")
+    
+    @staticmethod
+    def _record_usage(call_type: str, target: Dict[str, str], messages: List[Dict[str, str]], result: str, usage: Any):
+        counts = TokenAccounting.usage_counts(usage)
+        if counts is None:
+            TokenAccounting.record(call_type, target["model"], *TokenAccounting.estimate(messages, result), estimated=True)
+        else:
+            TokenAccounting.record(call_type, target["model"], *counts)
+    
+    @staticmethod
+    def _record_attempt(call_type: str, target: Dict[str, str], seconds: float, ok: bool):
+        ModelRouter.record_call(call_type, target, seconds, ok)
+        CircuitBreaker.record(target, seconds, ok)
+        TraceRecorder.record_llm_call(call_type, target["model"], seconds, ok)
+    
+    @staticmethod
+    async def open_connections(count: int = 1):
+        """Pre-open pooled upstream connections (TLS handshake included) with cheap model-list requests"""
+        await asyncio.gather(*[
+            LLMTransport.get_client(base_url).models.list()
+            for base_url in ModelRouter.base_urls()
+            for _ in range(max(1, count))
+        ])
+    
+    @staticmethod
+    async def _stream_response(
+        target: Dict[str, str],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        on_token: TokenCallback,
+        parts: List[str]
+    ) -> Tuple[str, Any]:
+        """Stream a completion into `parts`; returns the text and the usage block, if the provider sent one"""
+        stream = await LLMTransport.get_client(target["base_url"]).chat.completions.create(
+            model=target["model"],
+            messages=messages,
+            temperature=temperature or settings.LLM_TEMPERATURE,
+            max_tokens=max_tokens or settings.MAX_TOKENS,
+            stream=True
+        )
+        
+        usage = None
+        async for chunk in stream:
+            chunk_usage = LLMService._chunk_usage(chunk)
+            if chunk_usage is not None:
+                usage = chunk_usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                await on_token(delta)
+        
+        result = "".join(parts)
+        print(f"✅ LLM Stream completed: {result[:100]}...")
+        return result, usage
+    
+    @staticmethod
+    def _chunk_usage(chunk: Any) -> Any:
+        """OpenAI-style `usage` on the last chunk, or Groq's `x_groq.usage` (a dict or an object, depending on the SDK)"""
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            return usage
+        x_groq = getattr(chunk, "x_groq", None)
+        if isinstance(x_groq, dict):
+            return x_groq.get("usage")
+        return getattr(x_groq, "usage", None)
+    
+    @staticmethod
+    async def classify_persona_semantic(message: str, conversation_history: List[Turn], features: Dict = None) -> str:
+        """Use LLM to semantically classify user persona"""
+        
+        features = features or AnswerFeatures.extract(message)
+        
+        # Confident local predictions skip the LLM call entirely
+        persona = LLMService._local_persona(message, conversation_history, features)
+        if persona is not None:
+            return persona
+        
+        messages = LLMService._persona_messages(message, conversation_history)
+        
+        try:
+            response = await LLMService.generate_response(
+                messages, temperature=0.3, max_tokens=10,
+                call_type="persona", validate=lambda r: LLMService._parse_persona(r) is not None
             )
+            persona = LLMService._parse_persona(response)
+            
+            # Validate response
+            if persona is None:
+                Metrics.incr("turn_parse_failures", mode="split", part="persona")
+                print(f"⚠️ Invalid persona '{response.strip().lower()}', using fallback")
+                return LLMService._fallback_persona_detection(message, conversation_history, features)
             
-            result = response.choices[0].message.content
-            print(f"✅ LLM Response received: {result[:100]}...")
-            return result
+            print(f"✅ Persona detected: {persona}")
+            PersonaLabelLog.record(message, conversation_history, features, persona)
+            return persona
             
         except Exception as e:
-            print(f"❌ LLM Error: {type(e).__name__}: {str(e)}")
-            # Re-raise the error instead of swallowing it
-            raise Exception(f"LLM API Error: {str(e)}")
+            print(f"⚠️ Persona classification failed: {e}, using fallback")
+            return LLMService._fallback_persona_detection(message, conversation_history, features)
     
     @staticmethod
-    async def classify_persona_semantic(message: str, conversation_history: List[Dict]) -> str:
-        """Use LLM to semantically classify user persona"""
-        
+    def _local_persona(message: str, conversation_history: List[Turn], features: Dict) -> Optional[str]:
+        """The local classifier's persona when it is confident enough to skip the LLM, else None"""
+        prediction = PersonaClassifier.predict(message, conversation_history, features)
+        if prediction is None:
+            return None
+        persona, confidence = prediction
+        if confidence >= settings.PERSONA_CONFIDENCE_THRESHOLD:
+            print(f"✅ Persona detected locally: {persona} ({confidence:.2f})")
+            return persona
+        print(f"🔼 Local persona '{persona}' below threshold ({confidence:.2f}), escalating to LLM")
+        return None
+    
+    @staticmethod
+    def _persona_messages(message: str, conversation_history: List[Turn]) -> List[Dict[str, str]]:
+        """Persona classification prompt: current message plus a short recent-history summary"""
         # Build conversation summary
-        recent_messages = conversation_history[-6:] if len(conversation_history) > 6 else conversation_history
+        window = TokenAccounting.window(6)
+        recent_messages = conversation_history[-window:] if len(conversation_history) > window else conversation_history
         history_summary = "\n".join([
-            f"{'User' if m['role']=='user' else 'Agent'}: {m['content'][:100]}"
+            f"{'User' if m.speaker == Speaker.USER else 'Agent'}: {m.content[:100]}"
             for m in recent_messages
         ])
         
-        classification_prompt = f"""Analyze this candidate's communication pattern.
-
-CURRENT MESSAGE: "{message}"
+        return PromptRegistry.build(
+            "persona",
+            f"""CURRENT MESSAGE: "{message}"
 
 RECENT CONVERSATION:
 {history_summary}
 
-CLASSIFY AS ONE OF: confused, efficient, chatty, edge, neutral
-
 Respond with EXACTLY ONE WORD:"""
+        )
+    
+    @staticmethod
+    def _question_messages(
+        role: str,
+        persona: str,
+        conversation_history: List[Turn],
+        asked_questions: List[str]
+    ) -> List[Dict[str, str]]:
+        """Next-question prompt built from the last few turns"""
+        # Build context from recent conversation
+        recent_context = ""
+        if conversation_history:
+            recent = conversation_history[-TokenAccounting.window(4):]
+            recent_context = "\n".join([
+                f"{'You' if m.speaker == Speaker.ASSISTANT else 'Candidate'}: {m.content[:150]}"
+                for m in recent
+            ])
+        
+        user_prompt = f"""Recent conversation:
+{recent_context if recent_context else "Starting interview"}
 
-        messages = [{"role": "user", "content": classification_prompt}]
+Asked before: {len(asked_questions)} questions
+
+Generate your next interview question:"""
+
+        return PromptRegistry.build("question", user_prompt, role=role, persona=persona)
+    
+    @staticmethod
+    def _turn_messages(
+        role: str,
+        message: str,
+        conversation_history: List[Turn],
+        asked_questions: List[str]
+    ) -> List[Dict[str, str]]:
+        """Combined persona + question prompt: recent turns (sent once) and the answer being classified"""
+        window = TokenAccounting.window(6)
+        recent = conversation_history[-window:]
+        recent_context = "\n".join([
+            f"{'You' if m.speaker == Speaker.ASSISTANT else 'Candidate'}: {m.content[:150]}"
+            for m in recent
+        ])
         
+        user_prompt = f"""Recent conversation:
+{recent_context if recent_context else "Starting interview"}
+
+Candidate's latest answer: "{message}"
+
+Asked before: {len(asked_questions)} questions
+
+Respond with the JSON object:"""
+
+        return PromptRegistry.build("turn", user_prompt, role=role)
+    
+    @staticmethod
+    def _parse_turn(response: str) -> Tuple[Optional[str], Optional[str]]:
+        """(persona, next question) from a combined-turn reply; each is None when missing or invalid.
+
+        The reply must be a JSON object with exactly the keys "persona" (one of
+        VALID_PERSONAS) and "next_question" (non-empty text of at most 120
+        words); a code fence around it is tolerated. Anything else is rejected
+        as a whole.
+        """
+        start, end = response.find("{"), response.rfind("}")
+        if start == -1 or end <= start:
+            return None, None
         try:
-            response = await LLMService.generate_response(messages, temperature=0.3, max_tokens=10)
-            persona = response.strip().lower()
-            
-            # Validate response
-            valid_personas = ["confused", "efficient", "chatty", "edge", "neutral"]
-            if persona not in valid_personas:
-                for word in response.lower().split():
-                    if word in valid_personas:
-                        return word
-                print(f"⚠️ Invalid persona '{persona}', using fallback")
-                return LLMService._fallback_persona_detection(message, conversation_history)
-            
-            print(f"✅ Persona detected: {persona}")
+            data = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return None, None
+        if not isinstance(data, dict) or set(data) != {"persona", "next_question"}:
+            return None, None
+        
+        persona = data["persona"].strip().lower() if isinstance(data["persona"], str) else None
+        question = data["next_question"].strip() if isinstance(data["next_question"], str) else ""
+        return (
+            persona if persona in VALID_PERSONAS else None,
+            question if question and len(question.split()) <= 120 else None
+        )
+    
+    @staticmethod
+    def _parse_persona(response: str) -> Optional[str]:
+        """Persona label from a classifier reply: the whole reply or its first valid word"""
+        persona = response.strip().lower()
+        if persona in VALID_PERSONAS:
             return persona
-            
-        except Exception as e:
-            print(f"⚠️ Persona classification failed: {e}, using fallback")
-            return LLMService._fallback_persona_detection(message, conversation_history)
+        for word in response.lower().split():
+            if word in VALID_PERSONAS:
+                return word
+        return None
+    
+    @staticmethod
+    def _is_question(response: str) -> bool:
+        """Follow-ups must be a single, reasonably short question"""
+        text = response.strip()
+        return text.endswith("?") and len(text.split()) <= 60
     
     @staticmethod
-    def _fallback_persona_detection(message: str, history: List[Dict]) -> str:
+    def _fallback_persona_detection(message: str, history: List[Turn], features: Dict = None) -> str:
         """Fallback rule-based detection if LLM fails"""
-        message_lower = message.lower()
-        word_count = len(message.split())
+        features = features or AnswerFeatures.extract(message)
+        word_count = features["word_count"]
         
         # Edge case indicators
-        edge_keywords = ["joke", "tell me about you", "what's your", "do you", "can you tell"]
-        if any(kw in message_lower for kw in edge_keywords):
+        if AnswerFeatures.hit_count(features, "edge") >= 1:
             return "edge"
         
         # Confused indicators
-        confused_keywords = ["not sure", "don't know", "maybe", "i guess", "what do you mean"]
-        if sum(1 for kw in confused_keywords if kw in message_lower) >= 2:
+        if AnswerFeatures.hit_count(features, "confused") >= 2:
             return "confused"
         
         # Efficient (short messages)
         if word_count < 12:
-            recent_user = [m for m in history[-4:] if m.get("role") == "user"]
+            recent_user = [m for m in history[-4:] if m.speaker == Speaker.USER]
             if len(recent_user) >= 2:
-                avg_len = sum(len(m['content'].split()) for m in recent_user) / len(recent_user)
+                avg_len = sum(AnswerFeatures.of(m).word_count for m in recent_user) / len(recent_user)
                 if avg_len < 15:
                     return "efficient"
         
@@ -112,53 +389,66 @@ Respond with EXACTLY ONE WORD:"""
         
         return "neutral"
     
+    @staticmethod
+    async def generate_turn(
+        role: str,
+        message: str,
+        conversation_history: List[Turn],
+        asked_questions: List[str],
+        features: Dict = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Persona of `message` and the next question from ONE JSON-mode call (TURN_MODE=combined).
+
+        `conversation_history` does not include `message` yet. Either part is
+        None when the call fails or its reply does not validate; callers fill
+        it in the split way (rule-based persona, question call). A confident
+        local persona skips the combined call: the persona is returned and the
+        question is left to the question call.
+        """
+        features = features or AnswerFeatures.extract(message)
+        persona = LLMService._local_persona(message, conversation_history, features)
+        if persona is not None:
+            return persona, None
+        
+        messages = LLMService._turn_messages(role, message, conversation_history, asked_questions)
+        try:
+            response = await LLMService.generate_response(
+                messages, temperature=0.7, max_tokens=250, call_type="turn",
+                validate=lambda r: None not in LLMService._parse_turn(r),
+                response_format={"type": "json_object"}
+            )
+        except Exception as e:
+            print(f"⚠️ Combined turn call failed: {e}, falling back to the split path")
+            Metrics.incr("turn_call_errors", mode="combined")
+            return None, None
+        
+        persona, question = LLMService._parse_turn(response)
+        for part, value in (("persona", persona), ("question", question)):
+            if value is None:
+                Metrics.incr("turn_parse_failures", mode="combined", part=part)
+        if persona is None or question is None:
+            print(f"⚠️ Invalid combined turn reply {response[:100]!r}, falling back for the missing parts")
+        if persona is not None:
+            print(f"✅ Persona detected: {persona}")
+            PersonaLabelLog.record(message, conversation_history, features, persona)
+        return persona, question
+    
     @staticmethod
     async def generate_adapted_question(
         role: str,
         persona: str,
-        conversation_history: List[Dict],
-        asked_questions: List[str]
+        conversation_history: List[Turn],
+        asked_questions: List[str],
+        on_token: TokenCallback = None
     ) -> str:
-        """Generate persona-adapted interview question"""
-        
-        # Simple, effective system prompt
-        system_prompt = f"""You are conducting a {role} job interview. 
-
-The candidate's communication style is: {persona}
-
-ADAPT YOUR STYLE:
-- confused: Be supportive, give examples, break down questions
-- efficient: Be direct and concise
-- chatty: Be focused, gently redirect if needed
-- edge: Be professional but firm in redirecting
-- neutral: Be professional and balanced
-
-Generate ONE interview question appropriate for a {role} position.
-Make it conversational and natural, not robotic."""
-
-        # Build context from recent conversation
-        recent_context = ""
-        if conversation_history:
-            recent = conversation_history[-4:]
-            recent_context = "\n".join([
-                f"{'You' if m['role']=='assistant' else 'Candidate'}: {m['content'][:150]}"
-                for m in recent
-            ])
+        """Generate persona-adapted interview question (streamed through `on_token` if given)"""
         
-        user_prompt = f"""Recent conversation:
-{recent_context if recent_context else "Starting interview"}
-
-Asked before: {len(asked_questions)} questions
-
-Generate your next interview question:"""
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
+        messages = LLMService._question_messages(role, persona, conversation_history, asked_questions)
         
         try:
-            question = await LLMService.generate_response(messages, temperature=0.8, max_tokens=200)
+            question = await LLMService.generate_response(
+                messages, temperature=0.8, max_tokens=200, on_token=on_token, call_type="question"
+            )
             return question.strip()
         except Exception as e:
             print(f"❌ Question generation failed: {e}")
@@ -178,19 +468,15 @@ Generate your next interview question:"""
 
 They answered: "{user_answer}"
 
-Their communication style: {persona}
-
-Generate ONE natural follow-up question that:
-1. Digs deeper into their answer
-2. Stays relevant to {role} interview
-3. Adapts to their {persona} style
-
 Follow-up question:"""
 
-        messages = [{"role": "user", "content": prompt}]
+        messages = PromptRegistry.build("followup", prompt, role=role, persona=persona)
         
         try:
-            followup = await LLMService.generate_response(messages, temperature=0.7, max_tokens=150)
+            followup = await LLMService.generate_response(
+                messages, temperature=0.7, max_tokens=150,
+                call_type="followup", validate=LLMService._is_question
+            )
             return followup.strip()
         except Exception as e:
             print(f"❌ Follow-up generation failed: {e}")
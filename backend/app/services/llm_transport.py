@@ -0,0 +1,154 @@
+import importlib.util
+import json
+import os
+import time
+from typing import Dict
+import httpx
+from openai import AsyncOpenAI
+from app.config import get_settings
+from app.services.metrics import Metrics
+
+settings = get_settings()
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """httpx transport that measures how long requests wait for a pooled connection.
+
+    Uses httpcore's `trace` extension: the wait ends when the request either
+    starts opening a new connection or starts sending on an existing one.
+    """
+
+    def __init__(self, name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self.waiting = 0
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired = False
+        previous_trace = request.extensions.get("trace")
+
+        def mark_acquired():
+            nonlocal acquired
+            if not acquired:
+                acquired = True
+                self.waiting -= 1
+                Metrics.observe("llm_pool_wait_seconds", time.perf_counter() - started, upstream=self.name)
+
+        async def trace(event_name: str, info: Dict):
+            if event_name in ("connection.connect_tcp.started", "connection.connect_unix_socket.started") \
+                    or event_name.endswith(".send_request_headers.started"):
+                mark_acquired()
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self.waiting += 1
+        self.requests += 1
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            if not acquired:
+                acquired = True
+                self.waiting -= 1
+
+    def pool_stats(self) -> Dict:
+        connections = list(self._pool.connections)
+        idle = sum(1 for c in connections if c.is_idle())
+        closed = sum(1 for c in connections if c.is_closed())
+        return {
+            "connections": len(connections),
+            "in_use": len(connections) - idle - closed,
+            "idle": idle,
+            "waiting_for_connection": self.waiting,
+            "requests": self.requests,
+            "wait_seconds": Metrics.percentiles("llm_pool_wait_seconds", upstream=self.name)
+        }
+
+
+class LLMTransport:
+    """Shared, tunable HTTP clients for LLM providers - one pooled client per base URL.
+
+    Pool limits, keep-alive expiry, HTTP/2 and timeouts come from Settings.
+    API keys per base URL come from LLM_PROVIDERS (JSON: {"<base_url>":
+    {"api_key_env": "<ENV VAR>"}}); the default base URL uses GROQ_API_KEY.
+    """
+
+    _clients: Dict[str, AsyncOpenAI] = {}
+    _transports: Dict[str, InstrumentedTransport] = {}
+    _http2_warned = False
+
+    @classmethod
+    def get_client(cls, base_url: str = None, api_key: str = None) -> AsyncOpenAI:
+        base_url = (base_url or settings.LLM_BASE_URL).rstrip("/")
+        client = cls._clients.get(base_url)
+        if client is not None:
+            return client
+
+        transport = InstrumentedTransport(
+            name=base_url,
+            http2=cls._http2_enabled(),
+            limits=httpx.Limits(
+                max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY
+            )
+        )
+        timeout = httpx.Timeout(
+            settings.LLM_READ_TIMEOUT,
+            connect=settings.LLM_CONNECT_TIMEOUT,
+            write=settings.LLM_WRITE_TIMEOUT,
+            pool=settings.LLM_POOL_TIMEOUT
+        )
+
+        client = AsyncOpenAI(
+            api_key=api_key or cls._api_key_for(base_url),
+            base_url=base_url,
+            timeout=timeout,
+            http_client=httpx.AsyncClient(transport=transport, timeout=timeout)
+        )
+        cls._clients[base_url] = client
+        cls._transports[base_url] = transport
+        print(f"🔌 LLM client for {base_url} (http2={transport_http2(transport)}, "
+              f"max_connections={settings.LLM_POOL_MAX_CONNECTIONS})")
+        return client
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Dict]:
+        return {base_url: transport.pool_stats() for base_url, transport in cls._transports.items()}
+
+    @classmethod
+    async def close(cls):
+        for client in cls._clients.values():
+            await client.close()
+        cls._clients.clear()
+        cls._transports.clear()
+
+    @staticmethod
+    def _api_key_for(base_url: str) -> str:
+        if settings.LLM_PROVIDERS:
+            providers = json.loads(settings.LLM_PROVIDERS)
+            provider = providers.get(base_url) or providers.get(base_url + "/") or {}
+            env_name = provider.get("api_key_env")
+            if env_name and os.environ.get(env_name):
+                return os.environ[env_name]
+        return settings.GROQ_API_KEY
+
+    @classmethod
+    def _http2_enabled(cls) -> bool:
+        if not settings.LLM_HTTP2:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            if not cls._http2_warned:
+                print("⚠️ LLM_HTTP2 is on but the 'h2' package is not installed, using HTTP/1.1")
+                cls._http2_warned = True
+            return False
+        return True
+
+
+def transport_http2(transport: InstrumentedTransport) -> bool:
+    return bool(getattr(transport._pool, "_http2", False))
+
+
+Metrics.register_collector("llm_pool", LLMTransport.pool_stats)
@@ -0,0 +1,101 @@
+from typing import Callable, Deque, Dict, Tuple
+from collections import deque
+import threading
+
+# Rolling window per histogram; percentiles are computed over the last N observations
+HISTOGRAM_WINDOW = 1000
+
+
+def _key(name: str, labels: Dict[str, str]) -> str:
+    if not labels:
+        return name
+    label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+
+class Metrics:
+    """In-process counters, gauges and rolling histograms, served from GET /metrics"""
+
+    _lock = threading.Lock()
+    _counters: Dict[str, float] = {}
+    _gauges: Dict[str, float] = {}
+    _histograms: Dict[str, Tuple[Deque[float], list]] = {}  # key -> (window, [count, total])
+    _collectors: Dict[str, Callable[[], Dict]] = {}
+
+    @classmethod
+    def incr(cls, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + value
+
+    @classmethod
+    def set_gauge(cls, name: str, value: float, **labels):
+        with cls._lock:
+            cls._gauges[_key(name, labels)] = value
+
+    @classmethod
+    def observe(cls, name: str, value: float, **labels):
+        key = _key(name, labels)
+        with cls._lock:
+            entry = cls._histograms.get(key)
+            if entry is None:
+                entry = (deque(maxlen=HISTOGRAM_WINDOW), [0, 0.0])
+                cls._histograms[key] = entry
+            window, totals = entry
+            window.append(value)
+            totals[0] += 1
+            totals[1] += value
+
+    @classmethod
+    def register_collector(cls, name: str, collector: Callable[[], Dict]):
+        """Add a callback whose dict is included under `name` in every snapshot"""
+        cls._collectors[name] = collector
+
+    @classmethod
+    def percentiles(cls, name: str, **labels) -> Dict[str, float]:
+        with cls._lock:
+            entry = cls._histograms.get(_key(name, labels))
+            values = sorted(entry[0]) if entry else []
+        return cls._summarize(values)
+
+    @staticmethod
+    def _summarize(values) -> Dict[str, float]:
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        def pct(p: float) -> float:
+            return values[min(len(values) - 1, int(p * len(values)))]
+
+        return {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": values[-1]}
+
+    @classmethod
+    def snapshot(cls) -> Dict:
+        with cls._lock:
+            counters = dict(cls._counters)
+            gauges = dict(cls._gauges)
+            histograms = {
+                key: (sorted(window), totals[0], totals[1])
+                for key, (window, totals) in cls._histograms.items()
+            }
+
+        result = {
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": {
+                key: {"count": count, "mean": total / count if count else 0.0, **cls._summarize(values)}
+                for key, (values, count, total) in histograms.items()
+            }
+        }
+        for name, collector in cls._collectors.items():
+            try:
+                result[name] = collector()
+            except Exception as e:
+                result[name] = {"error": str(e)}
+        return result
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._counters.clear()
+            cls._gauges.clear()
+            cls._histograms.clear()
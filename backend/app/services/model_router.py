@@ -0,0 +1,180 @@
+import json
+import time
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.services.metrics import Metrics
+
+settings = get_settings()
+
+ROUTE_MODES = ("cascade", "latency")
+
+
+def _target(model: str, base_url: str = None) -> Dict[str, str]:
+    return {"model": model, "base_url": (base_url or settings.LLM_BASE_URL).rstrip("/")}
+
+
+def _target_key(target: Dict[str, str]) -> str:
+    return f"{target['model']}@{target['base_url']}"
+
+
+class ModelRouter:
+    """Maps each LLM call type to an ordered list of (base URL, model) targets.
+
+    Routes run in one of two modes:
+      - cascade: targets are tried in the configured order (cheapest first); the
+        call escalates to the next target when the output fails validation or the
+        call errors.
+      - latency: targets are ordered by their observed latency (EWMA); targets
+        with no recent samples are tried first so stale estimates get refreshed.
+
+    Defaults send persona classification and follow-ups to LLM_SMALL_MODEL with
+    LLM_MODEL as the escalation target; every other call type uses LLM_MODEL.
+    LLM_ROUTES overrides any route: {"<call type>": {"mode": "cascade",
+    "targets": [{"model": "...", "base_url": "..."}]}}.
+    """
+
+    _routes: Optional[Dict[str, Dict]] = None
+    _latency: Dict[str, Dict] = {}  # "<route>|<target>" -> {"ewma", "updated_at"}
+    _stats: Dict[str, Dict[str, int]] = {}  # route -> {"calls", "escalations", "errors", "invalid"}
+
+    @classmethod
+    def routes(cls) -> Dict[str, Dict]:
+        if cls._routes is None:
+            cls._routes = cls._load_routes()
+        return cls._routes
+
+    @classmethod
+    def route(cls, call_type: str) -> Dict:
+        """Configured route for a call type; unconfigured call types use the default route"""
+        return cls.routes().get(call_type) or cls.routes()["default"]
+
+    @classmethod
+    def plan(cls, call_type: str) -> List[Dict[str, str]]:
+        """Targets for one call, in the order they should be tried"""
+        route = cls.route(call_type)
+        targets = list(route["targets"])
+        if route["mode"] == "latency" and len(targets) > 1:
+            targets.sort(key=lambda target: cls._expected_latency(call_type, target))
+        return targets
+
+    @classmethod
+    def base_urls(cls) -> List[str]:
+        urls = []
+        for route in cls.routes().values():
+            for target in route["targets"]:
+                if target["base_url"] not in urls:
+                    urls.append(target["base_url"])
+        return urls
+
+    @classmethod
+    def record_call(cls, call_type: str, target: Dict[str, str], seconds: float, ok: bool):
+        """Record one attempt; failed attempts count as a full read timeout for latency routing"""
+        sample = seconds if ok else max(seconds, settings.LLM_READ_TIMEOUT)
+        key = f"{call_type}|{_target_key(target)}"
+        entry = cls._latency.get(key)
+        if entry is None:
+            cls._latency[key] = {"ewma": sample, "updated_at": time.monotonic()}
+        else:
+            alpha = settings.LLM_ROUTER_LATENCY_ALPHA
+            entry["ewma"] = alpha * sample + (1 - alpha) * entry["ewma"]
+            entry["updated_at"] = time.monotonic()
+
+        Metrics.observe("llm_route_seconds", seconds, route=call_type, model=target["model"])
+        if not ok:
+            cls._stat(call_type, "errors")
+            Metrics.incr("llm_route_errors", route=call_type, model=target["model"])
+
+    @classmethod
+    def record_route(cls, call_type: str, attempts: int, valid: bool):
+        """Record one routed call once it has finished (possibly after escalating)"""
+        cls._stat(call_type, "calls")
+        if attempts > 1:
+            cls._stat(call_type, "escalations")
+            Metrics.incr("llm_route_escalations", route=call_type)
+        if not valid:
+            cls._stat(call_type, "invalid")
+
+    @classmethod
+    def status(cls) -> Dict[str, Dict]:
+        report = {}
+        call_types = list(cls.routes()) + [c for c in cls._stats if c not in cls.routes()]
+        for call_type in call_types:
+            route = cls.route(call_type)
+            stats = cls._stats.get(call_type, {})
+            calls = stats.get("calls", 0)
+            report[call_type] = {
+                "mode": route["mode"],
+                "calls": calls,
+                "escalations": stats.get("escalations", 0),
+                "escalation_rate": round(stats.get("escalations", 0) / calls, 4) if calls else 0.0,
+                "errors": stats.get("errors", 0),
+                "invalid_after_all_targets": stats.get("invalid", 0),
+                "targets": [
+                    {
+                        "model": target["model"],
+                        "base_url": target["base_url"],
+                        "latency_ewma_seconds": cls._latency_ewma(call_type, target),
+                        "seconds": Metrics.percentiles("llm_route_seconds", route=call_type, model=target["model"])
+                    }
+                    for target in route["targets"]
+                ]
+            }
+        return report
+
+    @classmethod
+    def reset(cls):
+        cls._routes = None
+        cls._latency = {}
+        cls._stats = {}
+
+    @classmethod
+    def _stat(cls, call_type: str, name: str):
+        stats = cls._stats.setdefault(call_type, {})
+        stats[name] = stats.get(name, 0) + 1
+
+    @classmethod
+    def _latency_ewma(cls, call_type: str, target: Dict[str, str]) -> Optional[float]:
+        entry = cls._latency.get(f"{call_type}|{_target_key(target)}")
+        return round(entry["ewma"], 4) if entry else None
+
+    @classmethod
+    def _expected_latency(cls, call_type: str, target: Dict[str, str]) -> float:
+        entry = cls._latency.get(f"{call_type}|{_target_key(target)}")
+        if entry is None or time.monotonic() - entry["updated_at"] > settings.LLM_ROUTER_STALE_SECONDS:
+            return 0.0
+        return entry["ewma"]
+
+    @staticmethod
+    def _load_routes() -> Dict[str, Dict]:
+        main = _target(settings.LLM_MODEL)
+        small = _target(settings.LLM_SMALL_MODEL) if settings.LLM_SMALL_MODEL else None
+        cheap_first = [small, main] if small and small != main else [main]
+
+        routes = {
+            "default": {"mode": "cascade", "targets": [main]},
+            "persona": {"mode": "cascade", "targets": cheap_first},
+            "followup": {"mode": "cascade", "targets": cheap_first},
+        }
+
+        if settings.LLM_ROUTES:
+            try:
+                overrides = {}
+                for call_type, route in json.loads(settings.LLM_ROUTES).items():
+                    mode = route.get("mode", "cascade")
+                    if mode not in ROUTE_MODES:
+                        raise ValueError(f"unknown mode '{mode}' for route '{call_type}'")
+                    targets = [_target(t["model"], t.get("base_url")) for t in route.get("targets", [])]
+                    if not targets:
+                        raise ValueError(f"route '{call_type}' has no targets")
+                    overrides[call_type] = {"mode": mode, "targets": targets}
+                routes.update(overrides)
+            except (ValueError, KeyError, AttributeError, TypeError) as e:
+                print(f"⚠️ Invalid LLM_ROUTES ({e}), using default routes")
+
+        for call_type, route in routes.items():
+            models = " → ".join(t["model"] for t in route["targets"])
+            print(f"🧭 LLM route '{call_type}' ({route['mode']}): {models}")
+        return routes
+
+
+Metrics.register_collector("llm_routes", ModelRouter.status)
@@ -0,0 +1,143 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import json
+import re
+from app.config import get_settings
+from app.models.turn import Speaker, Turn
+from app.services.answer_features import AnswerFeatures
+
+settings = get_settings()
+
+VALID_PERSONAS = ["confused", "efficient", "chatty", "edge", "neutral"]
+
+FEATURE_LEXICONS = ["edge", "confused", "hedge", "off_topic"]
+
+# Model versions are file stems under PERSONA_MODEL_DIR; nothing that could name a path
+MODEL_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def persona_features(message: str, history: List[Turn], features: Dict = None) -> Dict[str, float]:
+    """Numeric features of the message and the recent history (logged and fed to the classifier)"""
+    features = features or AnswerFeatures.extract(message)
+    recent_user = [m for m in history[-6:] if m.speaker == Speaker.USER]
+    recent_lengths = [AnswerFeatures.of(m).word_count for m in recent_user]
+
+    row = {
+        "word_count": float(features["word_count"]),
+        "sentence_count": float(features["sentence_count"]),
+        "question_marks": float(features["question_marks"]),
+        "recent_user_turns": float(len(recent_user)),
+        "recent_avg_words": sum(recent_lengths) / len(recent_lengths) if recent_lengths else 0.0,
+    }
+    for lexicon in FEATURE_LEXICONS:
+        row[f"hits_{lexicon}"] = float(AnswerFeatures.hit_count(features, lexicon))
+    return row
+
+
+# Column selectors used inside the trained sklearn pipeline (module-level so models unpickle)
+def select_text(rows: List[Dict]) -> List[str]:
+    return [row["message"] for row in rows]
+
+
+def select_numeric(rows: List[Dict]) -> List[Dict]:
+    return [row["features"] for row in rows]
+
+
+def model_path(version: str) -> Optional[Path]:
+    """<PERSONA_MODEL_DIR>/<version>.joblib, or None if `version` is not a plain name inside that directory"""
+    if not MODEL_VERSION_PATTERN.match(version) or ".." in version:
+        return None
+    model_dir = Path(settings.PERSONA_MODEL_DIR).resolve()
+    path = (model_dir / f"{version}.joblib").resolve()
+    if path.parent != model_dir:
+        return None
+    return path
+
+
+class PersonaLabelLog:
+    """Append (message, history features, LLM label) tuples for offline training"""
+
+    @staticmethod
+    def record(message: str, history: List[Turn], features: Dict, label: str):
+        if not settings.PERSONA_LABEL_LOG:
+            return
+
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "message": message,
+            "features": persona_features(message, history, features),
+            "label": label
+        }
+        try:
+            with open(settings.PERSONA_LABEL_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not log persona label: {e}")
+
+
+class PersonaClassifier:
+    """In-process persona classifier distilled from logged LLM labels.
+
+    Models are trained by scripts/train_persona_classifier.py and stored as
+    `<PERSONA_MODEL_DIR>/<version>.joblib`. scikit-learn is optional: without it
+    (or without a model) `predict` returns None and callers use the LLM.
+    """
+
+    _model = None
+    _version: Optional[str] = None
+    _loaded_at: Optional[datetime] = None
+
+    @classmethod
+    def load(cls, version: str = None) -> bool:
+        """Load (or hot-swap to) a model version; keeps the current model on failure"""
+        version = version or settings.PERSONA_MODEL_VERSION
+        if not version:
+            return False
+
+        path = model_path(version)
+        if path is None:
+            print(f"⚠️ Invalid persona model version '{version}'")
+            return False
+        try:
+            import joblib
+            # joblib unpickles: only ever load files from PERSONA_MODEL_DIR
+            model = joblib.load(path)["pipeline"]
+        except ImportError:
+            print("⚠️ scikit-learn/joblib not installed, local persona classifier disabled")
+            return False
+        except Exception as e:
+            print(f"⚠️ Could not load persona model '{version}': {e}")
+            return False
+
+        cls._model = model
+        cls._version = version
+        cls._loaded_at = datetime.utcnow()
+        print(f"🧠 Persona model '{version}' loaded")
+        return True
+
+    @classmethod
+    def predict(cls, message: str, history: List[Turn], features: Dict = None) -> Optional[Tuple[str, float]]:
+        """(label, calibrated confidence), or None when no model is loaded"""
+        model = cls._model
+        if model is None:
+            return None
+
+        row = {"message": message, "features": persona_features(message, history, features)}
+        try:
+            probabilities = model.predict_proba([row])[0]
+        except Exception as e:
+            print(f"⚠️ Persona model prediction failed: {e}")
+            return None
+
+        best = int(probabilities.argmax())
+        return str(model.classes_[best]), float(probabilities[best])
+
+    @classmethod
+    def status(cls) -> Dict:
+        return {
+            "version": cls._version,
+            "loaded": cls._model is not None,
+            "loaded_at": cls._loaded_at.isoformat() if cls._loaded_at else None,
+            "confidence_threshold": settings.PERSONA_CONFIDENCE_THRESHOLD
+        }
@@ -1,35 +1,34 @@
 from typing import Dict, List
+from app.services.answer_features import AnswerFeatures
+from app.models.turn import Speaker, Turn
+from app.services.lexicon_engine import LexiconEngine
 
 class PersonaHandler:
     PERSONA_INDICATORS = {
-        "confused": ["not sure", "don't know", "maybe", "i guess", "kind of"],
+        "confused": LexiconEngine.lexicon("hedge"),
         "efficient": [],
         "chatty": [],
-        "edge": ["joke", "story", "unrelated", "random"]
+        "edge": LexiconEngine.lexicon("off_topic")
     }
     
     @staticmethod
-    def detect_persona(message: str, history: List[Dict]) -> str:
-        message_lower = message.lower()
-        word_count = len(message.split())
+    def detect_persona(message: str, history: List[Turn], features: Dict = None) -> str:
+        features = features or AnswerFeatures.extract(message)
+        word_count = features["word_count"]
         
-        recent_messages = [h for h in history[-5:] if h.get("role") == "user"]
-        avg_length = sum(len(m.get("content", "").split()) for m in recent_messages) / max(len(recent_messages), 1)
+        recent_messages = [h for h in history[-5:] if h.speaker == Speaker.USER]
+        avg_length = sum(AnswerFeatures.of(m).word_count for m in recent_messages) / max(len(recent_messages), 1)
         
         if word_count < 10 and avg_length < 15:
             return "efficient"
         
-        confused_count = sum(1 for indicator in PersonaHandler.PERSONA_INDICATORS["confused"] 
-                            if indicator in message_lower)
-        if confused_count >= 2:
+        if AnswerFeatures.hit_count(features, "hedge") >= 2:
             return "confused"
         
         if word_count > 100:
             return "chatty"
         
-        edge_count = sum(1 for indicator in PersonaHandler.PERSONA_INDICATORS["edge"] 
-                        if indicator in message_lower)
-        if edge_count >= 1:
+        if AnswerFeatures.hit_count(features, "off_topic") >= 1:
             return "edge"
         
         return "efficient" #recheck
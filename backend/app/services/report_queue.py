@@ -0,0 +1,125 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.config import get_settings
+from app.models.session import InterviewSession
+from app.services.feedback_generator import FeedbackGenerator
+from app.services.token_accounting import TokenAccounting
+
+settings = get_settings()
+
+
+class ReportQueue:
+    """Bounded background queue that builds feedback reports off the request path"""
+
+    _queue: Optional[asyncio.Queue] = None
+    _workers: List[asyncio.Task] = []
+    _ready_events: Dict[str, asyncio.Event] = {}
+    _listeners: List[Callable[[InterviewSession], Awaitable[None]]] = []
+
+    @classmethod
+    def add_listener(cls, listener: Callable[[InterviewSession], Awaitable[None]]):
+        """Register a coroutine called with the session whenever a report finishes (used for push)"""
+        if listener not in cls._listeners:
+            cls._listeners.append(listener)
+
+    @classmethod
+    async def start(cls, workers: int = None):
+        """Start the worker pool (idempotent)"""
+        if cls._queue is not None:
+            return
+
+        cls._queue = asyncio.Queue(maxsize=settings.REPORT_QUEUE_SIZE)
+        worker_count = workers or settings.REPORT_WORKERS
+        cls._workers = [
+            asyncio.create_task(cls._worker(i + 1))
+            for i in range(worker_count)
+        ]
+        print(f"📬 Report queue started with {worker_count} workers")
+
+    @classmethod
+    async def stop(cls):
+        """Cancel the workers; pending reports are dropped"""
+        for worker in cls._workers:
+            worker.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+        cls._queue = None
+
+    @classmethod
+    async def submit(cls, session: InterviewSession, conversation_history: List[Dict], scores: Dict[str, float]):
+        """Queue a feedback report for the session; blocks only while the queue is full"""
+        if cls._queue is None:
+            await cls.start()
+
+        session.report_status = "pending"
+        ticket = cls._ready_events[session.id] = asyncio.Event()
+        await cls._queue.put((session, list(conversation_history), scores, ticket))
+        print(f"📬 Report queued for session {session.id} (queue size: {cls._queue.qsize()})")
+
+    @classmethod
+    def discard(cls, session_id: str):
+        """Drop the session's queued report (its conclusion was rolled back); a worker skips it"""
+        event = cls._ready_events.pop(session_id, None)
+        if event is not None:
+            event.set()
+            print(f"🗑️ Report discarded for session {session_id}")
+
+    @classmethod
+    async def wait_for_report(cls, session_id: str, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a pending report; True if it is ready"""
+        event = cls._ready_events.get(session_id)
+        if event is None:
+            return True
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @classmethod
+    async def _worker(cls, worker_id: int):
+        while True:
+            session, conversation_history, scores, ticket = await cls._queue.get()
+            try:
+                if cls._ready_events.get(session.id) is ticket:
+                    await cls._build_report(session, conversation_history, scores, ticket)
+            finally:
+                cls._queue.task_done()
+
+    @classmethod
+    async def _build_report(
+        cls,
+        session: InterviewSession,
+        conversation_history: List[Dict],
+        scores: Dict[str, float],
+        ticket: asyncio.Event
+    ):
+        try:
+            with TokenAccounting.metering(session):
+                feedback = await FeedbackGenerator.generate_feedback(
+                    session.prompt_role,
+                    conversation_history,
+                    scores
+                )
+            if cls._ready_events.get(session.id) is not ticket:
+                return  # discarded while it was being built
+            session.feedback = feedback
+            session.report_status = "ready"
+            print(f"✅ Feedback report ready for session {session.id}")
+        except Exception as e:
+            if cls._ready_events.get(session.id) is not ticket:
+                return
+            print(f"❌ Feedback report failed for session {session.id}: {e}")
+            session.feedback = FeedbackGenerator._fallback_feedback(scores)
+            session.report_status = "failed"
+        finally:
+            if cls._ready_events.get(session.id) is ticket:
+                del cls._ready_events[session.id]
+                ticket.set()
+
+        for listener in cls._listeners:
+            try:
+                await listener(session)
+            except Exception as e:
+                print(f"⚠️ Report listener failed for session {session.id}: {e}")
@@ -0,0 +1,184 @@
+from typing import Callable, Dict, List, NamedTuple, Optional
+from collections import OrderedDict
+from pathlib import Path
+from string import Template
+import hashlib
+import html
+import os
+from app.config import get_settings
+from app.models.session import InterviewSession
+from app.services.metrics import Metrics
+
+settings = get_settings()
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+# Bump when the Python-side rendering below changes (sections, escaping); template file edits are picked up on their own
+RENDERER_VERSION = "1"
+
+SCORE_LABELS = [
+    ("logic", "Logic"),
+    ("communication", "Communication"),
+    ("focus", "Focus"),
+    ("persona_adaptivity", "Persona adaptivity"),
+]
+
+
+class RenderedReport(NamedTuple):
+    key: str          # content address: hash of (session id, feedback, scores, template version, format)
+    body: bytes
+    media_type: str
+
+
+class ReportRenderer:
+    """HTML / Markdown exports of finished feedback reports, cached by content address.
+
+    A report is rendered once per (session id, feedback, scores, template
+    version, format); the key hashes the stored JSON text, so hits need no
+    parsing. The template version hashes RENDERER_VERSION and the template
+    files, which are re-read when they change on disk: new keys miss, and
+    entries rendered with the old templates are dropped. The cache is an
+    in-memory LRU of REPORT_RENDER_CACHE_SIZE entries.
+    """
+
+    FORMATS = {
+        "html": ("report.html", "text/html"),
+        "md": ("report.md", "text/markdown"),
+    }
+
+    _templates: Dict[str, Template] = {}
+    _mtimes: Dict[str, float] = {}
+    _version: Optional[str] = None
+    _cache: "OrderedDict[str, RenderedReport]" = OrderedDict()
+
+    @classmethod
+    def template_version(cls) -> str:
+        cls._maybe_reload()
+        return cls._version
+
+    @classmethod
+    def _maybe_reload(cls):
+        mtimes = {fmt: os.path.getmtime(TEMPLATE_DIR / name) for fmt, (name, _) in cls.FORMATS.items()}
+        if mtimes == cls._mtimes:
+            return
+
+        sources = {fmt: (TEMPLATE_DIR / name).read_text(encoding="utf-8") for fmt, (name, _) in cls.FORMATS.items()}
+        digest = hashlib.sha256(RENDERER_VERSION.encode("utf-8"))
+        for fmt in sorted(sources):
+            digest.update(b"\0" + fmt.encode("utf-8") + b"\0" + sources[fmt].encode("utf-8"))
+        version = digest.hexdigest()[:16]
+
+        if cls._version is not None and version != cls._version:
+            print(f"🔁 Report templates changed ({cls._version} -> {version}), dropping {len(cls._cache)} rendered reports")
+            cls._cache.clear()
+        cls._templates = {fmt: Template(source) for fmt, source in sources.items()}
+        cls._mtimes = mtimes
+        cls._version = version
+
+    @classmethod
+    def cache_key(cls, session: InterviewSession, fmt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (session.id, session._feedback or "", session._scores or "", cls.template_version(), fmt):
+            digest.update(part.encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    def render(cls, session: InterviewSession, fmt: str) -> RenderedReport:
+        """The session's report in `fmt` ("html" or "md"); the report must be finished"""
+        key = cls.cache_key(session, fmt)
+        rendered = cls.cached(key)
+        if rendered is not None:
+            Metrics.incr("report_renders", result="hit", format=fmt)
+            return rendered
+
+        Metrics.incr("report_renders", result="miss", format=fmt)
+        renderer = _render_html if fmt == "html" else _render_markdown
+        fields = renderer(session, session.feedback, session.scores)
+        body = cls._templates[fmt].safe_substitute(fields).encode("utf-8")
+        rendered = RenderedReport(key, body, cls.FORMATS[fmt][1])
+
+        cls._cache[key] = rendered
+        while len(cls._cache) > settings.REPORT_RENDER_CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return rendered
+
+    @classmethod
+    def cached(cls, key: str) -> Optional[RenderedReport]:
+        rendered = cls._cache.get(key)
+        if rendered is not None:
+            cls._cache.move_to_end(key)
+        return rendered
+
+    @classmethod
+    def status(cls) -> Dict:
+        return {"template_version": cls._version, "cached": len(cls._cache)}
+
+
+def _common_fields(session: InterviewSession, feedback: Dict, scores: Dict, escape: Callable[[str], str]) -> Dict[str, str]:
+    completed = session.completed_at.strftime("%Y-%m-%d %H:%M UTC") if session.completed_at else ""
+    return {
+        "role": escape(session.role_display or session.role),
+        "session_id": escape(session.id),
+        "completed_at": completed,
+        "persona": escape(str(feedback.get("persona", ""))),
+        "overall": f"{float(scores.get('overall', 0)):.1f}",
+        "overall_impression": escape(str(feedback.get("overall_impression", ""))),
+        "example": escape(str(feedback.get("example_strong_response", ""))),
+    }
+
+
+def _areas(feedback: Dict) -> List[Dict[str, str]]:
+    """Improvement areas as dicts; LLM critiques and older reports may hold plain strings"""
+    return [
+        area if isinstance(area, dict) else {"area": "", "issue": str(area), "recommendation": ""}
+        for area in feedback.get("areas_for_improvement", [])
+    ]
+
+
+def _render_html(session: InterviewSession, feedback: Dict, scores: Dict) -> Dict[str, str]:
+    escape = html.escape
+    fields = _common_fields(session, feedback, scores, escape)
+    fields["score_rows"] = "\n".join(
+        f"<tr><td>{label}</td><td class=\"score\">{float(scores[name]):.1f}</td></tr>"
+        for name, label in SCORE_LABELS if name in scores
+    )
+    fields["strengths"] = "\n".join(f"<li>{escape(str(s))}</li>" for s in feedback.get("strengths", []))
+    fields["areas"] = "\n".join(
+        "<div class=\"area\">"
+        + (f"<strong>{escape(str(area.get('area', '')))}</strong>" if area.get("area") else "")
+        + f"<p>{escape(str(area.get('issue', '')))}</p>"
+        + (f"<p><em>{escape(str(area.get('recommendation', '')))}</em></p>" if area.get("recommendation") else "")
+        + "</div>"
+        for area in _areas(feedback)
+    ) or "<p>None noted.</p>"
+    fields["next_steps"] = "\n".join(f"<li>{escape(str(step))}</li>" for step in feedback.get("next_steps", []))
+    return fields
+
+
+def _markdown_escape(text: str) -> str:
+    # Keep the text literal inside list items and table cells (no emphasis, columns or inline HTML)
+    text = text.replace("\\", "\\\\").replace("|", "\\|").replace("*", "\\*").replace("_", "\\_")
+    return text.replace("<", "&lt;").replace(">", "&gt;").replace("\n", " ")
+
+
+def _render_markdown(session: InterviewSession, feedback: Dict, scores: Dict) -> Dict[str, str]:
+    escape = _markdown_escape
+    fields = _common_fields(session, feedback, scores, escape)
+    fields["score_rows"] = "\n".join(
+        f"| {label} | {float(scores[name]):.1f} |" for name, label in SCORE_LABELS if name in scores
+    )
+    fields["strengths"] = "\n".join(f"- {escape(str(s))}" for s in feedback.get("strengths", []))
+    fields["areas"] = "\n".join(
+        "- "
+        + (f"**{escape(str(area.get('area', '')))}**: " if area.get("area") else "")
+        + escape(str(area.get("issue", "")))
+        + (f"  \n  _{escape(str(area.get('recommendation', '')))}_" if area.get("recommendation") else "")
+        for area in _areas(feedback)
+    ) or "None noted."
+    fields["next_steps"] = "\n".join(
+        f"{number}. {escape(str(step))}" for number, step in enumerate(feedback.get("next_steps", []), start=1)
+    )
+    return fields
+
+
+Metrics.register_collector("report_renderer", ReportRenderer.status)
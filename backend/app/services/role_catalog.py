@@ -0,0 +1,243 @@
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+import json
+import re
+from app.config import get_settings
+from app.services.metrics import Metrics
+
+settings = get_settings()
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "role_catalog.json"
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Inputs shorter than this only resolve exactly ("ae", "qa" are too short to fuzz)
+FUZZY_MIN_LENGTH = 4
+
+# Resolutions kept per normalized role string; cleared on reload or when full
+RESOLVE_CACHE_SIZE = 4096
+
+
+def normalize_role(role: str) -> str:
+    """Lowercase, punctuation to spaces, whitespace collapsed: "Sr. Software-Engineer " -> "sr software engineer" """
+    return " ".join(_NON_ALNUM.sub(" ", (role or "").lower()).split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class RoleMatch(NamedTuple):
+    key: str          # canonical role, or the normalized input when unresolved
+    display: str      # catalog display name, or the input as typed when unresolved
+    method: str       # exact / tokens / trigram / unresolved
+    score: float
+
+
+class RoleCatalog:
+    """Maps free-text roles to canonical catalog roles.
+
+    The catalog file ({"key": {"display": "...", "aliases": [...]}}) is indexed
+    once on load: normalized aliases for exact lookup, a token -> alias index
+    and a trigram -> alias inverted index. `resolve` tries, in order:
+
+    - exact: the normalized input is an alias
+    - tokens: the input contains every token of an alias, in order
+      ("senior backend engineer ii"); the longest alias wins, then the one
+      ending last, since the head noun of a job title comes last
+      ("sales engineer" is an engineer)
+    - trigram: typos only. Aliases whose trigram Dice similarity with the
+      input is at least ROLE_MATCH_THRESHOLD are candidates; one matches
+      when the whole input is within a few edits of it (see `_max_edits`),
+      so a shared prefix alone ("accountant" / "account exec") never does
+
+    Unresolved roles keep their normalized text as key, are counted, and are
+    appended to ROLE_UNRESOLVED_LOG so the catalog can grow.
+    """
+
+    _roles: Dict[str, Dict] = {}                       # key -> {"display", "aliases"}
+    _aliases: Dict[str, str] = {}                      # normalized alias -> key
+    _alias_tokens: Dict[str, Tuple[str, ...]] = {}     # normalized alias -> tokens
+    _alias_trigrams: Dict[str, Set[str]] = {}          # normalized alias -> trigrams
+    _by_token: Dict[str, List[str]] = {}               # token -> aliases containing it
+    _by_trigram: Dict[str, List[str]] = {}             # trigram -> aliases containing it
+    _cache: Dict[str, RoleMatch] = {}
+    _unresolved: Counter = Counter()
+    _path: Path = None
+
+    @classmethod
+    def load(cls, path: str = None):
+        """(Re)build the index from a catalog file"""
+        cls._path = Path(path or settings.ROLE_CATALOG_PATH or DEFAULT_CATALOG_PATH)
+        with open(cls._path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+
+        roles, aliases = {}, {}
+        for key, entry in raw.items():
+            names = [key, entry.get("display", key), *entry.get("aliases", [])]
+            normalized = [alias for alias in dict.fromkeys(normalize_role(name) for name in names) if alias]
+            roles[key] = {"display": entry.get("display", key), "aliases": normalized}
+            for alias in normalized:
+                if aliases.setdefault(alias, key) != key:
+                    print(f"⚠️ Role alias '{alias}' is listed under both '{aliases[alias]}' and '{key}', keeping '{aliases[alias]}'")
+
+        by_token: Dict[str, List[str]] = {}
+        by_trigram: Dict[str, List[str]] = {}
+        alias_tokens, alias_trigrams = {}, {}
+        for alias in aliases:
+            alias_tokens[alias] = tuple(alias.split())
+            alias_trigrams[alias] = _trigrams(alias)
+            for token in set(alias_tokens[alias]):
+                by_token.setdefault(token, []).append(alias)
+            for trigram in alias_trigrams[alias]:
+                by_trigram.setdefault(trigram, []).append(alias)
+
+        cls._roles = roles
+        cls._aliases = aliases
+        cls._alias_tokens = alias_tokens
+        cls._alias_trigrams = alias_trigrams
+        cls._by_token = by_token
+        cls._by_trigram = by_trigram
+        cls._cache = {}
+        print(f"🗂️ Role catalog loaded: {len(roles)} roles, {len(aliases)} aliases from {cls._path.name}")
+
+    @classmethod
+    def roles(cls) -> List[str]:
+        cls._ensure_loaded()
+        return list(cls._roles)
+
+    @classmethod
+    def display_name(cls, key: str) -> str:
+        cls._ensure_loaded()
+        entry = cls._roles.get(key)
+        return entry["display"] if entry else key
+
+    @classmethod
+    def resolve(cls, role: str) -> RoleMatch:
+        match = cls._lookup(role)
+        Metrics.incr("roles_resolved", method=match.method)
+        if match.method == "unresolved":
+            cls._record_unresolved(role, match.key)
+            return match._replace(display=(role or "").strip() or match.key)
+        return match
+
+    @classmethod
+    def key_for(cls, role: str) -> str:
+        """Canonical key for a role filter or lookup; unlike `resolve`, not counted or logged"""
+        return cls._lookup(role).key
+
+    @classmethod
+    def _lookup(cls, role: str) -> RoleMatch:
+        cls._ensure_loaded()
+        normalized = normalize_role(role)
+        match = cls._cache.get(normalized)
+        if match is None:
+            match = cls._match(normalized)
+            if len(cls._cache) >= RESOLVE_CACHE_SIZE:
+                cls._cache = {}
+            cls._cache[normalized] = match
+        return match
+
+    @classmethod
+    def _match(cls, normalized: str) -> RoleMatch:
+        key = cls._aliases.get(normalized)
+        if key is not None:
+            return cls._found(key, "exact", 1.0)
+
+        tokens = normalized.split()
+        best = None  # (alias token count, end position)
+        for token in set(tokens):
+            for alias in cls._by_token.get(token, ()):
+                end = _contains(tokens, cls._alias_tokens[alias])
+                if end is not None and (best is None or (len(cls._alias_tokens[alias]), end) > best[:2]):
+                    best = (len(cls._alias_tokens[alias]), end, alias)
+        if best is not None:
+            return cls._found(cls._aliases[best[2]], "tokens", best[0] / len(tokens))
+
+        if len(normalized) >= FUZZY_MIN_LENGTH:
+            grams = _trigrams(normalized)
+            shared = Counter()
+            for trigram in grams:
+                for alias in cls._by_trigram.get(trigram, ()):
+                    shared[alias] += 1
+            best = None  # (edits, -score, alias)
+            for alias, count in shared.items():
+                score = 2.0 * count / (len(grams) + len(cls._alias_trigrams[alias]))
+                if score < settings.ROLE_MATCH_THRESHOLD:
+                    continue
+                edits = _edit_distance(normalized, alias, _max_edits(alias))
+                if edits is not None and (best is None or (edits, -score) < best[:2]):
+                    best = (edits, -score, alias)
+            if best is not None:
+                return cls._found(cls._aliases[best[2]], "trigram", round(-best[1], 3))
+
+        return RoleMatch(normalized or "unknown", normalized, "unresolved", 0.0)
+
+    @classmethod
+    def _found(cls, key: str, method: str, score: float) -> RoleMatch:
+        return RoleMatch(key, cls._roles[key]["display"], method, score)
+
+    @classmethod
+    def _record_unresolved(cls, role: str, key: str):
+        cls._unresolved[key] += 1
+        if cls._unresolved[key] > 1:
+            return
+        print(f"❓ Role '{role}' is not in the catalog")
+        if not settings.ROLE_UNRESOLVED_LOG:
+            return
+        entry = {"timestamp": datetime.utcnow().isoformat(), "role": role, "normalized": key}
+        try:
+            with open(settings.ROLE_UNRESOLVED_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not log unresolved role: {e}")
+
+    @classmethod
+    def _ensure_loaded(cls):
+        if cls._path is None:
+            cls.load()
+
+    @classmethod
+    def status(cls) -> Dict:
+        return {
+            "roles": len(cls._roles),
+            "aliases": len(cls._aliases),
+            "unresolved": dict(cls._unresolved.most_common(20))
+        }
+
+
+def _max_edits(alias: str) -> int:
+    return settings.ROLE_MATCH_MAX_EDITS if len(alias) >= 10 else min(1, settings.ROLE_MATCH_MAX_EDITS)
+
+
+def _edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """Edits (insert, delete, substitute, swap adjacent) turning `a` into `b`, or None if more than `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return None
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def _contains(tokens: List[str], alias_tokens: Tuple[str, ...]) -> Optional[int]:
+    """End index of the first contiguous run of `alias_tokens` in `tokens`, or None"""
+    size = len(alias_tokens)
+    for start in range(len(tokens) - size, -1, -1):
+        if tuple(tokens[start:start + size]) == alias_tokens:
+            return start + size
+    return None
+
+
+Metrics.register_collector("role_catalog", RoleCatalog.status)
@@ -1,9 +1,11 @@
 from typing import List, Dict
 from collections import Counter
+from app.services.answer_features import AnswerFeatures
+from app.models.turn import Speaker, Turn
 
 class ScoringEngine:
     @staticmethod
-    async def generate_overall_scores(conversation_history: List[Dict]) -> Dict[str, float]:
+    async def generate_overall_scores(conversation_history: List[Turn]) -> Dict[str, float]:
         """Generate persona-aware scores with realistic, balanced criteria"""
         
         print(f"📊 Scoring Engine Called")
@@ -24,16 +26,17 @@ class ScoringEngine:
         answer_personas = []
         
         for i, entry in enumerate(conversation_history):
-            if entry.get("role") == "user":
-                content = entry.get("content", "")
-                persona = entry.get("persona_detected", "neutral")
+            if entry.speaker == Speaker.USER:
+                content = entry.content
+                persona = entry.persona or "neutral"
+                word_count = AnswerFeatures.of(entry).word_count
                 
-                print(f"  📌 User answer {len(answers)+1}: persona='{persona}', length={len(content.split())} words")
+                print(f"  📌 User answer {len(answers)+1}: persona='{persona}', length={word_count} words")
                 
                 answers.append({
                     "content": content,
                     "persona": persona,
-                    "length": len(content.split())
+                    "length": word_count
                 })
                 answer_personas.append(persona)
         
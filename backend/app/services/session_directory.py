@@ -0,0 +1,221 @@
+import asyncio
+import base64
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, event, insert, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from app.config import get_settings
+from app.database.db import engine
+from app.models.session import InterviewSession, SUMMARY_COLUMNS
+from app.services.metrics import Metrics
+
+settings = get_settings()
+
+MAX_PAGE_SIZE = 100
+
+_table = InterviewSession.__table__
+
+
+class InvalidCursorError(ValueError):
+    """The cursor was not issued by a listing"""
+
+
+class SessionDirectory:
+    """Paged listing of sessions, newest first, from their rows in DATABASE_URL.
+
+    Live sessions are kept in memory (session_store); their summary columns
+    are written behind to `interview_sessions`: sessions are queued when
+    created and whenever a summary column is set, and written in one batch
+    off the event loop every SESSION_DIRECTORY_FLUSH_INTERVAL seconds.
+    Listings flush the queue first, so they see every change. A completed
+    session's conversation history is written once as well, with the first
+    flush after it completes; scripts/rebuild_transcript_index.py reads it.
+
+    Pages are keyset-paginated over (created_at, id): the cursor holds the
+    last row's key and the next page starts strictly below it, so a page
+    costs the same at any depth and rows created meanwhile neither shift nor
+    repeat entries. Each filter (none, status, role) has a matching
+    (column, created_at, id) index that also holds the other
+    SUMMARY_COLUMNS, the only columns selected, so pages are served from the
+    index alone.
+    """
+
+    _pending: Dict[str, Optional[InterviewSession]] = {}  # session id -> session to write, or None to delete
+    _flusher: Optional[asyncio.Task] = None
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return settings.SESSION_DIRECTORY_ENABLED
+
+    # --- writes ---
+
+    @classmethod
+    def add(cls, session: InterviewSession):
+        """Start writing a live session's summary, now and on every change"""
+        if not cls.enabled():
+            return
+        session.__dict__["_listed"] = True
+        cls.touch(session)
+
+    @classmethod
+    def touch(cls, session: InterviewSession):
+        cls._pending[session.id] = session
+        cls._schedule_flush()
+
+    @classmethod
+    def remove(cls, session_id: str):
+        if not cls.enabled():
+            return
+        cls._pending[session_id] = None
+        cls._schedule_flush()
+
+    @classmethod
+    def _schedule_flush(cls):
+        if cls._flusher is not None and not cls._flusher.done():
+            return
+        try:
+            cls._flusher = asyncio.get_running_loop().create_task(cls._flush_later())
+        except RuntimeError:
+            pass  # no event loop (scripts): written by the next flush()
+
+    @classmethod
+    async def _flush_later(cls):
+        await asyncio.sleep(settings.SESSION_DIRECTORY_FLUSH_INTERVAL)
+        await cls.flush()
+
+    @classmethod
+    async def flush(cls):
+        """Write every queued summary (in a worker thread)"""
+        if not cls._pending:
+            return
+        batch, cls._pending = cls._pending, {}
+        # Snapshot on the event loop, where the sessions are mutated
+        rows = {session_id: _summary(session) if session is not None else None for session_id, session in batch.items()}
+        try:
+            await asyncio.to_thread(cls._write, rows)
+            for session_id, row in rows.items():
+                if row is not None and "conversation_history" in row:
+                    batch[session_id].__dict__["_history_saved"] = True
+        except SQLAlchemyError as e:
+            # Requeue whatever has not changed since; it is retried on the next flush
+            for session_id, session in batch.items():
+                cls._pending.setdefault(session_id, session)
+            Metrics.incr("session_directory_errors", op="write")
+            print(f"⚠️ Session directory write failed, {len(rows)} sessions requeued: {e}")
+
+    @staticmethod
+    def _write(rows: Dict[str, Optional[Dict]]):
+        with engine.begin() as conn:
+            for session_id, row in rows.items():
+                if row is None:
+                    conn.execute(delete(_table).where(_table.c.id == session_id))
+                elif conn.execute(update(_table).where(_table.c.id == session_id).values(row)).rowcount == 0:
+                    conn.execute(insert(_table).values(row))
+        Metrics.incr("session_directory_writes", len(rows))
+
+    # --- listing ---
+
+    @classmethod
+    async def list_page(
+        cls,
+        status: Optional[str] = None,
+        role: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """One page of session summaries, newest first.
+
+        `role` is a canonical role key; `since` / `until` are ISO dates or
+        datetimes bounding created_at (a bare `until` date covers that whole
+        day). Page with `cursor` = the previous response's `next_cursor`.
+        Raises ValueError for a bad date or cursor.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = select(*[_table.c[name] for name in SUMMARY_COLUMNS])
+        if status:
+            query = query.where(_table.c.status == status)
+        if role:
+            query = query.where(_table.c.role == role)
+        if since:
+            query = query.where(_table.c.created_at >= _parse_time(since))
+        if until:
+            query = query.where(_table.c.created_at < _parse_time(until, day_end=True))
+        if cursor:
+            created_at, session_id = decode_cursor(cursor)
+            query = query.where(tuple_(_table.c.created_at, _table.c.id) < tuple_(created_at, session_id))
+        query = query.order_by(_table.c.created_at.desc(), _table.c.id.desc()).limit(limit + 1)
+
+        await cls.flush()
+        rows = await asyncio.to_thread(cls._read, query)
+        Metrics.incr("session_listings")
+
+        page = [_listing(row) for row in rows[:limit]]
+        last = rows[limit - 1] if len(rows) > limit else None
+        return {
+            "sessions": page,
+            "next_cursor": encode_cursor(last.created_at, last.id) if last is not None else None
+        }
+
+    @staticmethod
+    def _read(query) -> List:
+        with engine.connect() as conn:
+            return conn.execute(query).fetchall()
+
+
+def _summary(session: InterviewSession) -> Dict:
+    row = {name: getattr(session, name) for name in SUMMARY_COLUMNS}
+    # Completed histories no longer change: store them once for offline use
+    if session.status == "completed" and not session.__dict__.get("_history_saved"):
+        row["conversation_history"] = session.history.to_json()
+    return row
+
+
+def _listing(row) -> Dict:
+    return {
+        "session_id": row.id,
+        "role": row.role,
+        "role_display": row.role_display,
+        "status": row.status,
+        "persona": row.persona,
+        "current_question": row.current_question_index,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "completed_at": row.completed_at.isoformat() if row.completed_at else None,
+        "report_status": row.report_status,
+        "degraded_turns": row.degraded_turns or 0
+    }
+
+
+def encode_cursor(created_at: datetime, session_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{session_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, session_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), session_id
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def _parse_time(value: str, day_end: bool = False) -> datetime:
+    if len(value) == 10:
+        day = date.fromisoformat(value)
+        return datetime.combine(day + timedelta(days=1) if day_end else day, datetime.min.time())
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        # created_at is stored as naive UTC
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _summary_changed(target: InterviewSession, value, oldvalue, initiator):
+    if target.__dict__.get("_listed") and value != oldvalue:
+        SessionDirectory.touch(target)
+
+
+for _column in SUMMARY_COLUMNS[1:]:
+    event.listen(getattr(InterviewSession, _column), "set", _summary_changed)
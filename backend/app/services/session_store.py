@@ -0,0 +1,54 @@
+import asyncio
+import uuid
+from typing import Dict
+from datetime import datetime
+from app.models.session import InterviewSession
+from app.services.role_catalog import RoleCatalog
+from app.services.session_directory import SessionDirectory
+from app.services.transcript_index import TranscriptIndex
+
+# In-memory session storage shared by the REST and WebSocket transports
+# (replace with database in production)
+sessions: Dict[str, InterviewSession] = {}
+
+# One lock per session so turns for the same session never interleave across transports
+_session_locks: Dict[str, asyncio.Lock] = {}
+
+
+def new_session(role: str) -> InterviewSession:
+    """A new active session for the canonical form of `role`, not registered anywhere (batch runs)"""
+    match = RoleCatalog.resolve(role)
+    return InterviewSession(
+        id=str(uuid.uuid4()),
+        role=match.key,
+        role_display=role.strip() or match.display,
+        created_at=datetime.utcnow(),
+        status="active"
+    )
+
+
+def create_session(role: str) -> InterviewSession:
+    """Create and register a new active session for the canonical form of `role`"""
+    session = new_session(role)
+    sessions[session.id] = session
+    SessionDirectory.add(session)
+    return session
+
+
+def session_lock(session_id: str) -> asyncio.Lock:
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[session_id] = lock
+    return lock
+
+
+def delete_session(session_id: str) -> bool:
+    _session_locks.pop(session_id, None)
+    session = sessions.pop(session_id, None)
+    if session is None:
+        return False
+    session.discard_history()
+    TranscriptIndex.forget(session_id)
+    SessionDirectory.remove(session_id)
+    return True
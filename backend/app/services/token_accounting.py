@@ -0,0 +1,164 @@
+import contextlib
+import functools
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.services.metrics import Metrics
+
+settings = get_settings()
+
+# Session whose LLM calls are being metered (None outside interview turns and reports)
+_metered_session: ContextVar = ContextVar("token_metered_session", default=None)
+
+_COUNTERS = ("prompt_tokens", "completion_tokens", "total_tokens", "calls")
+
+
+def _empty() -> Dict[str, int]:
+    return {counter: 0 for counter in _COUNTERS}
+
+
+def _add(counters: Dict[str, int], prompt_tokens: int, completion_tokens: int):
+    counters["prompt_tokens"] += prompt_tokens
+    counters["completion_tokens"] += completion_tokens
+    counters["total_tokens"] += prompt_tokens + completion_tokens
+    counters["calls"] += 1
+
+
+class TokenAccounting:
+    """Prompt/completion tokens per LLM call, rolled up per session and globally.
+
+    Counts come from the provider's `usage` block; calls that don't report one
+    (some streams) are estimated from message length and streamed deltas and
+    counted under `llm_usage_estimated`. Session usage is kept on
+    InterviewSession.token_usage:
+        {"prompt_tokens", "completion_tokens", "total_tokens", "calls",
+         "by_call_type": {"<call type>": {same counters}}}
+
+    With SESSION_TOKEN_BUDGET set, a session past TOKEN_BUDGET_TIGHTEN_AT of
+    its budget gets linearly smaller prompt history windows and max_tokens;
+    once the budget is spent its turns run degraded (static questions,
+    rule-based persona) and its report uses template feedback.
+    """
+
+    _totals: Dict[str, Dict[str, int]] = {}  # call type -> counters
+
+    @staticmethod
+    @contextlib.contextmanager
+    def metering(session):
+        """Attribute LLM calls made inside the block to `session`"""
+        token = _metered_session.set(session)
+        try:
+            yield
+        finally:
+            _metered_session.reset(token)
+
+    @staticmethod
+    def metered(method):
+        """Decorator for ConversationManager turn methods"""
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            with TokenAccounting.metering(self.session):
+                return await method(self, *args, **kwargs)
+        return wrapper
+
+    @classmethod
+    def record(cls, call_type: str, model: str, prompt_tokens: int, completion_tokens: int, estimated: bool = False):
+        Metrics.incr("llm_prompt_tokens", prompt_tokens, call_type=call_type, model=model)
+        Metrics.incr("llm_completion_tokens", completion_tokens, call_type=call_type, model=model)
+        if estimated:
+            Metrics.incr("llm_usage_estimated", call_type=call_type)
+
+        _add(cls._totals.setdefault(call_type, _empty()), prompt_tokens, completion_tokens)
+
+        session = _metered_session.get()
+        if session is not None:
+            usage = session.token_usage or {**_empty(), "by_call_type": {}}
+            _add(usage, prompt_tokens, completion_tokens)
+            _add(usage["by_call_type"].setdefault(call_type, _empty()), prompt_tokens, completion_tokens)
+            session.token_usage = usage
+
+    @staticmethod
+    def usage_counts(usage) -> Optional[Tuple[int, int]]:
+        """(prompt, completion) tokens from an SDK usage object or a raw usage dict"""
+        if usage is None:
+            return None
+        if isinstance(usage, dict):
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        else:
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+        if prompt_tokens is None or completion_tokens is None:
+            return None
+        return int(prompt_tokens), int(completion_tokens)
+
+    @staticmethod
+    def estimate(messages: List[Dict[str, str]], completion: str) -> Tuple[int, int]:
+        """(prompt, completion) tokens when the provider reports no usage"""
+        # ~4 characters per token, plus a few tokens of chat framing per message
+        prompt_tokens = sum(len(message.get("content") or "") for message in messages) // 4 + 4 * len(messages)
+        return prompt_tokens, len(completion or "") // 4 + 1
+
+    # --- budgets ---
+
+    @staticmethod
+    def _session_used() -> Optional[int]:
+        """Tokens spent by the metered session, or None when no budget applies"""
+        session = _metered_session.get()
+        if settings.SESSION_TOKEN_BUDGET <= 0 or session is None:
+            return None
+        return (session.token_usage or {}).get("total_tokens", 0)
+
+    @classmethod
+    def pressure(cls) -> float:
+        """0.0 until the session passes TOKEN_BUDGET_TIGHTEN_AT of its budget, rising to 1.0 when it is spent"""
+        used = cls._session_used()
+        if used is None:
+            return 0.0
+        fraction = used / settings.SESSION_TOKEN_BUDGET
+        start = min(settings.TOKEN_BUDGET_TIGHTEN_AT, 0.99)
+        if fraction <= start:
+            return 0.0
+        return min(1.0, (fraction - start) / (1.0 - start))
+
+    @classmethod
+    def exhausted(cls) -> bool:
+        used = cls._session_used()
+        return used is not None and used >= settings.SESSION_TOKEN_BUDGET
+
+    @classmethod
+    def max_tokens(cls, requested: int) -> int:
+        """`requested` shrunk toward TOKEN_BUDGET_MIN_MAX_TOKENS as the session budget runs out"""
+        if settings.SESSION_TOKEN_BUDGET <= 0:
+            return requested
+        pressure = cls.pressure()
+        floor = min(requested, settings.TOKEN_BUDGET_MIN_MAX_TOKENS)
+        return max(floor, round(requested - (requested - floor) * pressure))
+
+    @classmethod
+    def window(cls, turns: int) -> int:
+        """Prompt history window shrunk toward TOKEN_BUDGET_MIN_WINDOW turns"""
+        # Called for every prompt built: skip the budget lookup when budgets are off
+        if settings.SESSION_TOKEN_BUDGET <= 0:
+            return turns
+        pressure = cls.pressure()
+        floor = min(turns, max(settings.TOKEN_BUDGET_MIN_WINDOW, 1))
+        return max(floor, round(turns - (turns - floor) * pressure))
+
+    @classmethod
+    def status(cls) -> Dict:
+        total = _empty()
+        for counters in cls._totals.values():
+            for counter in _COUNTERS:
+                total[counter] += counters[counter]
+        return {
+            **total,
+            "by_call_type": {call_type: dict(counters) for call_type, counters in cls._totals.items()},
+            "session_budget": settings.SESSION_TOKEN_BUDGET or None
+        }
+
+    @classmethod
+    def reset(cls):
+        cls._totals = {}
+
+
+Metrics.register_collector("llm_tokens", TokenAccounting.status)
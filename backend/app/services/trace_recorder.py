@@ -0,0 +1,153 @@
+import functools
+import hashlib
+import json
+import re
+import secrets
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+TRACE_VERSION = 1
+
+# LLM calls made while the current turn runs (None outside traced turns)
+_turn_calls: ContextVar[Optional[List[Dict]]] = ContextVar("trace_turn_calls", default=None)
+
+_SCRUBBERS = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"https?://\S+|www\.\S+"), "<url>"),
+    (re.compile(r"\+?\d[\d\s().-]{6,}\d"), "<number>"),
+]
+
+_process_salt = secrets.token_hex(16)
+
+
+def scrub(text: str) -> str:
+    """Replace emails, URLs and phone-like numbers"""
+    for pattern, replacement in _SCRUBBERS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class TraceRecorder:
+    """Writes one anonymized JSONL event per interview turn to TRACE_LOG.
+
+    Event shape:
+        {"v": 1, "session": "<hashed id>", "turn": 0, "event": "start" | "message" | "conclude",
+         "ts": <epoch seconds at turn start>, "think_seconds": <gap since the previous turn ended>,
+         "seconds": <turn duration>, "role": ..., "answer_chars": ..., "answer_words": ...,
+         "persona": ..., "degraded": ..., "complete": ..., "error": ...,
+         "llm_calls": [{"call_type": ..., "model": ..., "seconds": ..., "ok": ...}]}
+
+    Session ids are salted hashes (TRACE_SALT, or a per-process salt so traces
+    can't be joined across restarts). Answer text is only stored, scrubbed of
+    emails/URLs/numbers, with TRACE_INCLUDE_CONTENT. TRACE_SAMPLE_RATE picks a
+    stable fraction of sessions. scripts/replay_traces.py replays the log.
+    """
+
+    _sessions: "OrderedDict[str, Dict]" = OrderedDict()  # anon id -> {"turn", "last_end"}
+    MAX_TRACKED_SESSIONS = 10000
+
+    @staticmethod
+    def traced(event: str):
+        """Decorator for ConversationManager turn methods; nested turns are part of the outer one"""
+        def decorate(method):
+            @functools.wraps(method)
+            async def wrapper(self, *args, **kwargs):
+                if not settings.TRACE_LOG or _turn_calls.get() is not None:
+                    return await method(self, *args, **kwargs)
+
+                anon = TraceRecorder._anonymize(self.session.id)
+                if not TraceRecorder._sampled(anon):
+                    return await method(self, *args, **kwargs)
+
+                calls: List[Dict] = []
+                token = _turn_calls.set(calls)
+                started_at = time.time()
+                started = time.perf_counter()
+                result = None
+                try:
+                    result = await method(self, *args, **kwargs)
+                    return result
+                finally:
+                    _turn_calls.reset(token)
+                    answer = args[0] if event == "message" and args else kwargs.get("user_message")
+                    TraceRecorder._write(
+                        anon, event, self.session.role, answer, result or {},
+                        started_at, time.perf_counter() - started, calls
+                    )
+            return wrapper
+        return decorate
+
+    @staticmethod
+    def record_llm_call(call_type: str, model: str, seconds: float, ok: bool):
+        """Attach one upstream attempt to the turn being traced (no-op outside traced turns)"""
+        calls = _turn_calls.get()
+        if calls is not None:
+            calls.append({"call_type": call_type, "model": model, "seconds": round(seconds, 4), "ok": ok})
+
+    @staticmethod
+    def _anonymize(session_id: str) -> str:
+        salt = settings.TRACE_SALT or _process_salt
+        return hashlib.sha256(f"{salt}:{session_id}".encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _sampled(anon: str) -> bool:
+        if settings.TRACE_SAMPLE_RATE >= 1.0:
+            return True
+        return int(anon[:8], 16) / 0xFFFFFFFF < settings.TRACE_SAMPLE_RATE
+
+    @classmethod
+    def _write(
+        cls,
+        anon: str,
+        event: str,
+        role: str,
+        answer: Optional[str],
+        result: Dict,
+        started_at: float,
+        seconds: float,
+        calls: List[Dict]
+    ):
+        state = cls._sessions.get(anon)
+        if state is None:
+            state = {"turn": 0, "last_end": None}
+            cls._sessions[anon] = state
+            if len(cls._sessions) > cls.MAX_TRACKED_SESSIONS:
+                cls._sessions.popitem(last=False)
+
+        entry = {
+            "v": TRACE_VERSION,
+            "session": anon,
+            "turn": state["turn"],
+            "event": event,
+            "ts": round(started_at, 3),
+            "think_seconds": round(started_at - state["last_end"], 3) if state["last_end"] is not None else None,
+            "seconds": round(seconds, 4),
+            "persona": result.get("persona_detected"),
+            "degraded": bool(result.get("degraded")),
+            "complete": bool(result.get("interview_complete")),
+            "error": result.get("type") == "error" or not result,
+            "llm_calls": calls
+        }
+        if event == "start":
+            entry["role"] = role
+        if answer is not None:
+            entry["answer_chars"] = len(answer)
+            entry["answer_words"] = len(answer.split())
+            if settings.TRACE_INCLUDE_CONTENT:
+                entry["answer"] = scrub(answer)
+
+        state["turn"] += 1
+        state["last_end"] = started_at + seconds
+        if entry["complete"]:
+            cls._sessions.pop(anon, None)
+
+        try:
+            with open(settings.TRACE_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write trace event: {e}")
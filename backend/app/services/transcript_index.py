@@ -0,0 +1,343 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config import get_settings
+from app.models.history import ConversationHistory
+from app.models.session import InterviewSession
+from app.services.metrics import Metrics
+
+settings = get_settings()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    turn_index INTEGER NOT NULL,
+    speaker TEXT NOT NULL,
+    role TEXT,
+    persona TEXT,
+    ts TEXT,
+    content TEXT NOT NULL,
+    UNIQUE (session_id, turn_index)
+);
+CREATE INDEX IF NOT EXISTS turns_role_ts ON turns (role, ts);
+CREATE INDEX IF NOT EXISTS turns_ts ON turns (ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    content, content='turns', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+# (session_id, turn_index, speaker, role, persona, ts, content)
+Row = Tuple[str, int, str, Optional[str], Optional[str], Optional[str], str]
+
+MAX_PAGE_SIZE = 100
+
+
+class SearchQueryError(ValueError):
+    """The query is not valid FTS5 syntax"""
+
+
+class TranscriptIndex:
+    """Full-text search over interview turns (SQLite FTS5), fed as turns complete.
+
+    Turns live in a plain `turns` table (filters: role, speaker, persona,
+    timestamp); `turns_fts` is an external-content FTS5 index over their
+    text kept in sync by triggers. Completed turns are queued by
+    ConversationManager and written in batches off the event loop every
+    TRANSCRIPT_INDEX_FLUSH_INTERVAL seconds; searches flush the queue first,
+    so they see every completed turn. Cancelled turns are rolled back before
+    they are queued, so the index never holds them.
+
+    The index is a separate SQLite file (TRANSCRIPT_INDEX_PATH, empty
+    disables it), rebuilt from stored sessions by
+    scripts/rebuild_transcript_index.py. Rebuilds write a new file next to
+    it and swap it in only once complete, so a failed rebuild keeps the
+    current index. A running server re-indexes its in-memory sessions in
+    place (`reindex`), leaving the turns of earlier processes alone.
+    """
+
+    _conn: Optional[sqlite3.Connection] = None
+    _lock = threading.Lock()
+    _pending: List[Tuple[str, str, object]] = []  # (op, session_id, (start index, rows) for "add")
+    _flusher: Optional[asyncio.Task] = None
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return bool(settings.TRANSCRIPT_INDEX_PATH)
+
+    @classmethod
+    def _connection(cls) -> sqlite3.Connection:
+        if cls._conn is None:
+            conn = sqlite3.connect(settings.TRANSCRIPT_INDEX_PATH, check_same_thread=False)
+            if settings.TRANSCRIPT_INDEX_PATH != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            cls._conn = conn
+        return cls._conn
+
+    # --- writes ---
+
+    @classmethod
+    def add_turns(cls, session: InterviewSession, history: ConversationHistory, start: int):
+        """Queue the turns from `start` on (those a completed turn added) for indexing"""
+        if not cls.enabled() or start >= len(history):
+            return
+        rows = [_row(session, index, entry) for index, entry in enumerate(history.dicts_from(start), start=start)]
+        cls._pending.append(("add", session.id, (start, rows)))
+        cls._schedule_flush()
+
+    @classmethod
+    def forget(cls, session_id: str):
+        """Queue removal of a deleted session's turns"""
+        if not cls.enabled():
+            return
+        cls._pending.append(("delete", session_id, None))
+        cls._schedule_flush()
+
+    @classmethod
+    def _schedule_flush(cls):
+        if cls._flusher is not None and not cls._flusher.done():
+            return
+        try:
+            cls._flusher = asyncio.get_running_loop().create_task(cls._flush_later())
+        except RuntimeError:
+            cls._write(cls._take_pending())  # no event loop (scripts): write now
+
+    @classmethod
+    async def _flush_later(cls):
+        await asyncio.sleep(settings.TRANSCRIPT_INDEX_FLUSH_INTERVAL)
+        await cls.flush()
+
+    @classmethod
+    async def flush(cls):
+        """Write every queued change (in a worker thread)"""
+        batch = cls._take_pending()
+        if batch:
+            try:
+                await asyncio.to_thread(cls._write, batch)
+            except sqlite3.Error as e:
+                Metrics.incr("transcript_index_errors", op="write")
+                print(f"⚠️ Transcript index write failed, {len(batch)} changes dropped: {e}")
+
+    @classmethod
+    def _take_pending(cls) -> List[Tuple[str, str, object]]:
+        batch, cls._pending = cls._pending, []
+        return batch
+
+    @classmethod
+    def _write(cls, batch: List[Tuple[str, str, object]]) -> int:
+        indexed = 0
+        with cls._lock:
+            conn = cls._connection()
+            with conn:
+                for op, session_id, payload in batch:
+                    if op == "delete":
+                        conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+                        continue
+                    start, rows = payload
+                    # Replaces turns a rebuilt history may have re-numbered
+                    conn.execute("DELETE FROM turns WHERE session_id = ? AND turn_index >= ?", (session_id, start))
+                    conn.executemany(
+                        "INSERT INTO turns (session_id, turn_index, speaker, role, persona, ts, content) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    indexed += len(rows)
+        Metrics.incr("transcript_index_turns", indexed)
+        return indexed
+
+    @classmethod
+    def reindex(cls, rows_by_session: Dict[str, List[Row]]) -> int:
+        """Replace the turns of these sessions only (see session_rows); every other session's turns are kept"""
+        return cls._write([("add", session_id, (0, rows)) for session_id, rows in rows_by_session.items()])
+
+    @classmethod
+    def rebuild(cls, rows: Iterable[Row], allow_empty: bool = True) -> int:
+        """Replace the whole index with `rows` (see session_rows); returns the turns indexed.
+
+        The new index is built aside (`<path>.rebuild`) and replaces the
+        current one only once complete. With `allow_empty=False`, a rebuild
+        that found no turns raises ValueError and keeps a non-empty index.
+        Changes queued meanwhile are applied to the new index.
+        """
+        path = settings.TRANSCRIPT_INDEX_PATH
+        in_memory = path == ":memory:"
+        build_path = ":memory:" if in_memory else path + ".rebuild"
+        if not in_memory:
+            _remove_files(build_path, build_path + "-journal")
+
+        indexed = 0
+        conn = sqlite3.connect(build_path, check_same_thread=False)
+        try:
+            conn.executescript(_SCHEMA)
+            with conn:
+                for row in rows:
+                    conn.execute(
+                        "INSERT INTO turns (session_id, turn_index, speaker, role, persona, ts, content) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        row
+                    )
+                    indexed += 1
+                conn.execute("INSERT INTO turns_fts (turns_fts) VALUES ('optimize')")
+            if indexed == 0 and not allow_empty and cls.turn_count() > 0:
+                raise ValueError("no turns found to rebuild from; keeping the current index")
+        except BaseException:
+            conn.close()
+            if not in_memory:
+                _remove_files(build_path, build_path + "-journal")
+            raise
+
+        with cls._lock:
+            if in_memory:
+                previous, cls._conn = cls._conn, conn
+                if previous is not None:
+                    previous.close()
+            else:
+                conn.close()
+                if cls._conn is not None:
+                    cls._conn.close()
+                    cls._conn = None
+                # Our connection was the last one on the old file; its WAL must not outlive it
+                _remove_files(path + "-wal", path + "-shm")
+                os.replace(build_path, path)
+        print(f"🔎 Transcript index rebuilt: {indexed} turns")
+        return indexed
+
+    @classmethod
+    def turn_count(cls) -> int:
+        with cls._lock:
+            return cls._connection().execute("SELECT count(*) FROM turns").fetchone()[0]
+
+    # --- search ---
+
+    @classmethod
+    async def search(
+        cls,
+        query: str,
+        role: Optional[str] = None,
+        persona: Optional[str] = None,
+        speaker: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict:
+        """Best-ranked (bm25) matching turns with highlighted snippets.
+
+        Plain queries match turns containing every word; queries with double
+        quotes or FTS5 operators (AND / OR / NOT / NEAR, prefix*) are passed
+        through. `since` / `until` compare against ISO timestamps, so dates
+        ("2026-10-01") work.
+        """
+        await cls.flush()
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+
+        filters, params = ["turns_fts MATCH ?"], [_fts_query(query)]
+        for column, value in (("t.role", role), ("t.persona", persona), ("t.speaker", speaker)):
+            if value:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            filters.append("t.ts >= ?")
+            params.append(since)
+        if until:
+            # A bare date is inclusive: "2026-10-19" covers the whole day
+            filters.append("t.ts < ?")
+            params.append(_next_day(until) if len(until) == 10 else until)
+
+        sql = (
+            "SELECT t.session_id, t.turn_index, t.speaker, t.role, t.persona, t.ts, "
+            "snippet(turns_fts, 0, '[', ']', '…', 12), bm25(turns_fts) "
+            "FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid "
+            f"WHERE {' AND '.join(filters)} "
+            "ORDER BY bm25(turns_fts) LIMIT ? OFFSET ?"
+        )
+        params += [limit + 1, offset]
+
+        rows = await asyncio.to_thread(cls._read, sql, params)
+        Metrics.incr("transcript_searches")
+        results = [
+            {
+                "session_id": session_id,
+                "turn_index": turn_index,
+                "speaker": speaker_,
+                "role": role_,
+                "persona": persona_,
+                "timestamp": ts,
+                "snippet": snippet,
+                "score": round(-rank, 4)
+            }
+            for session_id, turn_index, speaker_, role_, persona_, ts, snippet, rank in rows[:limit]
+        ]
+        return {
+            "query": query,
+            "results": results,
+            "offset": offset,
+            "next_offset": offset + limit if len(rows) > limit else None
+        }
+
+    @classmethod
+    def _read(cls, sql: str, params: List) -> List[tuple]:
+        with cls._lock:
+            try:
+                return cls._connection().execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                # FTS5 reports bad MATCH syntax as OperationalError too ("unterminated string", "no such column", ...)
+                if "locked" in str(e) or "unable to open" in str(e):
+                    raise
+                raise SearchQueryError(str(e)) from e
+
+    @classmethod
+    def close(cls):
+        with cls._lock:
+            if cls._conn is not None:
+                cls._conn.close()
+                cls._conn = None
+
+
+def session_rows(session: InterviewSession, entries: Optional[List[Dict]] = None) -> List[Row]:
+    """Index rows for a session's whole history (`entries`: its turn dicts, if already at hand)"""
+    if entries is None:
+        entries = session.conversation_history
+    return [_row(session, index, entry) for index, entry in enumerate(entries)]
+
+
+def _row(session: InterviewSession, index: int, entry: Dict) -> Row:
+    persona = entry.get("persona_detected") or entry.get("persona_adapted")
+    return (session.id, index, entry["role"], session.role, persona, entry.get("timestamp"), entry.get("content", ""))
+
+
+def _remove_files(*paths: str):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _next_day(day: str) -> str:
+    try:
+        return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+    except ValueError:
+        return day
+
+
+_FTS_OPERATORS = ("AND", "OR", "NOT", "NEAR")
+
+
+def _fts_query(query: str) -> str:
+    """Plain text -> every word quoted (no syntax errors from punctuation); FTS5 syntax is passed through"""
+    words = query.split()
+    if '"' in query or "*" in query or any(word in _FTS_OPERATORS for word in words):
+        return query
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
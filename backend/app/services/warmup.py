@@ -0,0 +1,143 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.database.db import init_db
+from app.prompts.registry import PromptRegistry
+from app.services.answer_features import AnswerFeatures
+from app.services.interview_engine import InterviewEngine
+from app.services.lexicon_engine import LexiconEngine
+from app.services.llm_service import LLMService
+from app.services.model_router import ModelRouter
+from app.services.persona_classifier import PersonaClassifier, VALID_PERSONAS
+from app.services.role_catalog import RoleCatalog
+
+settings = get_settings()
+
+WARMUP_SAMPLE_ANSWER = (
+    "I'm not sure, maybe I guess the hardest part was debugging the cache layer. "
+    "Do you want more detail on how we fixed it?"
+)
+
+
+class Warmup:
+    """Startup phase that runs before the process reports ready on GET /ready.
+
+    Stages run in order and each gets what is left of the WARMUP_TIMEOUT
+    budget. A failed or timed-out stage is logged and recorded but doesn't
+    block readiness; the process is marked ready when the phase ends.
+    """
+
+    _ready = False
+    _stages: List[Dict] = []
+    _started_at: Optional[datetime] = None
+    _finished_at: Optional[datetime] = None
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def start(cls):
+        """Run the warm-up in the background so liveness (/health) answers immediately"""
+        if cls._task is None:
+            cls._task = asyncio.create_task(cls.run())
+        return cls._task
+
+    @classmethod
+    async def run(cls):
+        cls._ready = False
+        cls._stages = []
+        cls._started_at = datetime.utcnow()
+        deadline = time.monotonic() + settings.WARMUP_TIMEOUT
+        print("🔥 Warm-up starting...")
+
+        stages = [
+            ("database", cls._database),
+            ("upstream_connections", cls._upstream_connections),
+            ("warmup_completion", cls._warmup_completion),
+            ("caches", cls._caches),
+            ("prompt_templates", cls._prompt_templates),
+        ]
+
+        for name, stage in stages:
+            remaining = deadline - time.monotonic()
+            started = time.perf_counter()
+            if remaining <= 0:
+                cls._record(name, "skipped", 0.0, "warm-up time budget exhausted")
+                continue
+
+            try:
+                detail = await asyncio.wait_for(stage(), timeout=remaining)
+                cls._record(name, "ok", time.perf_counter() - started, detail)
+            except asyncio.TimeoutError:
+                cls._record(name, "timeout", time.perf_counter() - started, "warm-up time budget exhausted")
+            except Exception as e:
+                cls._record(name, "failed", time.perf_counter() - started, f"{type(e).__name__}: {e}")
+
+        cls._finished_at = datetime.utcnow()
+        cls._ready = True
+        total = sum(stage["seconds"] for stage in cls._stages)
+        print(f"✅ Warm-up finished in {total:.2f}s, ready for traffic")
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._ready
+
+    @classmethod
+    def status(cls) -> Dict:
+        return {
+            "ready": cls._ready,
+            "started_at": cls._started_at.isoformat() if cls._started_at else None,
+            "finished_at": cls._finished_at.isoformat() if cls._finished_at else None,
+            "stages": cls._stages
+        }
+
+    @classmethod
+    def _record(cls, name: str, status: str, seconds: float, detail=None):
+        cls._stages.append({"stage": name, "status": status, "seconds": round(seconds, 4), "detail": detail})
+        icon = "✅" if status == "ok" else "⚠️"
+        print(f"{icon} Warm-up stage '{name}': {status} in {seconds * 1000:.0f}ms" + (f" ({detail})" if detail else ""))
+
+    # --- stages ---
+
+    @staticmethod
+    async def _database():
+        await asyncio.to_thread(init_db)
+
+    @staticmethod
+    async def _upstream_connections():
+        await LLMService.open_connections(settings.WARMUP_CONNECTIONS)
+        return f"{settings.WARMUP_CONNECTIONS} connections"
+
+    @staticmethod
+    async def _warmup_completion():
+        if not settings.WARMUP_COMPLETION:
+            return "disabled"
+        # One tiny completion per route, so each route's first-choice model is warm
+        call_types = list(ModelRouter.routes())
+        await asyncio.gather(*[
+            LLMService.generate_response(
+                [{"role": "user", "content": "Reply with the single word: ready"}],
+                temperature=0.0,
+                max_tokens=1,
+                call_type=call_type
+            )
+            for call_type in call_types
+        ])
+        return f"{len(call_types)} routes"
+
+    @staticmethod
+    async def _caches():
+        LexiconEngine.load()
+        RoleCatalog.load()
+        PersonaClassifier.load()
+        # Exercise the per-turn CPU paths once (regex compilation, model first-call overhead)
+        features = AnswerFeatures.extract(WARMUP_SAMPLE_ANSWER)
+        PersonaClassifier.predict(WARMUP_SAMPLE_ANSWER, [], features)
+        LLMService._fallback_persona_detection(WARMUP_SAMPLE_ANSWER, [], features)
+        pools = {role: len(questions) for role, questions in InterviewEngine.ROLE_QUESTIONS.items()}
+        return f"question pools: {pools}"
+
+    @staticmethod
+    async def _prompt_templates():
+        compiled = PromptRegistry.precompile(RoleCatalog.roles(), VALID_PERSONAS)
+        return f"{compiled} templates"
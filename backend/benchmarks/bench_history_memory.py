@@ -0,0 +1,86 @@
+"""
+Benchmark: memory per session of the conversation history, dict/JSON vs. Turn.
+
+Run from backend/:
+    python -m benchmarks.bench_history_memory [--sizes 6,60,600] [--sessions 200]
+
+"before" is the previous layout: the JSON text kept on InterviewSession plus,
+while a turn runs, the list of dicts ConversationManager parsed from it.
+"after" is one ConversationHistory per session: the hot window of slotted
+Turns plus compressed cold segments (HISTORY_COLD_DIR unset). Bytes are
+measured with tracemalloc and include every object the history owns. The
+per-turn columns are the CPU cost of recording one turn at that size (before:
+parse the JSON and re-serialize it twice; after: one append, including the
+amortized segment flushes); "load" is reading the full transcript back.
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_conversation
+
+from app.models.history import ConversationHistory
+from app.models.turn import Speaker, Turn, utc_now_us
+
+
+def bytes_per_session(build, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        held = [build() for _ in range(count)]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del held
+    return used / count
+
+
+def per_turn_us(fn, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="6,60,600")
+    parser.add_argument("--sessions", type=int, default=200, help="sessions built per measurement (fewer for long ones)")
+    args = parser.parse_args()
+
+    print(f"{'turns':>6} {'before idle':>12} {'before in-turn':>15} {'after':>10} {'saved':>7}"
+          f" {'before us/turn':>15} {'after us/turn':>14} {'load us':>10}")
+
+    for turns in [int(s) for s in args.sizes.split(",")]:
+        text = json.dumps(make_conversation(turns))
+        count = max(5, args.sessions * 6 // max(turns, 6))
+
+        # Copy the text so every session owns its own string
+        idle = bytes_per_session(lambda: (text + " ")[:-1], count)
+        in_turn = bytes_per_session(lambda: ((text + " ")[:-1], json.loads(text)), count)
+        after = bytes_per_session(lambda: ConversationHistory.from_json(text), count)
+
+        def record_before():
+            history = json.loads(text)
+            history.append({"role": "user", "content": "ok", "timestamp": "2024-01-01T09:00:00"})
+            json.dumps(history)
+            json.dumps(history)
+
+        history = ConversationHistory.from_json(text)
+
+        def record_after():
+            history.append(Turn(Speaker.USER, "ok", ts=utc_now_us()))
+
+        loaded = ConversationHistory.from_json(text)
+
+        print(f"{turns:>6} {idle:>12,.0f} {in_turn:>15,.0f} {after:>10,.0f} {1 - after / in_turn:>6.0%}"
+              f" {per_turn_us(record_before):>15,.1f} {per_turn_us(record_after, 1000):>14,.2f}"
+              f" {per_turn_us(loaded.transcript):>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: single-pass LexiconEngine vs. per-keyword `in` scans.
+
+Run from backend/:
+    python -m benchmarks.bench_lexicon [--answers 200] [--words 400] [--extra-phrases 0,100,500]
+
+`--extra-phrases` grows every lexicon with synthetic phrases to show how both
+approaches scale as the lexicons get bigger.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")  # settings require a key; no network is used
+
+from app.services.lexicon_engine import LexiconEngine, DEFAULT_LEXICON_PATH
+
+CHATTY_VOCAB = (
+    "so basically i was working on this project and honestly we had a really big team "
+    "maybe i guess the system was kind of complex you know what i mean there was this "
+    "story about a deployment that went wrong and i don't know if that's relevant but "
+    "our manager asked do you think we can ship it and i said i'm not sure"
+).split()
+
+
+def make_answers(count: int, words: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(CHATTY_VOCAB, k=words)).lower() for _ in range(count)]
+
+
+def naive_hits(lexicons, text_lower):
+    hits = {}
+    for name, phrases in lexicons.items():
+        count = sum(1 for phrase in phrases if phrase in text_lower)
+        if count:
+            hits[name] = count
+    return hits
+
+
+def grow_lexicons(lexicons, extra: int, seed: int = 11):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz "
+    grown = {name: list(phrases) for name, phrases in lexicons.items()}
+    for i in range(extra):
+        name = list(grown)[i % len(grown)]
+        grown[name].append("".join(rng.choices(letters, k=rng.randint(5, 16))).strip() or f"phrase{i}")
+    return grown
+
+
+def time_per_call(fn, answers, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in answers:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(answers)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--answers", type=int, default=200)
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--extra-phrases", default="0,50,200,1000")
+    args = parser.parse_args()
+
+    with open(DEFAULT_LEXICON_PATH, "r", encoding="utf-8") as f:
+        base_lexicons = json.load(f)
+
+    answers = make_answers(args.answers, args.words)
+    print(f"{args.answers} chatty answers x {args.words} words\n")
+    print(f"{'phrases':>8} {'naive us/answer':>16} {'engine us/answer':>17} {'speedup':>8}  mode")
+
+    for extra in [int(x) for x in args.extra_phrases.split(",")]:
+        lexicons = grow_lexicons(base_lexicons, extra)
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(lexicons, f)
+            path = f.name
+        try:
+            LexiconEngine.load(path)
+            for text in answers[:20]:
+                assert LexiconEngine.count_hits(text) == naive_hits(lexicons, text)
+
+            naive = time_per_call(lambda t: naive_hits(lexicons, t), answers, args.repeat)
+            engine = time_per_call(LexiconEngine.count_hits, answers, args.repeat)
+            phrases = sum(len(p) for p in lexicons.values())
+            mode = "single-pass" if LexiconEngine._pattern is not None else "scan"
+            print(f"{phrases:>8} {naive:>16.1f} {engine:>17.1f} {naive / engine:>7.2f}x  ({mode})")
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
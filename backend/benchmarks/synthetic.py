@@ -0,0 +1,96 @@
+"""
+Synthetic interview conversations for benchmarks (no network, deterministic).
+
+`make_conversation(turns)` returns a history shaped like the one
+ConversationManager builds: an opening assistant question, then `turns`
+user answers, each followed by an assistant question. Answers cycle through
+every persona so all detection branches are exercised.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")  # settings require a key; no network is used
+
+from app.services.answer_features import AnswerFeatures
+from app.services.persona_classifier import VALID_PERSONAS
+
+PERSONAS = sorted(VALID_PERSONAS)
+
+FILLER = (
+    "so basically i was working on this project with a really big team and the system was "
+    "kind of complex because we had to migrate the data while users kept writing to it and "
+    "there was this story about a deployment that went wrong on a friday afternoon"
+).split()
+
+ANSWER_TEMPLATES = {
+    "efficient": [
+        "I used a queue and retried failed jobs.",
+        "Postgres, indexed by tenant and date.",
+        "Cut p95 latency from 900ms to 200ms.",
+    ],
+    "confused": [
+        "I'm not sure, maybe I would look at the logs? I don't know, I guess it depends what you mean.",
+        "Um, I think it could be the cache, but I'm not really sure what the question is asking.",
+    ],
+    "edge": [
+        "Can we skip this one? What's the salary range and do you offer remote work?",
+        "Honestly this is boring, tell me about your weekend instead. How much does this job pay?",
+    ],
+    "neutral": [
+        "I would start by reproducing the issue, then add tracing around the slow call and compare timings.",
+        "We split the monolith by domain and moved the billing service first because it changed least.",
+    ],
+}
+
+QUESTIONS = [
+    "Tell me about a project you are proud of.",
+    "How would you debug a slow API endpoint?",
+    "Describe a time you disagreed with a teammate.",
+    "How do you prioritise competing deadlines?",
+    "Walk me through a system you designed.",
+]
+
+
+def make_answer(persona: str, rng: random.Random) -> str:
+    if persona == "chatty":
+        return " ".join(rng.choices(FILLER, k=rng.randint(120, 220))).capitalize() + "."
+    return rng.choice(ANSWER_TEMPLATES.get(persona, ANSWER_TEMPLATES["neutral"]))
+
+
+def make_conversation(turns: int, seed: int = 7) -> List[Dict]:
+    """History with `turns` user answers, features precomputed as at turn time"""
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1, 9, 0, 0)
+    history = [{
+        "role": "assistant",
+        "content": QUESTIONS[0],
+        "timestamp": started.isoformat(),
+        "type": "main",
+        "persona_adapted": "neutral"
+    }]
+
+    for i in range(turns):
+        persona = PERSONAS[i % len(PERSONAS)]
+        answer = make_answer(persona, rng)
+        at = started + timedelta(seconds=30 * (i + 1))
+        history.append({
+            "role": "user",
+            "content": answer,
+            "timestamp": at.isoformat(),
+            "persona_detected": persona,
+            "features": AnswerFeatures.extract(answer)
+        })
+        history.append({
+            "role": "assistant",
+            "content": QUESTIONS[(i + 1) % len(QUESTIONS)],
+            "timestamp": (at + timedelta(seconds=2)).isoformat(),
+            "type": "main",
+            "persona_adapted": persona
+        })
+    return history
+
+
+def make_scores() -> Dict[str, float]:
+    return {"overall": 3.1, "logic": 3.4, "communication": 2.9, "focus": 3.0, "persona_adaptivity": 2.5}
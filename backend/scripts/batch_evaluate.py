@@ -0,0 +1,78 @@
+"""
+Run scripted interview answer sets in bulk.
+
+Run from backend/:
+    python -m scripts.batch_evaluate scripts.json [--parallelism 8] [--wait-for-report]
+    python -m scripts.batch_evaluate scripts.jsonl --url http://localhost:8000
+
+Input is a JSON list of {"role": ..., "answers": [...], "id": optional}
+(or {"sessions": [...]}), or JSONL with one session per line. Results are
+written as NDJSON (one line per session as it completes, then a summary).
+Without --url the sessions run in-process through ConversationManager;
+with --url they are sent to POST /api/batch/evaluate on a running server.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+
+def load_scripts(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return data["sessions"] if isinstance(data, dict) else data
+
+
+async def run_local(scripts, parallelism, wait_for_report, out):
+    from app.services.batch_runner import BatchRunner
+    from app.services.report_queue import ReportQueue
+
+    await ReportQueue.start()
+    try:
+        async for result in BatchRunner.run(scripts, parallelism, wait_for_report):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        await ReportQueue.stop()
+
+
+async def run_remote(url, scripts, parallelism, wait_for_report, out):
+    import httpx
+
+    payload = {"sessions": scripts, "parallelism": parallelism, "wait_for_report": wait_for_report}
+    async with httpx.AsyncClient(timeout=None) as client:
+        async with client.stream("POST", f"{url.rstrip('/')}/api/batch/evaluate", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    out.write(line + "\n")
+                    out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scripted interview answer sets in bulk")
+    parser.add_argument("scripts", help="JSON or JSONL file of {role, answers} sessions")
+    parser.add_argument("--parallelism", type=int, default=None)
+    parser.add_argument("--wait-for-report", action="store_true", help="include the feedback report in each result")
+    parser.add_argument("--url", help="stream through a running server instead of running in-process")
+    parser.add_argument("--output", help="NDJSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    scripts = load_scripts(args.scripts)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.url:
+            asyncio.run(run_remote(args.url, scripts, args.parallelism, args.wait_for_report, out))
+        else:
+            asyncio.run(run_local(scripts, args.parallelism, args.wait_for_report, out))
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
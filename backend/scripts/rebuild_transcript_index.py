@@ -0,0 +1,67 @@
+"""
+Rebuild the transcript search index (TRANSCRIPT_INDEX_PATH) from stored sessions.
+
+Run from backend/, with the server stopped:
+    python -m scripts.rebuild_transcript_index [--database-url sqlite:///./interview_partner.db] [--allow-empty]
+
+Every session row in the database is re-indexed from its stored
+conversation history; the server stores it when a session completes
+(SessionDirectory). The new index is built next to the current one and
+replaces it only once complete. A rebuild that finds no turns keeps a
+non-empty index unless --allow-empty is given.
+
+A running server keeps its index file open and would not see the new
+one: re-index its in-memory sessions with
+POST /api/admin/transcript-index/rebuild instead.
+"""
+import argparse
+import json
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    parser.add_argument("--allow-empty", action="store_true", help="replace the index even if no turns were found")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.config import get_settings
+    from app.models.session import InterviewSession
+    from app.services.transcript_index import TranscriptIndex, session_rows
+
+    settings = get_settings()
+    if not TranscriptIndex.enabled():
+        print("TRANSCRIPT_INDEX_PATH is empty, nothing to rebuild", file=sys.stderr)
+        sys.exit(1)
+
+    url = args.database_url or settings.DATABASE_URL
+    engine = create_engine(url, connect_args={"check_same_thread": False} if "sqlite" in url else {})
+    db = sessionmaker(bind=engine)()
+    started = time.perf_counter()
+    count = 0
+
+    def rows():
+        nonlocal count
+        for session in db.query(InterviewSession).yield_per(200):
+            count += 1
+            # Parse the stored column directly: a ConversationHistory keyed by the
+            # session id would write cold segments a running server may own
+            yield from session_rows(session, json.loads(session._conversation_history or "[]"))
+
+    try:
+        indexed = TranscriptIndex.rebuild(rows(), allow_empty=args.allow_empty)
+    except ValueError as e:
+        print(f"Rebuild aborted: {e} (--allow-empty replaces it anyway)", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close()
+        TranscriptIndex.close()
+    print(f"Indexed {indexed} turns from {count} sessions in {time.perf_counter() - started:.1f}s "
+          f"into {settings.TRANSCRIPT_INDEX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Replay recorded interview traces (TRACE_LOG JSONL) against the backend.
+
+Run from backend/:
+    python -m scripts.replay_traces traces.jsonl --stub-llm [--speed 10]
+    python -m scripts.replay_traces traces.jsonl --url http://localhost:8000 [--speed 1]
+
+Each traced session is replayed through the REST API with its recorded
+arrival offset and think times, divided by --speed (1 = real time). Answers
+use the recorded text when the trace has it (TRACE_INCLUDE_CONTENT), otherwise
+filler text of the recorded word count. Explicit "conclude" events (WebSocket
+clients) are skipped: over REST the interview concludes on its last answer.
+
+Without --url the app runs in-process. --stub-llm replaces the upstream LLM
+with a fake whose latency is sampled from the LLM call timings in the trace.
+The report lists request latency percentiles per turn index next to the
+latencies recorded in the trace.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import types
+from collections import defaultdict
+from typing import Dict, List
+
+FILLER = (
+    "i worked on the backend service and we improved the deployment process by adding tests "
+    "monitoring and a gradual rollout which reduced incidents for the team over the next quarter"
+).split()
+
+
+def load_sessions(path: str) -> List[List[Dict]]:
+    """Trace events grouped per session, in turn order, sessions ordered by arrival"""
+    grouped = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                event = json.loads(line)
+                grouped[event["session"]].append(event)
+
+    sessions = [sorted(events, key=lambda e: e["turn"]) for events in grouped.values()]
+    # Sessions whose start wasn't captured can't be replayed
+    sessions = [events for events in sessions if events[0]["event"] == "start"]
+    return sorted(sessions, key=lambda events: events[0]["ts"])
+
+
+def answer_text(event: Dict, rng: random.Random) -> str:
+    if event.get("answer"):
+        return event["answer"]
+    words = max(1, event.get("answer_words") or 1)
+    return " ".join(rng.choice(FILLER) for _ in range(words))
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 4)
+
+    return {"count": len(ordered), "p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99), "max": round(ordered[-1], 4)}
+
+
+def install_llm_stub(sessions: List[List[Dict]], seed: int):
+    """Replace chat.completions.create on every routed client with a latency-sampling fake"""
+    from app.services.llm_transport import LLMTransport
+    from app.services.model_router import ModelRouter
+
+    samples = [call["seconds"] for events in sessions for event in events for call in event.get("llm_calls", []) if call["ok"]]
+    samples = samples or [0.5]
+    rng = random.Random(seed)
+
+    def reply(text: str):
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=text))],
+            usage=None
+        )
+
+    async def create(**kwargs):
+        await asyncio.sleep(rng.choice(samples))
+        # One-word persona classification calls use max_tokens=10
+        if (kwargs.get("max_tokens") or 0) <= 10:
+            return reply("neutral")
+        return reply("Can you walk me through how you approached that?")
+
+    for base_url in ModelRouter.base_urls():
+        LLMTransport.get_client(base_url).chat.completions.create = create
+    print(f"🧪 LLM stubbed with {len(samples)} recorded latency samples", file=sys.stderr)
+
+
+async def replay_session(client, events: List[Dict], offset: float, speed: float, seed: int, latencies, stats):
+    rng = random.Random(seed)
+    await asyncio.sleep(offset / speed)
+
+    start = events[0]
+    started = time.perf_counter()
+    response = await client.post("/api/interview/start", json={"role": start.get("role") or "Software Engineer"})
+    latencies[0].append(time.perf_counter() - started)
+    if response.status_code != 200:
+        stats["errors"] += 1
+        return
+    session_id = response.json()["session_id"]
+    stats["sessions"] += 1
+
+    for event in events[1:]:
+        if event["event"] != "message":
+            stats["skipped_events"] += 1
+            continue
+        await asyncio.sleep((event.get("think_seconds") or 0) / speed)
+
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/interview/message",
+            json={"session_id": session_id, "message": answer_text(event, rng)}
+        )
+        latencies[event["turn"]].append(time.perf_counter() - started)
+        stats["requests"] += 1
+        if response.status_code != 200:
+            stats["errors"] += 1
+            return
+        if response.json().get("interview_complete"):
+            return
+
+
+async def replay(sessions: List[List[Dict]], url: str, speed: float, seed: int) -> Dict:
+    import httpx
+
+    if url:
+        client = httpx.AsyncClient(base_url=url.rstrip("/"), timeout=None)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=None)
+
+    latencies = defaultdict(list)
+    stats = {"sessions": 0, "requests": 0, "errors": 0, "skipped_events": 0}
+    first_ts = sessions[0][0]["ts"]
+    started = time.perf_counter()
+
+    async with client:
+        await asyncio.gather(*[
+            replay_session(client, events, events[0]["ts"] - first_ts, speed, seed + i, latencies, stats)
+            for i, events in enumerate(sessions)
+        ])
+
+    recorded = defaultdict(list)
+    for events in sessions:
+        for event in events:
+            recorded[event["turn"]].append(event["seconds"])
+
+    return {
+        "speed": speed,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        **stats,
+        "turns": {
+            str(turn): {"replayed": percentiles(latencies[turn]), "recorded": percentiles(recorded[turn])}
+            for turn in sorted(set(latencies) | set(recorded))
+        }
+    }
+
+
+def print_report(report: Dict):
+    print(f"\n{report['sessions']} sessions, {report['requests']} messages, {report['errors']} errors, "
+          f"{report['skipped_events']} skipped events in {report['wall_seconds']}s (speed {report['speed']}x)\n")
+    print(f"{'turn':>4} {'n':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}   {'recorded p50':>12} {'p90':>8}")
+    for turn, row in report["turns"].items():
+        replayed, recorded = row["replayed"], row["recorded"]
+        if not replayed["count"]:
+            continue
+        print(f"{turn:>4} {replayed['count']:>6} {replayed['p50']:>8.3f} {replayed['p90']:>8.3f} "
+              f"{replayed['p99']:>8.3f} {replayed['max']:>8.3f}   "
+              f"{recorded.get('p50', 0):>12.3f} {recorded.get('p90', 0):>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded interview traces against the backend")
+    parser.add_argument("traces", help="TRACE_LOG JSONL file")
+    parser.add_argument("--url", help="replay against a running server instead of in-process")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression factor (10 = ten times faster)")
+    parser.add_argument("--stub-llm", action="store_true", help="in-process only: fake the LLM with recorded latencies")
+    parser.add_argument("--max-sessions", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here as well")
+    args = parser.parse_args()
+
+    if args.url and args.stub_llm:
+        parser.error("--stub-llm only works in-process; stub the LLM on the server instead")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    sessions = load_sessions(args.traces)[:args.max_sessions]
+    if not sessions:
+        parser.error("no replayable sessions (traces need their start event)")
+    if args.stub_llm:
+        install_llm_stub(sessions, args.seed)
+
+    report = asyncio.run(replay(sessions, args.url, args.speed, args.seed))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
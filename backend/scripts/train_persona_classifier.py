@@ -0,0 +1,158 @@
+"""
+Train the local persona classifier from logged LLM labels.
+
+Run from backend/:
+    python -m scripts.train_persona_classifier persona_labels.jsonl --version v3
+
+Writes <PERSONA_MODEL_DIR>/<version>.joblib plus <version>.report.json with
+an evaluation against held-out LLM labels. Activate the model with
+PERSONA_MODEL_VERSION=<version> or POST /api/admin/persona-model.
+"""
+import argparse
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("GROQ_API_KEY", "offline-training")  # settings require a key; no network is used
+
+import joblib
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction import DictVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import FeatureUnion, Pipeline, make_pipeline
+from sklearn.preprocessing import FunctionTransformer, MaxAbsScaler
+
+from app.config import get_settings
+from app.services.persona_classifier import VALID_PERSONAS, select_numeric, select_text
+
+settings = get_settings()
+
+
+def load_examples(path: str):
+    rows, labels = [], []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if entry.get("label") not in VALID_PERSONAS:
+                continue
+            key = (entry["message"], entry["label"])
+            if key in seen:
+                continue
+            seen.add(key)
+            rows.append({"message": entry["message"], "features": entry["features"]})
+            labels.append(entry["label"])
+    return rows, labels
+
+
+def build_pipeline(calibration_folds: int) -> Pipeline:
+    features = FeatureUnion([
+        ("text", make_pipeline(
+            FunctionTransformer(select_text),
+            TfidfVectorizer(ngram_range=(1, 2), min_df=1, sublinear_tf=True)
+        )),
+        ("numeric", make_pipeline(
+            FunctionTransformer(select_numeric),
+            DictVectorizer(),
+            MaxAbsScaler()
+        )),
+    ])
+    classifier = CalibratedClassifierCV(
+        LogisticRegression(max_iter=1000, class_weight="balanced"),
+        method="sigmoid",
+        cv=calibration_folds
+    )
+    return Pipeline([("features", features), ("classifier", classifier)])
+
+
+def evaluate(pipeline: Pipeline, rows, labels, threshold: float) -> dict:
+    probabilities = pipeline.predict_proba(rows)
+    classes = list(pipeline.classes_)
+    predicted = [classes[p.argmax()] for p in probabilities]
+    confidence = probabilities.max(axis=1)
+
+    covered = [i for i, c in enumerate(confidence) if c >= threshold]
+    covered_accuracy = (
+        sum(1 for i in covered if predicted[i] == labels[i]) / len(covered) if covered else None
+    )
+
+    # Expected calibration error over 10 confidence bins
+    bins = [[] for _ in range(10)]
+    for i, c in enumerate(confidence):
+        bins[min(int(c * 10), 9)].append(i)
+    ece = sum(
+        len(b) / len(labels) * abs(
+            sum(1 for i in b if predicted[i] == labels[i]) / len(b) - sum(confidence[i] for i in b) / len(b)
+        )
+        for b in bins if b
+    )
+
+    return {
+        "held_out_examples": len(labels),
+        "accuracy": accuracy_score(labels, predicted),
+        "macro_f1": f1_score(labels, predicted, average="macro"),
+        "expected_calibration_error": ece,
+        "confidence_threshold": threshold,
+        "local_coverage": len(covered) / len(labels),
+        "escalation_rate": 1 - len(covered) / len(labels),
+        "accuracy_above_threshold": covered_accuracy,
+        "per_class": classification_report(labels, predicted, output_dict=True, zero_division=0),
+        "confusion_matrix": {
+            "labels": classes,
+            "matrix": confusion_matrix(labels, predicted, labels=classes).tolist()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local persona classifier from logged LLM labels")
+    parser.add_argument("labels", help="JSONL written by PERSONA_LABEL_LOG")
+    parser.add_argument("--version", default=datetime.utcnow().strftime("v%Y%m%d%H%M%S"))
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=settings.PERSONA_CONFIDENCE_THRESHOLD)
+    parser.add_argument("--model-dir", default=settings.PERSONA_MODEL_DIR)
+    args = parser.parse_args()
+
+    rows, labels = load_examples(args.labels)
+    counts = Counter(labels)
+    print(f"📚 {len(rows)} labelled examples: {dict(counts)}")
+    if len(counts) < 2 or min(counts.values()) < 4:
+        raise SystemExit("❌ Need at least 2 personas with 4+ examples each to train and evaluate")
+
+    train_rows, test_rows, train_labels, test_labels = train_test_split(
+        rows, labels, test_size=args.test_size, stratify=labels, random_state=42
+    )
+    folds = max(2, min(5, min(Counter(train_labels).values())))
+    pipeline = build_pipeline(folds)
+    pipeline.fit(train_rows, train_labels)
+
+    report = evaluate(pipeline, test_rows, test_labels, args.threshold)
+    report.update({
+        "version": args.version,
+        "trained_at": datetime.utcnow().isoformat(),
+        "training_examples": len(train_rows),
+        "label_source": str(args.labels)
+    })
+
+    model_dir = Path(args.model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump({"pipeline": pipeline, "version": args.version}, model_dir / f"{args.version}.joblib")
+    with open(model_dir / f"{args.version}.report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"✅ Model '{args.version}' saved to {model_dir}")
+    print(f"   accuracy {report['accuracy']:.3f} | macro F1 {report['macro_f1']:.3f} | ECE {report['expected_calibration_error']:.3f}")
+    print(f"   at threshold {args.threshold}: {report['local_coverage']:.1%} handled locally "
+          f"({report['escalation_rate']:.1%} escalate to LLM)")
+
+
+if __name__ == "__main__":
+    main()